@@ -0,0 +1,71 @@
+"""
+Benchmark of I/O bound handlers executed one by one or concurrently by the
+asynchronous command bus.
+
+Run with: python benchmarks/bench_async_bus.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.cqrs.command.bus.async_command_bus import AsyncCommandBus  # noqa: E402
+from core.cqrs.command.command import CommandInterface  # noqa: E402
+
+COMMANDS = 1_000
+LATENCY = 0.001
+
+
+@dataclass(frozen=True, kw_only=True)
+class Save(CommandInterface):
+    """Command handled by a simulated database round-trip."""
+
+    key: int
+
+
+async def save(command):  # pylint: disable=unused-argument
+    """
+    Simulates a database round-trip.
+    """
+    await asyncio.sleep(LATENCY)
+
+
+async def run(bus, limit):
+    """
+    Executes the commands, sequentially when limit is None.
+    """
+    commands = [Save(key=key) for key in range(COMMANDS)]
+    start = time.perf_counter()
+    if limit is None:
+        for command in commands:
+            await bus.execute(command)
+    else:
+        await bus.execute_concurrently(commands, limit=limit)
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Compares sequential and bounded concurrent execution.
+    """
+    bus = AsyncCommandBus()
+    bus.register_handler(Save, save)
+
+    print(f"{'case':<32}{'commands/s':>12}")
+    for name, limit in (
+        ("sequential", None),
+        ("concurrent, limit 8", 8),
+        ("concurrent, limit 64", 64),
+        ("concurrent, limit 512", 512),
+    ):
+        elapsed = min(asyncio.run(run(bus, limit)) for _ in range(3))
+        print(f"{name:<32}{COMMANDS / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
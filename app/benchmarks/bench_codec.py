@@ -0,0 +1,71 @@
+"""
+Benchmark of the protocol message codecs: the encoded size of a message and
+the time to encode and decode it, in JSON, in the binary codec and, when
+msgpack is installed, in the msgpack codec.
+
+Run with: python benchmarks/bench_codec.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import functools
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.cqrs.async_protocol import AsyncProtocol  # noqa: E402
+from core.cqrs.codec import BINARY, JSON, MSGPACK  # noqa: E402
+
+NUMBER = 20_000
+
+MESSAGES = {
+    "small query": {"user_id": 12345, "include_groups": True},
+    "medium command": {
+        "user_id": 12345,
+        "name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "roles": ["admin", "editor", "viewer"],
+        "score": 98.5,
+        "active": True,
+    },
+    "large response": {
+        "users": [
+            {"user_id": index, "name": f"user {index}", "score": index / 3}
+            for index in range(200)
+        ]
+    },
+}
+
+
+def main():
+    """
+    Compares the size and the round-trip time of each codec per message.
+    """
+    codecs = {"json": JSON, "binary": BINARY}
+    if MSGPACK is not None:
+        codecs["msgpack"] = MSGPACK
+
+    print(f"{'message':<18}{'codec':<8}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    for name, parameters in MESSAGES.items():
+        ap = AsyncProtocol(
+            uuid=AsyncProtocol.generate_uuid(),
+            cq="app.users.queries.GetUser",
+            parameters=parameters,
+            deadline=1_700_000_000.5,
+        )
+        number = NUMBER if name != "large response" else NUMBER // 100
+        for label, codec in codecs.items():
+            message = ap.to_bytes(codec)
+            encode = functools.partial(ap.to_bytes, codec)
+            decode = functools.partial(AsyncProtocol.from_bytes, message)
+            encoding = min(timeit.repeat(encode, number=number, repeat=5))
+            decoding = min(timeit.repeat(decode, number=number, repeat=5))
+            print(
+                f"{name:<18}{label:<8}{len(message):>8}"
+                f"{encoding / number * 1e6:>12.2f}{decoding / number * 1e6:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
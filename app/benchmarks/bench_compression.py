@@ -0,0 +1,64 @@
+"""
+Benchmark of the compression of messages: the encoded size of a message and
+the time to encode and decode it, plain and with the Compressed codec, for
+messages below and above its threshold.
+
+Run with: python benchmarks/bench_compression.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import functools
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.cqrs.async_protocol import AsyncProtocol  # noqa: E402
+from core.cqrs.codec import JSON  # noqa: E402
+from core.cqrs.compression import Compressed, ZlibCompressor  # noqa: E402
+
+NUMBER = 2_000
+
+MESSAGES = {
+    "small command": {"user_id": 12345, "name": "Ada Lovelace"},
+    "large command": {
+        "rows": [
+            {"row_id": index, "label": f"row {index}", "status": "active"}
+            for index in range(500)
+        ]
+    },
+}
+
+
+def main():
+    """
+    Compares the size and the round-trip time of each codec per message.
+    """
+    codecs = {
+        "json": JSON,
+        "zlib": Compressed(),
+        "zlib level 1": Compressed(compressor=ZlibCompressor(level=1)),
+    }
+
+    print(f"{'message':<16}{'codec':<14}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    for name, parameters in MESSAGES.items():
+        ap = AsyncProtocol(
+            uuid=AsyncProtocol.generate_uuid(),
+            cq="app.documents.commands.Import",
+            parameters=parameters,
+        )
+        for label, codec in codecs.items():
+            message = ap.to_bytes(codec)
+            encode = functools.partial(ap.to_bytes, codec)
+            decode = functools.partial(AsyncProtocol.from_bytes, message)
+            encoding = min(timeit.repeat(encode, number=NUMBER, repeat=5))
+            decoding = min(timeit.repeat(decode, number=NUMBER, repeat=5))
+            print(
+                f"{name:<16}{label:<14}{len(message):>8}"
+                f"{encoding / NUMBER * 1e6:>12.2f}{decoding / NUMBER * 1e6:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
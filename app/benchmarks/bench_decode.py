@@ -0,0 +1,71 @@
+"""
+Benchmark of the decoding of received messages into their message type:
+importing the type of every message, as decoding used to, against looking
+it up in the type registry.
+
+Run with: python benchmarks/bench_decode.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import os
+import sys
+import timeit
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.cqrs.async_protocol import AsyncProtocol  # noqa: E402
+from core.cqrs.command.command import CommandInterface  # noqa: E402
+from core.cqrs.message_types import TYPES, TypeRegistry  # noqa: E402
+
+NUMBER = 100_000
+
+
+@dataclass(frozen=True, kw_only=True)
+class CreateUser(CommandInterface):
+    """A command."""
+
+    user_id: int
+    name: str
+
+
+def imported(fqdn, parameters):
+    """
+    Builds the message the way decoding did before the type registry.
+    """
+    fqdn_pieces = fqdn.split(".")
+    fqdn_module = ".".join(fqdn_pieces[:-1])
+    class_name = fqdn_pieces[-1]
+
+    module = __import__(fqdn_module, fromlist=[class_name])
+    return getattr(module, class_name)(**parameters)
+
+
+def main():
+    """
+    Compares the time to build a message instance, alone and with decoding.
+    """
+    ap = AsyncProtocol.from_cq(CreateUser(user_id=12345, name="bob"))
+    message = ap.to_bytes()
+    TYPES.register(CreateUser)
+    allowlist = TypeRegistry(allowlist=True)
+    allowlist.register(CreateUser)
+
+    cases = {
+        "import": lambda: imported(ap.cq, ap.parameters),
+        "registry": lambda: TYPES.construct(ap.cq, ap.parameters),
+        "allowlist": lambda: allowlist.construct(ap.cq, ap.parameters),
+        "import + bytes": lambda: imported(
+            ap.cq, AsyncProtocol.from_bytes(message).parameters
+        ),
+        "registry + bytes": lambda: AsyncProtocol.from_bytes(message).to_cq(),
+    }
+
+    print(f"{'decode':<20}{'us/message':>12}")
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=NUMBER, repeat=5))
+        print(f"{name:<20}{elapsed / NUMBER * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark of the handler lookup of the simple command bus, for commands
+registered by type and for subclasses dispatched to a base class handler.
+
+Run with: python benchmarks/bench_dispatch.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import os
+import sys
+import timeit
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.cqrs.command.bus.simple_command_bus import SimpleCommandBus  # noqa: E402
+from core.cqrs.command.command import CommandInterface  # noqa: E402
+
+NUMBER = 500_000
+
+
+@dataclass(frozen=True, kw_only=True)
+class Base(CommandInterface):
+    """Command family handled by a single handler."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class Child(Base):
+    """Direct subclass."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class GrandChild(Child):
+    """Deeper subclass."""
+
+
+def handler(command):  # pylint: disable=unused-argument
+    """Does nothing."""
+
+
+def main():
+    """
+    Compares exact and inherited dispatch, and a per-call MRO walk.
+    """
+    bus = SimpleCommandBus()
+    bus.register_handler(Base, handler)
+    handlers = {Base: handler}
+
+    def mro_walk(command):
+        for base in type(command).__mro__:
+            if base in handlers:
+                return handlers[base](command)
+        return None
+
+    base, grand_child = Base(), GrandChild()
+    cases = {
+        "exact type": lambda: bus.execute(base),
+        "inherited, 2 levels": lambda: bus.execute(grand_child),
+        "per-call MRO walk, 2 levels": lambda: mro_walk(grand_child),
+    }
+
+    print(f"{'case':<32}{'ns/call':>10}")
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=NUMBER, repeat=15)) / NUMBER * 1e9
+        print(f"{name:<32}{elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark of commands sent one record each, or packed in batch envelopes,
+through a broker simulating a fixed cost per record, such as the request
+and acknowledgement overhead of a real broker.
+
+Run with: python benchmarks/bench_envelope.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.broker.broker import BrokerInterface  # noqa: E402
+from core.cqrs.command.bus.kafka_command_bus import KafkaCommandBus  # noqa: E402
+from core.cqrs.command.command import CommandInterface  # noqa: E402
+from core.cqrs.envelope import Batcher, unpack  # noqa: E402
+
+COMMANDS = 5_000
+# The simulated seconds spent per record by the broker.
+RECORD_COST = 0.00005
+
+
+@dataclass(frozen=True, kw_only=True)
+class Save(CommandInterface):
+    """A command."""
+
+    key: int
+    value: str
+
+
+class SimulatedBroker(BrokerInterface):
+    """A broker spending RECORD_COST per record, counting records and bytes."""
+
+    def __init__(self):
+        self.connection = None
+        self.records = 0
+        self.bytes = 0
+        self.messages = 0
+
+    async def connect(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """Connects nowhere."""
+
+    async def send(self, cq, message):
+        time.sleep(RECORD_COST)
+        self.records += 1
+        self.bytes += len(message)
+        self.messages += len(unpack(message))
+
+    async def receive(self, cq):
+        return None
+
+
+async def run(batcher):
+    """
+    Sends the commands one by one and returns the broker and elapsed time.
+    """
+    broker = SimulatedBroker()
+    bus = KafkaCommandBus(broker, batcher=batcher)
+    await bus.register_handler(Save, print)
+    start = time.perf_counter()
+    for key in range(COMMANDS):
+        await bus.execute(Save(key=key, value=f"value {key}"))
+    await bus.flush()
+    elapsed = time.perf_counter() - start
+    assert broker.messages == COMMANDS
+    return broker, elapsed
+
+
+def main():
+    """
+    Compares the throughput, records and bytes sent with and without batching.
+    """
+    print(f"{'case':<24}{'commands/s':>12}{'records':>10}{'bytes':>10}")
+    for name, batcher in (
+        ("one record each", None),
+        ("envelopes of 16 KiB", Batcher(max_bytes=16 * 1024)),
+        ("envelopes of 64 KiB", Batcher()),
+    ):
+        broker, elapsed = asyncio.run(run(batcher))
+        print(
+            f"{name:<24}{COMMANDS / elapsed:>12.0f}"
+            f"{broker.records:>10}{broker.bytes:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of the per-call overhead added by the inject decorator.
+
+Run with: python benchmarks/bench_inject.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.di import Container, inject  # noqa: E402
+
+NUMBER = 200_000
+
+
+class Repository:  # pylint: disable=too-few-public-methods
+    """Dependency resolved by type."""
+
+
+def main():
+    """
+    Compares plain calls with injected calls.
+    """
+    container = Container()
+    container["table"] = "table"
+    container[Repository] = Repository()
+
+    def plain(repository: Repository, table: str, retries: int = 1):
+        return repository, table, retries
+
+    injected = inject(plain, container=container)
+
+    class Handler:  # pylint: disable=too-few-public-methods
+        """Handler built through an injected constructor."""
+
+        def __init__(self, repository: Repository, table: str):
+            self.repository = repository
+            self.table = table
+
+    class InjectedHandler(Handler):  # pylint: disable=too-few-public-methods
+        """Injected handler."""
+
+        def __init__(
+            self, repository: Repository, table: str
+        ):  # pylint: disable=useless-parent-delegation
+            super().__init__(repository, table)
+
+    inject(InjectedHandler, container=container)
+    repository = container[Repository]
+
+    cases = {
+        "plain call": lambda: plain(repository, "table"),
+        "injected, all positional": lambda: injected(repository, "table", 1),
+        "injected, all keywords": lambda: injected(
+            repository=repository, table="table", retries=1
+        ),
+        "injected, resolved": lambda: injected(),  # pylint: disable=unnecessary-lambda
+        "plain __init__": lambda: Handler(repository, "table"),
+        "injected __init__, resolved": lambda: InjectedHandler(),  # pylint: disable=unnecessary-lambda,no-value-for-parameter
+    }
+
+    baseline = None
+    print(f"{'case':<32}{'ns/call':>10}{'overhead':>12}")
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=NUMBER, repeat=15)) / NUMBER * 1e9
+        if baseline is None or name == "plain __init__":
+            baseline = elapsed
+        print(f"{name:<32}{elapsed:>10.1f}{elapsed - baseline:>+12.1f}")
+
+    container.enable_profiling()
+    elapsed = (
+        min(timeit.repeat(cases["injected, resolved"], number=NUMBER, repeat=15))
+        / NUMBER
+        * 1e9
+    )
+    print(f"{'injected, resolved, profiled':<32}{elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark of the import time of many injected handlers, with and without
+the persistent introspection cache.
+
+Run with: python benchmarks/bench_introspection.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+MODULES = 10
+HANDLERS_PER_MODULE = 50
+RUNS = 5
+
+HANDLER = '''
+@inject
+class Handler{index}(HandlerInterface):
+    """Generated handler."""
+
+    def __init__(
+        self,
+        container: Container,
+        command_bus: SimpleCommandBus,
+        query_bus: SimpleQueryBus,
+        name: str = "handler{index}",
+        retries: int = 3,
+        timeout: float = 1.5,
+    ):
+        self.container = container
+        self.command_bus = command_bus
+        self.query_bus = query_bus
+        self.name = name
+        self.retries = retries
+        self.timeout = timeout
+
+    def __call__(self, cq):
+        return cq
+'''
+
+HEADER = '''"""Generated handlers module."""
+
+from core.di import Container, inject
+from core.cqrs.handler import HandlerInterface
+from core.cqrs.command.bus import SimpleCommandBus
+from core.cqrs.query.bus import SimpleQueryBus
+'''
+
+IMPORT = """
+import sys, time
+sys.path[:0] = [{src!r}, {root!r}]
+import core.di, core.cqrs.handler, core.cqrs.command.bus, core.cqrs.query.bus
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start)
+"""
+
+
+def generate(root: str) -> str:
+    """
+    Writes the generated handlers package and returns the import script.
+    """
+    package = os.path.join(root, "generated_handlers")
+    os.makedirs(package)
+    with open(os.path.join(package, "__init__.py"), "w", encoding="utf-8"):
+        pass
+
+    for module in range(MODULES):
+        handlers = "".join(
+            HANDLER.format(index=module * HANDLERS_PER_MODULE + index)
+            for index in range(HANDLERS_PER_MODULE)
+        )
+        with open(
+            os.path.join(package, f"module_{module}.py"), "w", encoding="utf-8"
+        ) as file:
+            file.write(HEADER + handlers)
+
+    imports = "\n".join(
+        f"import generated_handlers.module_{module}" for module in range(MODULES)
+    )
+    return IMPORT.format(src=SRC, root=root, imports=imports)
+
+
+def run(script: str, cache=None) -> float:
+    """
+    Imports the generated handlers in a fresh interpreter and returns the time taken.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env.pop("DI_INTROSPECTION_CACHE", None)
+    if cache is not None:
+        env["DI_INTROSPECTION_CACHE"] = cache
+
+    output = subprocess.run(
+        [sys.executable, "-c", script], env=env, check=True, capture_output=True
+    )
+    return float(output.stdout)
+
+
+def first_launch(script: str, cache: str) -> float:
+    """
+    Imports the generated handlers with an empty cache, which is then filled.
+    """
+    if os.path.exists(cache):
+        os.remove(cache)
+
+    return run(script, cache)
+
+
+def reflection(root: str, cache: str) -> None:
+    """
+    Compares, per handler, inspect.signature with a lookup in a loaded cache.
+    """
+    sys.path[:0] = [SRC, root]
+    # pylint: disable=import-error,import-outside-toplevel,protected-access
+    from inspect import signature
+    from core.di.inject import Undefined
+    from core.di.introspection import IntrospectionCache
+    from generated_handlers.module_0 import Handler0
+
+    function = Handler0.__init__.__wrapped__
+    loaded = IntrospectionCache(cache)
+    loaded.get(function, Undefined)
+    number = 10_000
+
+    def lookup():
+        loaded._memory.clear()
+        return loaded.get(function, Undefined)
+
+    for name, case in {
+        "inspect.signature": lambda: signature(function),
+        "cache lookup": lookup,
+    }.items():
+        elapsed = min(timeit.repeat(case, number=number, repeat=5)) / number
+        print(f"{name + ' per handler':<32}{elapsed * 1e6:>10.2f} us")
+
+
+def main():
+    """
+    Compares import times of the generated handlers.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        script = generate(root)
+        cache = os.path.join(root, "di.cache")
+
+        # compile the generated modules once, so only reflection differs
+        run(script)
+
+        no_cache = min(run(script) for _ in range(RUNS))
+        first = min(first_launch(script, cache) for _ in range(RUNS))
+        warm = min(run(script, cache) for _ in range(RUNS))
+
+        handlers = MODULES * HANDLERS_PER_MODULE
+        print(f"import of {handlers} injected handlers")
+        print(f"{'no cache':<32}{no_cache * 1e3:>10.2f} ms")
+        print(f"{'cache, first launch':<32}{first * 1e3:>10.2f} ms")
+        print(f"{'cache, next launches':<32}{warm * 1e3:>10.2f} ms")
+
+        reflection(root, cache)
+
+
+if __name__ == "__main__":
+    main()
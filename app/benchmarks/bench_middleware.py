@@ -0,0 +1,79 @@
+"""
+Benchmark of the per-execute overhead of each middleware layer.
+
+Run with: python benchmarks/bench_middleware.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import functools
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.cqrs.command.bus.simple_command_bus import SimpleCommandBus  # noqa: E402
+from core.cqrs.command.command import BaseCommandInterface  # noqa: E402
+from core.cqrs.middleware import MiddlewareInterface  # noqa: E402
+
+NUMBER = 200_000
+LAYERS = (0, 1, 2, 4, 8)
+
+
+class Ping(BaseCommandInterface):  # pylint: disable=too-few-public-methods
+    """Benchmarked command."""
+
+
+def handler(cq):  # pylint: disable=unused-argument
+    """Handles Ping."""
+
+
+def walked(middlewares):
+    """
+    Returns a handler walking the middleware list on every call, for comparison.
+    """
+
+    def call(cq, index=0):
+        if index == len(middlewares):
+            return handler(cq)
+        return middlewares[index](cq, lambda cq: call(cq, index + 1))
+
+    return call
+
+
+def main():
+    """
+    Compares executing a command through 0 to 8 pass-through middlewares.
+    """
+    ping = Ping()
+
+    print(f"{'layers':<8}{'composed ns':>14}{'per layer':>12}{'walked ns':>12}")
+    baseline = None
+    for layers in LAYERS:
+        middlewares = [MiddlewareInterface() for _ in range(layers)]
+        bus = SimpleCommandBus(middlewares)
+        bus.register_handler(Ping, handler)
+        chain = walked(middlewares)
+
+        composed = (
+            min(
+                timeit.repeat(
+                    functools.partial(bus.execute, ping), number=NUMBER, repeat=7
+                )
+            )
+            / NUMBER
+            * 1e9
+        )
+        walk = (
+            min(timeit.repeat(functools.partial(chain, ping), number=NUMBER, repeat=7))
+            / NUMBER
+            * 1e9
+        )
+        if baseline is None:
+            baseline = composed
+        per_layer = (composed - baseline) / layers if layers else 0.0
+        print(f"{layers:<8}{composed:>14.1f}{per_layer:>12.1f}{walk:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark of the conversion of messages to their parameters and back: the
+instance dictionary, as messages were sent before compiled schemas, against
+the schema of a regular and of a slotted dataclass, and the schemas of a
+slotted and a regular message with fields JSON cannot hold.
+
+Run with: python benchmarks/bench_schema.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import functools
+import os
+import sys
+import timeit
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.cqrs.command.command import CommandInterface  # noqa: E402
+from core.cqrs.schema import schema_of  # noqa: E402
+
+NUMBER = 100_000
+
+
+@dataclass(frozen=True, kw_only=True)
+class CreateUser(CommandInterface):
+    """A command."""
+
+    user_id: int
+    name: str
+    email: str
+    active: bool
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SlottedCreateUser(CommandInterface):
+    """The same command, slotted."""
+
+    user_id: int
+    name: str
+    email: str
+    active: bool
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CreateAccount(CommandInterface):
+    """A slotted command with fields JSON cannot hold."""
+
+    account_id: UUID
+    opened_at: datetime
+    balance: Decimal
+    owner: SlottedCreateUser
+
+
+@dataclass(frozen=True, kw_only=True)
+class RegularCreateAccount(CommandInterface):
+    """The same command, with regular fields."""
+
+    account_id: UUID
+    opened_at: datetime
+    balance: Decimal
+    owner: SlottedCreateUser
+
+
+def main():
+    """
+    Compares the time of the conversions, and the memory size of the messages.
+    """
+    fields = {"user_id": 12345, "name": "Ada", "email": "ada@example.com"}
+    regular = CreateUser(**fields, active=True)
+    slotted = SlottedCreateUser(**fields, active=True)
+    account_fields = {
+        "account_id": UUID(int=1),
+        "opened_at": datetime(2024, 5, 1, 12, 30),
+        "balance": Decimal("10.25"),
+        "owner": slotted,
+    }
+    account = CreateAccount(**account_fields)
+    regular_account = RegularCreateAccount(**account_fields)
+
+    cases = {
+        "__dict__": (vars, CreateUser, regular),
+        "schema": (schema_of(CreateUser).dump, schema_of(CreateUser).load, regular),
+        "schema, slotted": (
+            schema_of(SlottedCreateUser).dump,
+            schema_of(SlottedCreateUser).load,
+            slotted,
+        ),
+        "schema, converted": (
+            schema_of(CreateAccount).dump,
+            schema_of(CreateAccount).load,
+            account,
+        ),
+        "schema, converted, regular": (
+            schema_of(RegularCreateAccount).dump,
+            schema_of(RegularCreateAccount).load,
+            regular_account,
+        ),
+    }
+
+    print(f"{'message':<28}{'dump us':>10}{'load us':>10}{'instance bytes':>16}")
+    for name, (dump, load, message) in cases.items():
+        parameters = dump(message)
+        dumping = min(
+            timeit.repeat(functools.partial(dump, message), number=NUMBER, repeat=5)
+        )
+        loading = min(
+            timeit.repeat(
+                functools.partial(load, **parameters), number=NUMBER, repeat=5
+            )
+        )
+        size = sys.getsizeof(message)
+        if hasattr(message, "__dict__"):
+            size += sys.getsizeof(vars(message))
+        print(
+            f"{name:<28}{dumping / NUMBER * 1e6:>10.3f}"
+            f"{loading / NUMBER * 1e6:>10.3f}{size:>16}"
+        )
+
+
+if __name__ == "__main__":
+    main()
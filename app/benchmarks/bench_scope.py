@@ -0,0 +1,72 @@
+"""
+Benchmark of the cost of a per-message dependency scope.
+
+Run with: python benchmarks/bench_scope.py
+"""
+
+# pylint: disable=import-error,wrong-import-position
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.di import Container  # noqa: E402
+
+MESSAGES = 100_000
+
+
+class Session:  # pylint: disable=too-few-public-methods
+    """Scoped service disposed with its scope."""
+
+    def close(self):
+        """Close the session."""
+
+
+def main():
+    """
+    Measures opening, using and closing a scope per message.
+    """
+    container = Container()
+    for index in range(200):
+        container[f"service_{index}"] = index
+    container.scoped("session", Session)
+
+    def sync_scopes():
+        for index in range(MESSAGES):
+            with container.scope() as scope:
+                scope["correlation_id"] = index
+
+    def sync_scopes_with_session():
+        for index in range(MESSAGES):
+            with container.scope() as scope:
+                scope["correlation_id"] = index
+                _ = scope["session"], scope["service_199"]
+
+    async def async_scopes_with_session():
+        for index in range(MESSAGES):
+            async with container.scope() as scope:
+                scope["correlation_id"] = index
+                _ = scope["session"], scope["service_199"]
+
+    cases = {
+        "scope open/close": sync_scopes,
+        "scope + scoped session": sync_scopes_with_session,
+        "async scope + scoped session": lambda: asyncio.run(
+            async_scopes_with_session()
+        ),
+    }
+
+    print(f"{'case':<32}{'us/message':>12}{'messages/s':>14}")
+    for name, case in cases.items():
+        start = time.perf_counter()
+        case()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<32}{elapsed / MESSAGES * 1e6:>12.2f}{MESSAGES / elapsed:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,8 @@
 # pyright: reportMissingImports=false
 # pyright: reportAttributeAccessIssue=false
 from behave import given, when, then
-from src.config import container_setup
-from src.core.di import inject
+from config import container_setup
+from core.di import inject
 
 
 @given('I have a container "{container}"')
@@ -19,7 +19,7 @@ def given_a_have_a_container(context, container):
     if not hasattr(context, "containers"):
         context.containers = {}
 
-    from src.core.di import (
+    from core.di import (
         di as mydi,
     )  # pylint: disable=import-outside-toplevel,reimported
 
@@ -3,7 +3,9 @@ This file is used to setup the container with the necessary dependencies.
 """
 
 import os
+import atexit
 import logging
+import threading
 from typing import Union
 from core.di import di, Container
 
@@ -14,11 +16,12 @@ from core.cqrs.query.bus.kafka_query_bus import KafkaQueryBus
 
 # from core.broker.rabbitmq import RabbitMQBroker
 from core.broker.kafka import KafkaBroker
+from core.cqrs.registry import registry
 from example.infrastructure.cli.main import Main
-from example.domain.query.example_query import ExampleQuery
-from example.domain.query.example_handler import ExampleQueryHandler
-from example.domain.command.example_command import ExampleCommand
-from example.domain.command.example_handler import ExampleCommandHandler
+
+# The listener threads set their containers up concurrently, but share the
+# registry: one thread scans it while the others wait for the scan to end.
+_scan_lock = threading.Lock()
 
 
 async def container_setup(
@@ -33,28 +36,44 @@ async def container_setup(
     if container is None:
         container = di
 
+    if os.getenv("DI_PROFILE") and container.profiler is None:
+        profiler = container.enable_profiling()
+        atexit.register(lambda: logging.info("DI profile\n%s", profiler.format_table()))
+
     container["foo"] = "bar"
     container["baz"] = "qux"
 
-    # container["rabbitmq_broker"] = RabbitMQBroker("rabbitmq", 5672, "root", "root")
-    container["kafka_broker"] = KafkaBroker(["kafka:9092"], consumer_group, "latest")
+    # Handlers are declared with @handles and loaded by the buses on their
+    # first message. Without a manifest (CQRS_HANDLER_MANIFEST, built with
+    # `python -m core.cqrs.registry build example`) they are all imported now.
+    with _scan_lock:
+        if not registry:
+            registry.scan(["example"])
+
+    # Brokers and buses are async singletons: nothing connects until they are
+    # warmed up, see Container.warm_up in main.py and consume.py.
+
+    # async def rabbitmq_broker() -> RabbitMQBroker:
+    #     broker = RabbitMQBroker("rabbitmq", 5672, "root", "root")
+    #     await broker.connect()
+    #     return broker
+
+    async def kafka_broker() -> KafkaBroker:
+        broker = KafkaBroker(["kafka:9092"], consumer_group, "latest")
+        await broker.connect()
+        return broker
 
-    # query_bus = DIQueryBus(container)
-    query_bus = KafkaQueryBus(container["kafka_broker"])
-    await query_bus.register_handler(
-        ExampleQuery,
-        ExampleQueryHandler(),  # pylint: disable=no-value-for-parameter # pyright: ignore
-    )
+    async def query_bus() -> KafkaQueryBus:
+        # bus = DIQueryBus(container)
+        return KafkaQueryBus(await container.aget("kafka_broker"), container, registry)
 
-    command_bus = KafkaCommandBus(container["kafka_broker"])
-    await command_bus.register_handler(
-        ExampleCommand,
-        ExampleCommandHandler(),  # pylint: disable=no-value-for-parameter # pyright: ignore
-    )
+    async def command_bus() -> KafkaCommandBus:
+        return KafkaCommandBus(
+            await container.aget("kafka_broker"), container, registry
+        )
 
-    di["query_bus"] = query_bus
-    di["command_bus"] = command_bus
+    container.singleton("kafka_broker", kafka_broker)
+    container.singleton("query_bus", query_bus, dependencies=["kafka_broker"])
+    container.singleton("command_bus", command_bus, dependencies=["kafka_broker"])
 
-    di["example.infrastructure.cli.main"] = (
-        Main()  # pylint: disable=no-value-for-parameter # pyright: ignore
-    )
+    container.singleton("example.infrastructure.cli.main", Main)
@@ -5,34 +5,39 @@ The main entry point for the application
 import tracemalloc
 import asyncio
 import threading
-from core.di import di
+from core.di import Container, di, use_container
 from config import container_setup
 
 tracemalloc.start()
 
 
-def run_command_bus():
+async def listen(bus: str, consumer_group: str):
     """
-    Listens for incoming commands.
+    Wires a container of its own for the current thread and listens with its bus.
+
+    The container overlays di and is frozen once set up, so the listener
+    reads it without locks and never sees the wiring of other threads.
     """
+    container = Container(parent=di)
+    with use_container(container):
+        await container_setup(container=container, consumer_group=consumer_group)
+        await container.warm_up(bus)
+        container.freeze()
+        await container[bus].listen()
 
-    async def command_listen():
-        await container_setup(container=di, consumer_group="python-hexagonal-command")
-        await di["command_bus"].listen()
 
-    asyncio.run(command_listen())
+def run_command_bus():
+    """
+    Listens for incoming commands.
+    """
+    asyncio.run(listen("command_bus", "python-hexagonal-command"))
 
 
 def run_query_bus():
     """
     Listens for incoming queries.
     """
-
-    async def query_listen():
-        await container_setup(container=di, consumer_group="python-hexagonal-query")
-        await di["query_bus"].listen()
-
-    asyncio.run(query_listen())
+    asyncio.run(listen("query_bus", "python-hexagonal-query"))
 
 
 def start_threads():
@@ -2,7 +2,7 @@
 Module for defining the Broker interface.
 """
 
-from typing import Any
+from typing import Any, Iterable
 from abc import ABC, abstractmethod
 
 
@@ -18,7 +18,7 @@ class BrokerInterface(ABC):
         """Establishes a connection to the broker."""
 
     @abstractmethod
-    async def send(self, cq: str, message: str) -> None:
+    async def send(self, cq: str, message: bytes) -> None:
         """
         Sends a message to the broker.
 
@@ -26,8 +26,21 @@ class BrokerInterface(ABC):
             message: The message to send.
         """
 
+    async def send_many(self, cq: str, messages: Iterable[bytes]) -> None:
+        """
+        Sends several messages to the same destination.
+
+        Brokers override it to send them in a single round-trip.
+
+        Args:
+            cq: The destination of the messages.
+            messages: The messages to send.
+        """
+        for message in messages:
+            await self.send(cq, message)
+
     @abstractmethod
-    async def receive(self, cq: str) -> str:
+    async def receive(self, cq: str) -> bytes:
         """
         Receives a message from the broker.
 
@@ -3,7 +3,7 @@ Kafka broker implementation module.
 """
 
 import logging
-from typing import List, Union
+from typing import Iterable, List, Union
 from kafka import KafkaConsumer, KafkaProducer  # pyright: ignore
 from core.broker.broker import BrokerInterface
 
@@ -47,14 +47,33 @@ class KafkaBroker(BrokerInterface):
                 bootstrap_servers=self.servers
             ),
             "consumer": KafkaConsumer(  # pyright: ignore
-                ",".join(subscriptions),
+                *subscriptions,
                 bootstrap_servers=self.servers,
                 group_id=self.consumer_group,
                 auto_offset_reset=self.offset,
             ),
         }
 
-    async def send(self, cq: str, message: str) -> None:
+    def consumer(self, topics: List[str], group: str) -> KafkaConsumer:
+        """
+        Returns a new consumer of topics, in a consumer group of its own.
+
+        The group id is the broker consumer group suffixed with group, so
+        each group commits its own offsets and consumes at its own pace.
+
+        Args:
+            topics: The topics to subscribe to.
+            group: The suffix of the consumer group.
+        """
+        return KafkaConsumer(  # pyright: ignore
+            *topics,
+            bootstrap_servers=self.servers,
+            group_id=f"{self.consumer_group}.{group}",
+            auto_offset_reset=self.offset,
+            enable_auto_commit=False,
+        )
+
+    async def send(self, cq: str, message: bytes) -> None:
         """
         Sends a message to the Kafka broker.
 
@@ -66,9 +85,28 @@ class KafkaBroker(BrokerInterface):
 
         producer = self.connection["producer"]
         logging.debug("Sending msg %s %s", cq, message)
-        return producer.send(cq, value=message.encode())
+        return producer.send(cq, value=message)
+
+    async def send_many(self, cq: str, messages: Iterable[bytes]) -> None:
+        """
+        Sends several messages to the Kafka broker, flushing them at once.
+
+        The producer batches the records it buffers, so the messages leave
+        in as few requests as its batch size allows.
+
+        Args:
+            cq: The topic to send the messages to.
+            messages: The messages to send.
+        """
+        if not self.connection:
+            await self.connect()
+
+        producer = self.connection["producer"]
+        for message in messages:
+            producer.send(cq, value=message)
+        producer.flush()
 
-    async def receive(self, cq: str) -> str:
+    async def receive(self, cq: str) -> bytes:
         """
         Receives a message from the Kafka broker.
 
@@ -81,4 +119,4 @@ class KafkaBroker(BrokerInterface):
         consumer = self.connection["consumer"]
         consumer.subscribe(cq)
         message = consumer.recv()
-        return message.value.decode()
+        return message.value
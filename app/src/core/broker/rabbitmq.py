@@ -2,6 +2,7 @@
 RabbitMQ broker implementation module.
 """
 
+from typing import Iterable
 import aioamqp  # pyright: ignore
 from core.broker.broker import BrokerInterface
 
@@ -35,7 +36,7 @@ class RabbitMQBroker(BrokerInterface):
         )
         self.connection = {"transport": transport, "protocol": protocol}
 
-    async def send(self, cq: str, message: str) -> None:
+    async def send(self, cq: str, message: bytes) -> None:
         """
         Sends a message to the RabbitMQ broker.
 
@@ -49,7 +50,39 @@ class RabbitMQBroker(BrokerInterface):
         await channel.queue_declare(cq, durable=True)
         await channel.publish(message, "", cq)
 
-    async def receive(self, cq: str) -> str:
+    async def send_many(self, cq: str, messages: Iterable[bytes]) -> None:
+        """
+        Sends several messages to the RabbitMQ broker over a single channel.
+
+        Args:
+            cq: The queue to send the messages to.
+            messages: The messages to send.
+        """
+        if not self.connection:
+            await self.connect()
+
+        channel = await self.connection["protocol"].channel()  # pyright: ignore
+        await channel.queue_declare(cq, durable=True)
+        for message in messages:
+            await channel.publish(message, "", cq)
+
+    async def broadcast(self, exchange: str, message: bytes) -> None:
+        """
+        Publishes a message to a fanout exchange, which copies it to every
+        queue bound to it.
+
+        Args:
+            exchange: The fanout exchange to publish to.
+            message: The message to publish.
+        """
+        if not self.connection:
+            await self.connect()
+
+        channel = await self.connection["protocol"].channel()  # pyright: ignore
+        await channel.exchange_declare(exchange, "fanout", durable=True)
+        await channel.publish(message, exchange, "")
+
+    async def receive(self, cq: str) -> bytes:
         """
         Receives a message from the RabbitMQ broker.
 
@@ -62,4 +95,4 @@ class RabbitMQBroker(BrokerInterface):
         channel = await self.connection["protocol"].channel()  # pyright: ignore
         await channel.queue_declare(cq)
         message = await channel.basic_get(cq)
-        return message.body.decode()
+        return message.body
@@ -5,11 +5,18 @@ Module for asynchronous command bus implementation.
 import logging
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Type, TypeVar, Union, List
+from typing import Any, Awaitable, Callable, Type, TypeVar, Union, List, Optional
+from core.di import Container, Provider
 from core.cqrs.bus import BusInterface
 from core.broker.kafka import KafkaBroker
 from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.codec import JSON, Codec
+from core.cqrs.envelope import unpack
 from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.executor import ExecutionPolicy, HandlerExecutor, policy_of
+from core.cqrs.registry import HandlerRegistry
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.query.stream import response_messages
 
 T = TypeVar("T")  # pylint: disable=invalid-name
 H = TypeVar("H")  # pylint: disable=invalid-name
@@ -23,12 +30,48 @@ class KafkaBusInterface(BusInterface[T, H, R], ABC):
     Provides a register_handler method for registering event handlers.
     """
 
-    def __init__(self, broker: KafkaBroker):
+    # The kind of the registry handlers the bus serves, see core.cqrs.registry.
+    handler_kind: Optional[str] = None
+
+    # The seconds the listener waits for new messages per poll.
+    poll_timeout = 1.0
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        broker: KafkaBroker,
+        container: Optional[Container] = None,
+        registry: Optional[HandlerRegistry] = None,
+        cache: Optional[QueryCache] = None,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+        codec: Codec = JSON,
+    ):
         """
         Initializes the event bus with a broker.
+
+        Args:
+            broker: The broker to send and receive messages with.
+            container: When given, every received message is dispatched
+                inside a new scope of this container; handlers registered
+                as providers, such as pooled handlers, require it.
+            registry: When given, the bus also serves the registry handlers
+                of its kind, loading each one on the first message for it.
+            cache: When given, query buses serve repeated queries from it and
+                command buses drop the query types their commands invalidate.
+            executor: Runs the handlers according to their execution policy.
+                Messages for THREAD and PROCESS handlers are dispatched
+                without waiting for the previous ones, up to the limit of
+                their policy, so CPU-bound handlers do not stall the others.
+            codec: Encodes the sent messages, see core.cqrs.codec. Received
+                messages are decoded whatever the codec they were sent with.
         """
         self.broker = broker
         self.handlers = {}
+        self.container = container
+        self.registry = registry
+        self.cache = cache
+        self.executor = executor or HandlerExecutor()
+        self.codec = codec
 
     @abstractmethod
     async def register_handler(  # pylint: disable=invalid-overridden-method # pyright: ignore
@@ -54,54 +97,160 @@ class KafkaBusInterface(BusInterface[T, H, R], ABC):
         Listens for incoming events.
         """
 
-    async def _listen(self, send_response: bool = False) -> None:
+    def _has_handler(self, fqdn: str) -> bool:
         """
-        Listens for incoming events from kafka and executes their handlers asynchronously
+        Whether a handler is registered, or declared in the registry, for fqdn.
+        """
+        return fqdn in self.handlers or (
+            self.registry is not None
+            and self.handler_kind is not None
+            and self.registry.has(self.handler_kind, fqdn)
+        )
+
+    def _handler(self, fqdn: str) -> Any:
+        """
+        Returns the handler of fqdn, loading it from the registry on first use.
+        """
+        handler = self.handlers.get(fqdn)
+        if handler is None and self._has_handler(fqdn):
+            handler = self.registry.resolve(fqdn, self.container)  # pyright: ignore
+            self.handlers[fqdn] = handler
+
+        return handler
+
+    def _queue_names(self) -> List[str]:
+        """
+        Returns the fqdns the bus listens to.
         """
         queue_names: List[str] = list(self.handlers.keys())
+        if self.registry is not None and self.handler_kind is not None:
+            queue_names += [
+                fqdn
+                for fqdn in self.registry.fqdns(self.handler_kind)
+                if fqdn not in self.handlers
+            ]
 
-        await self.broker.connect(queue_names)
+        return queue_names
 
-        if self.broker.connection is None:
-            raise BrokenPipeError("Kafka not connected")
+    async def _dispatch(
+        self,
+        handler: Any,
+        cq: Any,
+        correlation_id: str,
+        consume: Optional[Callable[[Any], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Runs the handler, within a per-message scope when a container is set.
 
-        producer = self.broker.connection["producer"]
-        consumer = self.broker.connection["consumer"]
+        The message uuid is bound as "correlation_id" in the scope, and
+        scoped services are disposed once the handler has completed. A
+        handler registered as a Provider is resolved from the scope, so a
+        pooled handler is checked out for the message and then returned.
+        PROCESS handlers are resolved in the worker process instead.
+
+        The result is passed to consume, when given, before the scope is
+        disposed, as a streaming handler runs while its result is iterated.
+        """
+        if self.container is None or policy_of(handler) is ExecutionPolicy.PROCESS:
+            result = await self.executor.run(handler, cq)
+            return result if consume is None else await consume(result)
 
-        # Start consuming messages from each queue
-        # logging.debug('Listening to %s', queue_names)
-        # consumer.subscribe(queue_names)
+        async with self.container.scope() as scope:
+            scope["correlation_id"] = correlation_id
+            if isinstance(handler, Provider):
+                handler = handler.resolve(scope)
+            result = await self.executor.run(handler, cq)
+            return result if consume is None else await consume(result)
+
+    async def _process(self, handler: Any, message: Any, send_response: bool) -> None:
+        """
+        Dispatches a received message to its handler, sending back the response,
+        chunk by chunk when the handler streams it.
+
+        A message past its deadline is skipped, and its handler cancelled when
+        the deadline passes while it runs, as its sender gave up on it.
+        """
+        ap = AsyncProtocol.from_bytes(message)
+        if ap.expired():
+            # Nobody waits for the response anymore
+            logging.warning("Skipping %s %s past its deadline", ap.cq, ap.uuid)
+            return
+
+        cq = ap.to_cq()
+
+        async def respond(result: Any) -> None:
+            if self.cache is not None:
+                self.cache.invalidate_for(cq)
+
+            logging.debug("Send Response? %s", "yes" if send_response else "no")
+            if not send_response:
+                return
+
+            response_fqdn = ap.cq + "-Response"
+            async for data in response_messages(result, ap.uuid, self.codec):
+                logging.debug("Sending response back to %s %s", response_fqdn, data)
+                await self.broker.send(response_fqdn, data)
+            self.broker.connection["producer"].flush()  # pyright: ignore
+
+        dispatch = self._dispatch(handler, cq, ap.uuid, respond)
+        if ap.deadline is None:
+            await dispatch
+            return
 
         try:
-            for event in consumer:
-                queue_name = event.topic
-                message = event.value
+            await asyncio.wait_for(dispatch, ap.remaining())
+        except asyncio.TimeoutError:
+            logging.warning("Cancelled %s %s at its deadline", ap.cq, ap.uuid)
+
+    async def _listen(self, send_response: bool = False) -> None:
+        """
+        Listens for incoming events from kafka and executes their handlers asynchronously
 
-                logging.debug("Event %s %s", queue_name, message.decode())
-                if queue_name not in self.handlers:
-                    raise HandlerNotFound.for_command(queue_name)
+        The messages of batch envelopes are handled one by one, see core.cqrs.envelope.
+        """
+        queue_names = self._queue_names()
 
-                ap = AsyncProtocol.from_json(message)
-                cq = ap.to_cq()
+        await self.broker.connect(queue_names)
 
-                handler = self.handlers[queue_name]
-                result = handler(cq)
+        if self.broker.connection is None:
+            raise BrokenPipeError("Kafka not connected")
 
-                logging.debug("Send Response? %s", "yes" if send_response else "no")
-                if send_response:
-                    response_ap = AsyncProtocol.from_cq(result, uuid=ap.uuid)
-                    response_fqdn = ap.cq + "-Response"
-                    data = response_ap.to_json()
+        consumer = self.broker.connection["consumer"]
+        timeout_ms = int(self.poll_timeout * 1000)
 
-                    logging.debug("Sending response back to %s %s", response_fqdn, data)
-                    await self.broker.send(response_fqdn, data)
-                    producer.flush()
-                else:
-                    if result is not None:
-                        return await result
+        try:
+            while True:
+                # The consumer blocks while polling, keep it off the event loop
+                records = await asyncio.to_thread(consumer.poll, timeout_ms)
+                for partition_records in records.values():
+                    for event in partition_records:
+                        await self._receive(event, send_response)
 
         except asyncio.CancelledError:
-            # Gracefully handle generator closure
-            await self.broker.connection["producer"].close()
-            await self.broker.connection["consumer"].close()
+            # Gracefully handle generator closure, once the messages handed
+            # to the executor are handled and their responses sent
+            await self.executor.join()
+            self.broker.connection["producer"].close()
+            self.broker.connection["consumer"].close()
             raise
+
+    async def _receive(self, event: Any, send_response: bool) -> None:
+        """
+        Dispatches the messages of a consumed record to their handler, INLINE
+        handlers in turn and the others through the executor.
+        """
+        queue_name = event.topic
+
+        logging.debug("Event %s of %d bytes", queue_name, len(event.value))
+        handler = self._handler(queue_name)
+        if handler is None:
+            raise HandlerNotFound.for_command(queue_name)
+
+        policy = policy_of(handler)
+        for message in unpack(event.value):
+            if policy is ExecutionPolicy.INLINE:
+                await self._process(handler, message, send_response)
+            else:
+                await self.executor.submit(
+                    policy, self._process(handler, message, send_response)
+                )
@@ -4,11 +4,16 @@ Module for asynchronous protocol implementation.
 
 from __future__ import annotations
 import json
+import time
 from typing import Any, Dict, Union, Optional
 from uuid import uuid4
 from dataclasses import dataclass
+from core.cqrs.codec import JSON, Codec, decode, encode
+from core.cqrs.compression import decompress
 from core.cqrs.command.command import BaseCommandInterface
+from core.cqrs.message_types import TYPES, TypeRegistry
 from core.cqrs.query.query import QueryInterface, QueryResponseInterface
+from core.cqrs.schema import schema_of
 
 
 @dataclass
@@ -21,16 +26,55 @@ class AsyncProtocol:
     ---
     ap = AsyncProtocol->from_json()
     cq =ap->to_cq()
+
+    Queries carry a deadline, the wall clock time after which nobody waits
+    for their response any more. A streamed response is a sequence of chunk
+    messages sharing the uuid of the query, numbered from 0, followed by an
+    end message numbered after the count of chunks. These fields are omitted
+    from the JSON when unset.
     """
 
     uuid: str
     cq: str
     parameters: Dict[str, Any]
+    deadline: Optional[float]
+    sequence: Optional[int]
+    end: bool
 
-    def __init__(self, uuid: str, cq: str, parameters: Dict[str, Any]) -> None:
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        uuid: str,
+        cq: str,
+        parameters: Dict[str, Any],
+        *,
+        deadline: Optional[float] = None,
+        sequence: Optional[int] = None,
+        end: bool = False,
+    ) -> None:
         self.uuid = uuid
         self.cq = cq
         self.parameters = parameters
+        self.deadline = deadline
+        self.sequence = sequence
+        self.end = end
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        """
+        Whether the deadline of the message has passed.
+        """
+        return (
+            self.deadline is not None
+            and (time.time() if now is None else now) >= self.deadline
+        )
+
+    def remaining(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the seconds left before the deadline, or None without deadline.
+        """
+        if self.deadline is None:
+            return None
+
+        return max(0.0, self.deadline - (time.time() if now is None else now))
 
     @staticmethod
     def generate_uuid() -> str:
@@ -53,18 +97,67 @@ class AsyncProtocol:
         data = json.loads(json_data)
         return AsyncProtocol(**data)
 
+    @staticmethod
+    def from_bytes(message: bytes) -> AsyncProtocol:
+        """
+        Creates an AsyncProtocol instance from a message encoded with any
+        registered codec, see core.cqrs.codec, compressed or not, see
+        core.cqrs.compression.
+
+        Args:
+            message (bytes): The encoded message.
+
+        Returns:
+            AsyncProtocol: An instance of AsyncProtocol.
+        """
+        return AsyncProtocol(**decode(decompress(message)))
+
+    def to_bytes(self, codec: Codec = JSON) -> bytes:
+        """
+        Returns the AsyncProtocol instance encoded with codec, JSON by default.
+        """
+        return encode(self._fields(), codec)
+
     def to_json(self) -> str:
         """
         Returns a JSON representation of the AsyncProtocol instance.
         """
-        return json.dumps(
-            {"uuid": self.uuid, "cq": self.cq, "parameters": self.parameters}
-        )
+        return json.dumps(self._fields())
+
+    def _fields(self) -> Dict[str, Any]:
+        """
+        Returns the fields of the message, leaving out the unset optional ones.
+        """
+        data = {"uuid": self.uuid, "cq": self.cq, "parameters": self.parameters}
+        if self.deadline is not None:
+            data["deadline"] = self.deadline
+        if self.sequence is not None:
+            data["sequence"] = self.sequence
+        if self.end:
+            data["end"] = True
+
+        return data
+
+    @staticmethod
+    def end_of_stream(uuid: str, count: int) -> AsyncProtocol:
+        """
+        Creates the message ending a stream of count chunks.
+
+        Args:
+            uuid (str): The uuid of the streamed query.
+            count (int): The number of chunks sent before.
+
+        Returns:
+            AsyncProtocol: The end message, carrying no message.
+        """
+        return AsyncProtocol(uuid=uuid, cq="", parameters={}, sequence=count, end=True)
 
     @staticmethod
     def from_cq(
         cq: Union[QueryInterface, BaseCommandInterface, QueryResponseInterface],
         uuid: Optional[str] = None,
+        deadline: Optional[float] = None,
+        sequence: Optional[int] = None,
     ) -> AsyncProtocol:
         """
         Creates an AsyncProtocol instance from a
@@ -73,6 +166,11 @@ class AsyncProtocol:
         Args:
             cq (Union[QueryInterface, BaseCommandInterface, QueryResponseInterface]):
                 The interface to create the protocol from.
+            uuid (Optional[str]): The uuid of the message, a new one when None.
+            deadline (Optional[float]): The wall clock time after which the
+                message is not worth handling any more.
+            sequence (Optional[int]): The position of the message in a streamed
+                response, None when the response is not streamed.
 
         Returns:
             AsyncProtocol: An instance of AsyncProtocol.
@@ -80,24 +178,27 @@ class AsyncProtocol:
         return AsyncProtocol(
             uuid=uuid or AsyncProtocol.generate_uuid(),
             cq=cq.__module__ + "." + cq.__class__.__name__,
-            parameters=cq.__dict__,
+            parameters=schema_of(type(cq)).dump(cq),
+            deadline=deadline,
+            sequence=sequence,
         )
 
     def to_cq(
-        self,
+        self, types: Optional[TypeRegistry] = None
     ) -> Union[QueryInterface, BaseCommandInterface, QueryResponseInterface]:
         """
         Retrieves the QueryInterface or BaseCommandInterface instance associated with the protocol.
 
+        Args:
+            types (Optional[TypeRegistry]): The registry resolving the message
+                type, the one of the buses by default.
+
         Returns:
             Union[QueryInterface, BaseCommandInterface, QueryResponseInterface]:
                 The instance of QueryInterface or BaseCommandInterface or QueryResponseInterface.
-        """
-        fqdn_pieces = self.cq.split(".")
-        fqdn_module = ".".join(fqdn_pieces[:-1])
-        class_name = fqdn_pieces[-1]
 
-        module = __import__(fqdn_module, fromlist=[class_name])
-        cq_class = getattr(module, class_name)
-        cq_instance = cq_class(**self.parameters)
-        return cq_instance
+        Raises:
+            MessageTypeNotAllowed: If the registry is in allowlist mode and
+                the message type has not been registered.
+        """
+        return (TYPES if types is None else types).construct(self.cq, self.parameters)
@@ -3,12 +3,20 @@ Module for asynchronous command bus implementation.
 """
 
 import asyncio
+import logging
 from abc import ABC, abstractmethod
-from typing import Type, TypeVar, Union, List
+from typing import Any, Awaitable, Callable, Type, TypeVar, Union, List, Optional
+from core.di import Container, Provider
 from core.cqrs.bus import BusInterface
 from core.broker.broker import BrokerInterface
 from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.codec import JSON, Codec
+from core.cqrs.envelope import unpack
 from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.executor import ExecutionPolicy, HandlerExecutor, policy_of
+from core.cqrs.registry import HandlerRegistry
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.query.stream import response_messages
 
 T = TypeVar("T")  # pylint: disable=invalid-name
 H = TypeVar("H")  # pylint: disable=invalid-name
@@ -22,12 +30,45 @@ class RabbitMQBusInterface(BusInterface[T, H, R], ABC):
     Provides a register_handler method for registering event handlers.
     """
 
-    def __init__(self, broker: BrokerInterface):
+    # The kind of the registry handlers the bus serves, see core.cqrs.registry.
+    handler_kind: Optional[str] = None
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        broker: BrokerInterface,
+        container: Optional[Container] = None,
+        registry: Optional[HandlerRegistry] = None,
+        cache: Optional[QueryCache] = None,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+        codec: Codec = JSON,
+    ):
         """
         Initializes the event bus with a broker.
+
+        Args:
+            broker: The broker to send and receive messages with.
+            container: When given, every received message is dispatched
+                inside a new scope of this container; handlers registered
+                as providers, such as pooled handlers, require it.
+            registry: When given, the bus also serves the registry handlers
+                of its kind, loading each one on the first message for it.
+            cache: When given, query buses serve repeated queries from it and
+                command buses drop the query types their commands invalidate.
+            executor: Runs the handlers according to their execution policy.
+                Messages for THREAD and PROCESS handlers are dispatched
+                without waiting for the previous ones, up to the limit of
+                their policy, so CPU-bound handlers do not stall the others.
+            codec: Encodes the sent messages, see core.cqrs.codec. Received
+                messages are decoded whatever the codec they were sent with.
         """
         self.broker = broker
         self.handlers = {}
+        self.container = container
+        self.registry = registry
+        self.cache = cache
+        self.executor = executor or HandlerExecutor()
+        self.codec = codec
 
     @abstractmethod
     async def register_handler(  # pylint: disable=invalid-overridden-method # pyright: ignore
@@ -53,11 +94,115 @@ class RabbitMQBusInterface(BusInterface[T, H, R], ABC):
         Listens for incoming events.
         """
 
+    def _has_handler(self, fqdn: str) -> bool:
+        """
+        Whether a handler is registered, or declared in the registry, for fqdn.
+        """
+        return fqdn in self.handlers or (
+            self.registry is not None
+            and self.handler_kind is not None
+            and self.registry.has(self.handler_kind, fqdn)
+        )
+
+    def _handler(self, fqdn: str) -> Any:
+        """
+        Returns the handler of fqdn, loading it from the registry on first use.
+        """
+        handler = self.handlers.get(fqdn)
+        if handler is None and self._has_handler(fqdn):
+            handler = self.registry.resolve(fqdn, self.container)  # pyright: ignore
+            self.handlers[fqdn] = handler
+
+        return handler
+
+    def _queue_names(self) -> List[str]:
+        """
+        Returns the fqdns the bus listens to.
+        """
+        queue_names: List[str] = list(self.handlers.keys())
+        if self.registry is not None and self.handler_kind is not None:
+            queue_names += [
+                fqdn
+                for fqdn in self.registry.fqdns(self.handler_kind)
+                if fqdn not in self.handlers
+            ]
+
+        return queue_names
+
+    async def _dispatch(
+        self,
+        handler: Any,
+        cq: Any,
+        correlation_id: str,
+        consume: Optional[Callable[[Any], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Runs the handler, within a per-message scope when a container is set.
+
+        The message uuid is bound as "correlation_id" in the scope, and
+        scoped services are disposed once the handler has completed. A
+        handler registered as a Provider is resolved from the scope, so a
+        pooled handler is checked out for the message and then returned.
+        PROCESS handlers are resolved in the worker process instead.
+
+        The result is passed to consume, when given, before the scope is
+        disposed, as a streaming handler runs while its result is iterated.
+        """
+        if self.container is None or policy_of(handler) is ExecutionPolicy.PROCESS:
+            result = await self.executor.run(handler, cq)
+            return result if consume is None else await consume(result)
+
+        async with self.container.scope() as scope:
+            scope["correlation_id"] = correlation_id
+            if isinstance(handler, Provider):
+                handler = handler.resolve(scope)
+            result = await self.executor.run(handler, cq)
+            return result if consume is None else await consume(result)
+
+    async def _process(self, handler: Any, message: Any, send_response: bool) -> None:
+        """
+        Dispatches a received message to its handler, sending back the response,
+        chunk by chunk when the handler streams it.
+
+        A message past its deadline is skipped, and its handler cancelled when
+        the deadline passes while it runs, as its sender gave up on it.
+        """
+        ap = AsyncProtocol.from_bytes(message)
+        if ap.expired():
+            # Nobody waits for the response anymore
+            logging.warning("Skipping %s %s past its deadline", ap.cq, ap.uuid)
+            return
+
+        cq = ap.to_cq()
+
+        async def respond(result: Any) -> None:
+            if self.cache is not None:
+                self.cache.invalidate_for(cq)
+
+            if not send_response:
+                return
+
+            response_fqdn = ap.cq + "#Response"
+            async for data in response_messages(result, ap.uuid, self.codec):
+                await self.broker.send(response_fqdn, data)
+
+        dispatch = self._dispatch(handler, cq, ap.uuid, respond)
+        if ap.deadline is None:
+            await dispatch
+            return
+
+        try:
+            await asyncio.wait_for(dispatch, ap.remaining())
+        except asyncio.TimeoutError:
+            logging.warning("Cancelled %s %s at its deadline", ap.cq, ap.uuid)
+
     async def _listen(self, send_response: bool = False) -> None:
         """
         Listens for incoming events from rabbitmq and executes their handlers asynchronously
+
+        The messages of batch envelopes are handled one by one, see core.cqrs.envelope.
         """
-        queue_names: List[str] = list(self.handlers.keys())
+        queue_names = self._queue_names()
 
         await self.broker.connect()
 
@@ -74,7 +219,7 @@ class RabbitMQBusInterface(BusInterface[T, H, R], ABC):
         ):  # pylint: disable=unused-argument; pyright: ignore
             """Callback to handle incoming messages."""
             queue_name = envelope.routing_key
-            message = body.decode()
+            message = body
             await channel.basic_client_ack(envelope.delivery_tag)
             await message_queue.put((queue_name, message))
 
@@ -86,27 +231,25 @@ class RabbitMQBusInterface(BusInterface[T, H, R], ABC):
         try:
             while True:
                 # Yield messages from the queue
-                (queue_name, message) = await message_queue.get()
+                (queue_name, body) = await message_queue.get()
 
-                if queue_name not in self.handlers:
+                handler = self._handler(queue_name)
+                if handler is None:
                     raise HandlerNotFound.for_command(queue_name)
 
-                ap = AsyncProtocol.from_json(message)
-                cq = ap.to_cq()
-
-                handler = self.handlers[queue_name]
-                result = handler(cq)
-
-                if send_response:
-                    response_ap = AsyncProtocol.from_cq(result, uuid=ap.uuid)
-                    response_fqdn = ap.cq + "#Response"
-                    await self.broker.send(response_fqdn, response_ap.to_json())
-                else:
-                    if result is not None:
-                        return await result
+                policy = policy_of(handler)
+                for message in unpack(body):
+                    if policy is ExecutionPolicy.INLINE:
+                        await self._process(handler, message, send_response)
+                    else:
+                        await self.executor.submit(
+                            policy, self._process(handler, message, send_response)
+                        )
 
         except asyncio.CancelledError:
-            # Gracefully handle generator closure
+            # Gracefully handle generator closure, once the messages handed
+            # to the executor are handled and their responses sent
+            await self.executor.join()
             await self.broker.connection["protocol"].close()
             self.broker.connection["transport"].close()
             raise
@@ -2,13 +2,29 @@
 Module for handling bus operations.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Type, Union, TypeVar, Generic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 T = TypeVar("T")  # pylint: disable=invalid-name
 H = TypeVar("H")  # pylint: disable=invalid-name
 R = TypeVar("R")  # pylint: disable=invalid-name
 
+DEFAULT_CONCURRENCY = 64
+
 
 class BusInterface(Generic[T, H, R], ABC):
     """
@@ -34,3 +50,80 @@ class BusInterface(Generic[T, H, R], ABC):
 
         :param cq: The query to execute.
         """
+
+    def execute_many(self, cqs: Iterable[T]) -> List[Union[None, R]]:
+        """
+        Execute several T, returning their results in order.
+
+        Buses override it to group the messages by type and hand each group
+        to its handler, or to the broker, at once.
+
+        :param cqs: The messages to execute.
+        """
+        return [self.execute(cq) for cq in cqs]
+
+
+def group_by_type(cqs: Sequence[Any]) -> Dict[Type, Tuple[List[int], List[Any]]]:
+    """
+    Groups messages by type, keeping their positions and relative order.
+    """
+    groups: Dict[Type, Tuple[List[int], List[Any]]] = {}
+    for index, cq in enumerate(cqs):
+        indexes, batch = groups.setdefault(type(cq), ([], []))
+        indexes.append(index)
+        batch.append(cq)
+
+    return groups
+
+
+def execute_grouped(
+    cqs: Sequence[Any], batch_handler: Callable[[Type], Callable[[List[Any]], Any]]
+) -> List[Any]:
+    """
+    Executes messages grouped by type and returns their results in order.
+
+    Args:
+        cqs: The messages to execute.
+        batch_handler: Returns, for a message type, the callable executing a
+            list of messages of that type and returning their results in order.
+    """
+    results: List[Any] = [None] * len(cqs)
+    for cq_type, (indexes, batch) in group_by_type(cqs).items():
+        for index, result in zip(indexes, batch_handler(cq_type)(batch)):
+            results[index] = result
+
+    return results
+
+
+async def execute_concurrently(
+    execute: Callable[[Any], Awaitable[Any]],
+    cqs: Iterable[Any],
+    limit: int = DEFAULT_CONCURRENCY,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Awaits execute for every message, at most limit at a time, and returns
+    the results in order.
+
+    Args:
+        execute: Executes a single message.
+        cqs: The messages to execute.
+        limit: The maximum number of executions in flight.
+        return_exceptions: Whether the exceptions raised are returned as
+            results, instead of raising the first one.
+
+    Raises:
+        ValueError: If limit is lower than 1.
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(cq: Any) -> Any:
+        async with semaphore:
+            return await execute(cq)
+
+    return await asyncio.gather(
+        *(bounded(cq) for cq in cqs), return_exceptions=return_exceptions
+    )
@@ -0,0 +1,357 @@
+"""
+Module containing the codecs encoding protocol messages to bytes.
+
+JSON is the implicit default: JSON messages are sent as plain UTF-8 JSON,
+as before codecs existed, without codec id, so an unframed message is JSON.
+Any other codec frames its payload behind a NUL byte, which never starts a
+JSON document, followed by the id of the codec. A listener therefore decodes
+the messages of every registered codec whatever its own codec is, so
+senders can switch codec one at a time across a fleet.
+
+JSON, through the C accelerated json module, is also the fastest codec
+without dependency. BinaryCodec trades CPU for size, and MsgpackCodec saves
+both when the optional msgpack package is installed.
+
+Other codecs are plugged in by subclassing Codec with an unused codec id
+and registering an instance on every listener with register_codec. The
+highest ids are reserved for compressed messages and batch envelopes, see
+core.cqrs.compression and core.cqrs.envelope.
+"""
+
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Callable, ClassVar, Dict, Optional, Sequence, Tuple
+from core.cqrs.exceptions import CodecAlreadyRegistered, UnknownCodec
+
+try:
+    import msgpack  # pyright: ignore
+except ImportError:  # msgpack is an optional dependency
+    msgpack = None  # pylint: disable=invalid-name
+
+# The first byte of a framed message, followed by the codec id.
+FRAME_MARKER = 0
+# The codec id reserved for batch envelopes, see core.cqrs.envelope.
+ENVELOPE_ID = 255
+# The codec id reserved for compressed messages, see core.cqrs.compression.
+COMPRESSED_ID = 254
+
+
+class Codec(ABC):
+    """
+    Encodes the fields of protocol messages to bytes and back.
+
+    Attributes:
+        codec_id (int): The id identifying the codec in framed messages.
+        content_type (str): The media type of the encoded payloads.
+    """
+
+    codec_id: ClassVar[int]
+    content_type: ClassVar[str]
+
+    @abstractmethod
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        """
+        Encodes the fields of a message.
+        """
+
+    @abstractmethod
+    def loads(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Decodes the fields of a message.
+        """
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        """
+        Encodes the fields of a message, framed with the codec id.
+        """
+        return bytes((FRAME_MARKER, self.codec_id)) + self.dumps(data)
+
+
+class JsonCodec(Codec):
+    """
+    The default codec, readable by any consumer.
+
+    Its messages are not framed: a message without frame is JSON, so
+    consumers predating codecs read them, and its content type is implied.
+    """
+
+    codec_id = 0
+    content_type = "application/json"
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return json.dumps(data).encode()
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return self.dumps(data)
+
+    def loads(self, payload: bytes) -> Dict[str, Any]:
+        return json.loads(payload)
+
+
+class BinaryCodec(Codec):
+    """
+    A compact codec of tagged, length-prefixed values, with no dependency.
+
+    It encodes None, booleans, integers, floats, strings, bytes, lists,
+    tuples and dicts, the latter two decoded as lists and dicts. Every value
+    starts with a tag byte, and the tag picks the smallest width holding it:
+    integers take 1, 4 or 8 bytes, and are sent as text beyond; strings,
+    bytes and containers are prefixed with a 1 byte length, or item count,
+    below 256 and a 4 bytes one otherwise. Numbers are big endian.
+
+    Being pure Python, it only saves size: its messages are about 15 to 25%
+    smaller than JSON, but encoding and decoding them costs 1.3 to 4 times
+    the CPU of the C accelerated json module, see benchmarks/bench_codec.py.
+    It suits bandwidth bound links; MsgpackCodec saves both size and CPU.
+    """
+
+    codec_id = 1
+    content_type = "application/x-cqrs-binary"
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        out = bytearray()
+        _write(data, out)
+        return bytes(out)
+
+    def loads(self, payload: bytes) -> Dict[str, Any]:
+        value, _ = _read(payload, 0)
+        return value
+
+
+class MsgpackCodec(Codec):
+    """
+    A compact codec compiled in C, from the optional msgpack package.
+
+    It encodes the values BinaryCodec does, but integers beyond 64 bits, and
+    its messages are both smaller and faster to encode and decode than JSON.
+    It is registered when msgpack is installed; a listener without msgpack
+    rejects its messages with UnknownCodec.
+
+    Raises:
+        ModuleNotFoundError: If msgpack is not installed.
+    """
+
+    codec_id = 2
+    content_type = "application/msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ModuleNotFoundError("MsgpackCodec requires the msgpack package")
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)  # type: ignore
+
+    def loads(self, payload: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)  # type: ignore
+
+
+def _write(value: Any, out: bytearray) -> None:
+    """
+    Appends the binary encoding of value to out, with the writer of its type,
+    or else of the first type it is an instance of.
+
+    Raises:
+        TypeError: If value, or a value it contains, has no binary encoding.
+    """
+    writer = _WRITERS.get(type(value))
+    if writer is None:
+        for kind, writer in _WRITERS.items():
+            if isinstance(value, kind):
+                break
+        else:
+            raise TypeError(
+                f"Object of type {type(value).__name__} has no binary encoding"
+            )
+
+    writer(value, out)
+
+
+def _write_none(_: None, out: bytearray) -> None:
+    out += b"N"
+
+
+def _write_bool(value: bool, out: bytearray) -> None:
+    out += b"T" if value else b"F"
+
+
+def _write_int(value: int, out: bytearray) -> None:
+    if -128 <= value <= 127:
+        out += _TAG_I8.pack(b"c", value)
+    elif -(2**31) <= value < 2**31:
+        out += _TAG_I32.pack(b"i", value)
+    elif -(2**63) <= value < 2**63:
+        out += _TAG_I64.pack(b"q", value)
+    else:
+        _write_sized(b"x", str(value).encode(), out)
+
+
+def _write_float(value: float, out: bytearray) -> None:
+    out += _TAG_F64.pack(b"d", value)
+
+
+def _write_str(value: str, out: bytearray) -> None:
+    _write_sized(b"s", value.encode(), out)
+
+
+def _write_bytes(value: bytes, out: bytearray) -> None:
+    _write_sized(b"b", value, out)
+
+
+def _write_list(value: Sequence[Any], out: bytearray) -> None:
+    _write_count(b"l", len(value), out)
+    for item in value:
+        _write(item, out)
+
+
+def _write_dict(value: Dict[Any, Any], out: bytearray) -> None:
+    _write_count(b"m", len(value), out)
+    for key, item in value.items():
+        _write(key, out)
+        _write(item, out)
+
+
+def _write_count(tag: bytes, count: int, out: bytearray) -> None:
+    """
+    Appends tag and count, with the tag upper cased for a 4 bytes count.
+    """
+    if count < 256:
+        out += _TAG_U8.pack(tag, count)
+    else:
+        out += _TAG_U32.pack(tag.upper(), count)
+
+
+def _write_sized(tag: bytes, data: Any, out: bytearray) -> None:
+    _write_count(tag, len(data), out)
+    out += data
+
+
+def _read(data: bytes, offset: int) -> Tuple[Any, int]:
+    """
+    Decodes the value starting at offset and returns it with the offset after it.
+
+    Raises:
+        ValueError: If data is not a binary encoding.
+    """
+    tag = data[offset]
+    offset += 1
+    kind = _SIZED.get(tag)
+    if kind is not None:
+        if tag in _SHORT:
+            size = data[offset]
+            offset += 1
+        else:
+            (size,) = _U32.unpack_from(data, offset)
+            offset += 4
+
+        if kind == "s":
+            return data[offset : offset + size].decode(), offset + size
+        if kind == "m":
+            mapping = {}
+            for _ in range(size):
+                key, offset = _read(data, offset)
+                mapping[key], offset = _read(data, offset)
+            return mapping, offset
+        if kind == "l":
+            items = []
+            for _ in range(size):
+                item, offset = _read(data, offset)
+                items.append(item)
+            return items, offset
+
+        raw = bytes(data[offset : offset + size])
+        return (raw if kind == "b" else int(raw)), offset + size
+
+    fixed = _FIXED.get(tag)
+    if fixed is not None:
+        width, unpack_from = fixed
+        return unpack_from(data, offset)[0], offset + width
+
+    if tag in _CONSTANTS:
+        return _CONSTANTS[tag], offset
+
+    raise ValueError(f"Unknown binary tag {tag} at offset {offset - 1}")
+
+
+_TAG_U8 = struct.Struct(">cB")
+_TAG_U32 = struct.Struct(">cI")
+_TAG_I8 = struct.Struct(">cb")
+_TAG_I32 = struct.Struct(">ci")
+_TAG_I64 = struct.Struct(">cq")
+_TAG_F64 = struct.Struct(">cd")
+_U32 = struct.Struct(">I")
+
+# The kind of the sized values, by their 1 and 4 bytes size tags.
+_SIZED = {ord(tag): tag.lower() for tag in "sSbBxXlLmM"}
+_SHORT = {ord(tag) for tag in "sbxlm"}
+# The width and the decoder of the fixed width values, by tag.
+_FIXED = {
+    ord(tag): (struct.calcsize(fmt), struct.Struct(fmt).unpack_from)
+    for tag, fmt in (("c", ">b"), ("i", ">i"), ("q", ">q"), ("d", ">d"))
+}
+_CONSTANTS = {ord("N"): None, ord("T"): True, ord("F"): False}
+# The writers of the encodable values, by type. Booleans come before
+# integers, which they are instances of.
+_WRITERS: Dict[type, Callable[[Any, bytearray], None]] = {
+    type(None): _write_none,
+    bool: _write_bool,
+    int: _write_int,
+    float: _write_float,
+    str: _write_str,
+    bytes: _write_bytes,
+    bytearray: _write_bytes,
+    list: _write_list,
+    tuple: _write_list,
+    dict: _write_dict,
+}
+
+
+JSON = JsonCodec()
+BINARY = BinaryCodec()
+# The msgpack codec, None when msgpack is not installed.
+MSGPACK: Optional[Codec] = None if msgpack is None else MsgpackCodec()
+
+_codecs: Dict[int, Codec] = {JSON.codec_id: JSON, BINARY.codec_id: BINARY}
+if MSGPACK is not None:
+    _codecs[MSGPACK.codec_id] = MSGPACK
+
+
+def register_codec(codec: Codec) -> None:
+    """
+    Registers a codec, so that the messages it frames can be decoded.
+
+    Raises:
+        CodecAlreadyRegistered: If another codec is registered with its id,
+            or its id is reserved for envelopes or compressed messages.
+    """
+    registered = _codecs.get(codec.codec_id)
+    if codec.codec_id in (ENVELOPE_ID, COMPRESSED_ID) or (
+        registered is not None and type(registered) is not type(codec)
+    ):
+        raise CodecAlreadyRegistered.for_codec(codec.codec_id)
+
+    _codecs[codec.codec_id] = codec
+
+
+def encode(data: Dict[str, Any], codec: Codec = JSON) -> bytes:
+    """
+    Encodes the fields of a message with codec, framed unless it is JSON.
+    """
+    return codec.encode(data)
+
+
+def decode(message: bytes) -> Dict[str, Any]:
+    """
+    Decodes the fields of a message encoded with any registered codec.
+
+    Raises:
+        UnknownCodec: If the message is framed by an unregistered codec.
+    """
+    if not message or message[0] != FRAME_MARKER:
+        return JSON.loads(message)
+
+    codec = _codecs.get(message[1])
+    if codec is None:
+        raise UnknownCodec.for_codec(message[1])
+
+    return codec.loads(message[2:])
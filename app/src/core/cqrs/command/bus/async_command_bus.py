@@ -0,0 +1,143 @@
+"""
+Module for the asynchronous in-process command bus.
+"""
+
+import asyncio
+from typing import Any, Iterable, List, Optional, Type
+from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.command.command import BaseCommandInterface
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.bus import (
+    DEFAULT_CONCURRENCY,
+    BusInterface,
+    execute_concurrently,
+    group_by_type,
+)
+from core.cqrs.dispatch import DispatchTable
+from core.cqrs.handler import HandlerType
+from core.cqrs.executor import HandlerExecutor
+from core.cqrs.exceptions import CommandAlreadyRegistered
+
+
+class AsyncCommandBus(BusInterface):
+    """
+    An in-process command bus awaiting coroutine handlers.
+
+    Attributes:
+        _handlers (DispatchTable): The command handlers, also dispatched to for
+        the subclasses of their command type.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[QueryCache] = None,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+    ) -> None:
+        """
+        Initializes the bus.
+
+        Args:
+            cache: The query cache invalidated by the executed commands, see
+                BaseCommandInterface.invalidates.
+            executor: Runs the handlers according to their execution policy,
+                see core.cqrs.executor.
+        """
+        self._handlers = DispatchTable()
+        self._cache = cache
+        self._executor = executor or HandlerExecutor()
+
+    def register_handler(
+        self, cq: Type[BaseCommandInterface], handler: HandlerType
+    ) -> None:
+        """
+        Registers a command handler for a specific command type.
+
+        Args:
+            cq (Type[BaseCommandInterface]): The command type to register the handler for.
+            handler (HandlerType): The handler, or coroutine function, to register.
+
+        Raises:
+            CommandAlreadyRegistered: If a handler is already registered for the command type.
+        """
+        if cq in self._handlers.registered:
+            raise CommandAlreadyRegistered.for_command(cq.__name__)
+
+        self._handlers.register(cq, handler)
+
+    async def execute(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cq: BaseCommandInterface
+    ) -> None:
+        """
+        Execute a command by awaiting its registered handler.
+
+        Args:
+            cq (BaseCommandInterface): The command to execute.
+
+        Raises:
+            HandlerNotFound: If no handler is registered for the command type.
+        """
+        if self._handlers.find(type(cq)) is None:
+            raise HandlerNotFound.for_command(cq)
+
+        await self._handle(cq)
+
+        if self._cache is not None:
+            self._cache.invalidate_for(cq)
+
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[BaseCommandInterface]
+    ) -> List[None]:
+        """
+        Execute commands grouped by type.
+
+        Batch-aware handlers receive each group in a single handle_many call,
+        other handlers are executed concurrently once per command, both
+        according to the execution policy of the handler.
+
+        Args:
+            cqs (Iterable[BaseCommandInterface]): The commands to execute.
+
+        Raises:
+            HandlerNotFound: If a command has no handler, before any is executed.
+        """
+        cqs = list(cqs)
+        for cq in cqs:
+            if self._handlers.find(type(cq)) is None:
+                raise HandlerNotFound.for_command(cq)
+
+        for cq_type, (_, batch) in group_by_type(cqs).items():
+            handler: Any = self._handlers[cq_type]
+            if hasattr(handler, "handle_many"):
+                await self._executor.run_many(handler, batch)
+            else:
+                await asyncio.gather(*(self._handle(cq) for cq in batch))
+
+        if self._cache is not None:
+            self._cache.invalidate_for(*cqs)
+
+        return [None] * len(cqs)
+
+    async def execute_concurrently(
+        self,
+        cqs: Iterable[BaseCommandInterface],
+        limit: int = DEFAULT_CONCURRENCY,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Execute commands concurrently, at most limit at a time.
+
+        Args:
+            cqs (Iterable[BaseCommandInterface]): The commands to execute.
+            limit (int): The maximum number of commands in flight.
+            return_exceptions (bool): Whether the exceptions raised are
+                returned in place of the results, instead of raised.
+
+        Returns:
+            List[Any]: None for every executed command, or the exception
+            it raised when return_exceptions is set.
+        """
+        return await execute_concurrently(self.execute, cqs, limit, return_exceptions)
+
+    async def _handle(self, cq: BaseCommandInterface) -> None:
+        await self._executor.run(self._handlers[type(cq)], cq)
@@ -3,13 +3,21 @@ Module for asynchronous command bus implementation using RabbitMQ.
 """
 
 from abc import ABC
-from typing import Type, TypeVar, Any, Dict, Union
+from typing import Iterable, List, Type, TypeVar, Any, Dict, Optional, Union
+from core.di import Container
 from core.cqrs.async_rabbitmq_bus import RabbitMQBusInterface
 from core.cqrs.command.command import BaseCommandInterface
 from core.cqrs.handler import HandlerInterface
 from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.executor import HandlerExecutor
 from core.broker.rabbitmq import RabbitMQBroker
 from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.envelope import Batcher
+from core.cqrs.message_types import TYPES
+from core.cqrs.codec import JSON, Codec
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.bus import group_by_type
+from core.cqrs.registry import COMMAND, fqdn_of, HandlerRegistry
 
 T = TypeVar("T", bound=BaseCommandInterface)  # pylint: disable=invalid-name
 H = TypeVar("H", bound=HandlerInterface)  # pylint: disable=invalid-name
@@ -20,16 +28,39 @@ class RabbitMQCommandBus(RabbitMQBusInterface[T, H, None], ABC):
     Asynchronous command bus that uses RabbitMQ as the broker interface.
     """
 
-    def __init__(self, broker: RabbitMQBroker):
+    handler_kind = COMMAND
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        broker: RabbitMQBroker,
+        container: Optional[Container] = None,
+        registry: Optional[HandlerRegistry] = None,
+        cache: Optional[QueryCache] = None,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+        codec: Codec = JSON,
+        batcher: Optional[Batcher] = None,
+    ):
         """
         Initializes the RabbitMQ command bus.
 
         Args:
             broker: The RabbitMQ broker instance.
+            container: The container to open a scope from for each received command.
+            registry: The registry to load command handlers from on demand.
+            cache: The query cache invalidated by the sent commands.
+            executor: Runs the handlers of the received commands, see core.cqrs.executor.
+            codec: Encodes the sent messages, see core.cqrs.codec. Received
+                messages are decoded whatever the codec they were sent with.
+            batcher: When given, the sent commands are packed in batch
+                envelopes, see core.cqrs.envelope.
         """
         self.broker = broker
         self.handlers: Dict[str, Any] = {}
-        super().__init__(self.broker)
+        super().__init__(
+            self.broker, container, registry, cache, executor=executor, codec=codec
+        )
+        self.batcher = batcher
 
     async def execute(  # pyright: ignore
         self, cq: T  # pylint: disable=arguments-renamed # pyright: ignore
@@ -40,13 +71,69 @@ class RabbitMQCommandBus(RabbitMQBusInterface[T, H, None], ABC):
         :param command: The command to execute.
         """
         fqdn = ".".join([cq.__module__, cq.__class__.__name__])
-        if fqdn not in self.handlers:
+        if not self._has_handler(fqdn):
             raise HandlerNotFound.for_command(cq)
 
         ap = AsyncProtocol.from_cq(cq)
-        await self.broker.send(fqdn, ap.to_json())
+        await self._send(fqdn, ap.to_bytes(self.codec))
+        if self.cache is not None:
+            self.cache.invalidate_for(cq)
         return ap.uuid
 
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[T]  # pylint: disable=arguments-renamed # pyright: ignore
+    ) -> List[str]:
+        """
+        Execute commands asynchronously, sending each type in a single batch.
+
+        Every command is checked for a handler before any is sent. With a
+        batcher, the commands of each type are packed in as few envelopes as
+        its limits allow, and sent before returning.
+
+        :param cqs: The commands to execute.
+        :return: The uuids of the sent commands, in order.
+        """
+        cqs = list(cqs)
+        groups = group_by_type(cqs)
+        for cq_type, (_, batch) in groups.items():
+            if not self._has_handler(fqdn_of(cq_type)):
+                raise HandlerNotFound.for_command(batch[0])
+
+        uuids: List[str] = [""] * len(cqs)
+        for cq_type, (indexes, batch) in groups.items():
+            aps = [AsyncProtocol.from_cq(cq) for cq in batch]
+            messages = [ap.to_bytes(self.codec) for ap in aps]
+            if self.batcher is None:
+                await self.broker.send_many(fqdn_of(cq_type), messages)
+            else:
+                for message in messages:
+                    await self.batcher.add(self.broker.send, fqdn_of(cq_type), message)
+                await self.batcher.flush(fqdn_of(cq_type))
+            for index, ap in zip(indexes, aps):
+                uuids[index] = ap.uuid
+
+        if self.cache is not None:
+            self.cache.invalidate_for(*cqs)
+
+        return uuids
+
+    async def flush(self) -> None:
+        """
+        Sends the commands held by the batcher, if any. Call it before
+        shutting down, so that no command is left unsent.
+        """
+        if self.batcher is not None:
+            await self.batcher.flush()
+
+    async def _send(self, fqdn: str, message: bytes) -> None:
+        """
+        Sends a message, through the batcher when one is set.
+        """
+        if self.batcher is None:
+            await self.broker.send(fqdn, message)
+        else:
+            await self.batcher.add(self.broker.send, fqdn, message)
+
     async def register_handler(  # pyright: ignore
         self,
         cq: Type[T],  # pylint: disable=arguments-renamed
@@ -59,7 +146,7 @@ class RabbitMQCommandBus(RabbitMQBusInterface[T, H, None], ABC):
             command: The type of command to register the handler for.
             handler: The handler to register for the command.
         """
-        fqdn = ".".join([cq.__module__, cq.__name__])
+        fqdn = TYPES.register(cq)
         self.handlers[fqdn] = handler
 
     async def listen(self) -> None:
@@ -2,11 +2,15 @@
 Module for handling simple command bus operations.
 """
 
-from typing import Dict, Type
+import functools
+from typing import Iterable, List, Optional, Sequence, Type
 from core.cqrs.exceptions import HandlerNotFound
 from core.cqrs.command.command import BaseCommandInterface
-from core.cqrs.bus import BusInterface
-from core.cqrs.handler import HandlerType
+from core.cqrs.bus import BusInterface, execute_grouped
+from core.cqrs.dispatch import DispatchTable
+from core.cqrs.handler import HandlerType, handle_many
+from core.cqrs.middleware import MiddlewareType, compose
+from core.cqrs.query.cache import QueryCache
 from core.cqrs.exceptions import CommandAlreadyRegistered
 
 
@@ -15,12 +19,29 @@ class SimpleCommandBus(BusInterface):
     A simple implementation of the Command Bus pattern.
 
     Attributes:
-        _handlers (Dict[Type[BaseCommandInterface], BaseCommandInterface]):
-        A dictionary of command handlers.
+        _handlers (DispatchTable): The command handlers, wrapped in the bus
+        middlewares, also dispatched to for the subclasses of their command type.
     """
 
-    def __init__(self) -> None:
-        self._handlers: Dict[Type[BaseCommandInterface], HandlerType] = {}
+    def __init__(
+        self,
+        middlewares: Optional[Sequence[MiddlewareType]] = None,
+        cache: Optional[QueryCache] = None,
+    ) -> None:
+        """
+        Initializes the bus.
+
+        Args:
+            middlewares: The middlewares wrapping every handler, the first
+                one being the outermost. They are composed once per command
+                type, when its handler is registered.
+            cache: The query cache invalidated by the executed commands, see
+                BaseCommandInterface.invalidates.
+        """
+        self._middlewares = tuple(middlewares or ())
+        self._cache = cache
+        self._handlers = DispatchTable()
+        self._batches = DispatchTable()
 
     def register_handler(
         self, cq: Type[BaseCommandInterface], handler: HandlerType
@@ -32,10 +53,13 @@ class SimpleCommandBus(BusInterface):
             cq (Type[BaseCommandInterface]): The command type to register a handler for.
             handler (CommandHandlerType): The handler function to register.
         """
-        if cq in self._handlers:
+        if cq in self._handlers.registered:
             raise CommandAlreadyRegistered.for_command(cq.__name__)
 
-        self._handlers[cq] = handler
+        chain = compose(handler, self._middlewares)
+        self._handlers.register(cq, chain)
+        # Without middlewares, the chain is the handler and keeps its handle_many
+        self._batches.register(cq, functools.partial(handle_many, chain))
 
     def execute(self, cq: BaseCommandInterface) -> None:
         """
@@ -47,8 +71,39 @@ class SimpleCommandBus(BusInterface):
         Raises:
             HandlerNotFound: If no handler is registered for the command.
         """
-        if type(cq) not in self._handlers:
-            raise HandlerNotFound.for_command(cq)
+        try:
+            handler = self._handlers[type(cq)]
+        except KeyError:
+            raise HandlerNotFound.for_command(cq) from None
 
-        handler = self._handlers[type(cq)]
         handler(cq)
+
+        if self._cache is not None:
+            self._cache.invalidate_for(cq)
+
+    def execute_many(self, cqs: Iterable[BaseCommandInterface]) -> List[None]:
+        """
+        Execute commands grouped by type, each group in a single handler call.
+
+        Batch-aware handlers receive the whole group in handle_many, other
+        handlers are called once per command. When the bus has middlewares,
+        they wrap every command on its own, so the handler is called once per
+        command too.
+
+        Args:
+            cqs (Iterable[BaseCommandInterface]): The commands to execute.
+
+        Raises:
+            HandlerNotFound: If a command has no handler, before any is executed.
+        """
+        cqs = list(cqs)
+        for cq in cqs:
+            if self._batches.find(type(cq)) is None:
+                raise HandlerNotFound.for_command(cq)
+
+        results = execute_grouped(cqs, self._batches.__getitem__)
+
+        if self._cache is not None:
+            self._cache.invalidate_for(*cqs)
+
+        return results
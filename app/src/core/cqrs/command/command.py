@@ -1,13 +1,24 @@
 """Module containing base interfaces for commands."""
 
+from typing import ClassVar, Tuple
+
 
 class BaseCommandInterface:  # pylint: disable=too-few-public-methods
     """Base interface for commands."""
 
+    __slots__ = ()
+
+    # The query types whose cached results the command makes stale.
+    invalidates: ClassVar[Tuple[type, ...]] = ()
+
 
 class CommandInterface(BaseCommandInterface):  # pylint: disable=too-few-public-methods
     """Base interface for commands."""
 
+    __slots__ = ()
+
 
 class CommandResponseInterface:  # pylint: disable=too-few-public-methods
     """Interface for command responses."""
+
+    __slots__ = ()
@@ -0,0 +1,156 @@
+"""
+Module for the compression of large protocol messages.
+
+A bus compresses its messages by encoding them with a Compressed codec,
+which wraps the codec of the bus. Only the messages reaching the size
+threshold are compressed, so small messages cost no CPU. A compressed
+message is framed like the messages of a codec, see core.cqrs.codec,
+behind the id reserved for compressed messages and the id of its
+compressor, and AsyncProtocol.from_bytes decompresses it before decoding:
+listeners read compressed and plain messages alike.
+
+The zlib compressor is registered by default. Other compressors are plugged
+in by subclassing Compressor with an unused compressor id and registering an
+instance on every listener with register_compressor.
+"""
+
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, ClassVar, Dict
+from core.cqrs.codec import COMPRESSED_ID, FRAME_MARKER, JSON, Codec
+from core.cqrs.exceptions import CompressorAlreadyRegistered, UnknownCompressor
+
+# The size from which messages are compressed by default, as compressing
+# smaller ones saves little and costs a round of CPU each.
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+_HEADER = bytes((FRAME_MARKER, COMPRESSED_ID))
+
+
+class Compressor(ABC):
+    """
+    Compresses encoded messages.
+
+    Attributes:
+        compressor_id (int): The id identifying the compressor in messages.
+    """
+
+    compressor_id: ClassVar[int]
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compresses an encoded message.
+        """
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompresses an encoded message.
+        """
+
+
+class ZlibCompressor(Compressor):
+    """
+    The default compressor, from the standard library.
+
+    Args:
+        level: The zlib compression level, from 1, the fastest, to 9, the
+            smallest.
+    """
+
+    compressor_id = 0
+
+    def __init__(self, level: int = zlib.Z_DEFAULT_COMPRESSION) -> None:
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+ZLIB = ZlibCompressor()
+
+_compressors: Dict[int, Compressor] = {ZLIB.compressor_id: ZLIB}
+
+
+def register_compressor(compressor: Compressor) -> None:
+    """
+    Registers a compressor, so that the messages it compresses can be read.
+
+    Raises:
+        CompressorAlreadyRegistered: If another compressor is registered with its id.
+    """
+    registered = _compressors.get(compressor.compressor_id)
+    if registered is not None and type(registered) is not type(compressor):
+        raise CompressorAlreadyRegistered.for_compressor(compressor.compressor_id)
+
+    _compressors[compressor.compressor_id] = compressor
+
+
+def compress(message: bytes, compressor: Compressor = ZLIB) -> bytes:
+    """
+    Returns the compressed frame of an encoded message.
+    """
+    return _HEADER + bytes((compressor.compressor_id,)) + compressor.compress(message)
+
+
+def decompress(message: bytes) -> bytes:
+    """
+    Returns the encoded message of a compressed frame, or the message itself
+    if it is not compressed.
+
+    Raises:
+        UnknownCompressor: If the message is compressed by an unregistered
+            compressor.
+    """
+    if message[:2] != _HEADER:
+        return message
+
+    compressor = _compressors.get(message[2])
+    if compressor is None:
+        raise UnknownCompressor.for_compressor(message[2])
+
+    return compressor.decompress(message[3:])
+
+
+class Compressed(Codec):
+    """
+    Wraps a codec, compressing the messages it encodes from a size threshold.
+
+    A message is sent compressed only if it gets smaller, so payloads which
+    do not compress, such as already compressed blobs, are sent as is.
+
+    Args:
+        codec: The codec encoding the messages before compression.
+        compressor: The compressor of the messages.
+        threshold: The size in bytes from which messages are compressed.
+    """
+
+    def __init__(
+        self,
+        codec: Codec = JSON,
+        compressor: Compressor = ZLIB,
+        threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    ) -> None:
+        self.codec = codec
+        self.compressor = compressor
+        self.threshold = threshold
+        self.codec_id = codec.codec_id  # type: ignore
+        self.content_type = codec.content_type  # type: ignore
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return self.codec.dumps(data)
+
+    def loads(self, payload: bytes) -> Dict[str, Any]:
+        return self.codec.loads(payload)
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        message = self.codec.encode(data)
+        if len(message) < self.threshold:
+            return message
+
+        compressed = compress(message, self.compressor)
+        return compressed if len(compressed) < len(message) else message
@@ -0,0 +1,49 @@
+"""
+Module containing the type-hierarchy-aware dispatch table of the buses.
+"""
+
+from typing import Any, Dict, Optional, Type
+
+
+class DispatchTable(dict):
+    """
+    Maps message types to the value registered for them or, failing that,
+    for their closest registered base class in method resolution order.
+
+    The table is indexed by concrete type: the first lookup of a type walks
+    its MRO and stores the result, so later lookups are plain dict hits.
+    Registering a value drops the stored results, since it may shadow the
+    base class they were resolved from.
+
+    Attributes:
+        registered (Dict[Type, Any]): The values registered, by type.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.registered: Dict[Type, Any] = {}
+
+    def register(self, cq_type: Type, value: Any) -> None:
+        """
+        Registers value for cq_type and its subclasses without a closer value.
+        """
+        self.registered[cq_type] = value
+        self.clear()
+        self[cq_type] = value
+
+    def find(self, cq_type: Type) -> Optional[Any]:
+        """
+        Returns the value dispatched to for cq_type, or None.
+        """
+        try:
+            return self[cq_type]
+        except KeyError:
+            return None
+
+    def __missing__(self, cq_type: Type) -> Any:
+        for base in getattr(cq_type, "__mro__", ()):
+            if base in self.registered:
+                value = self[cq_type] = self.registered[base]
+                return value
+
+        raise KeyError(cq_type)
@@ -0,0 +1,172 @@
+"""
+Module for the batch envelopes packing several messages in one broker record.
+
+An envelope is framed like the messages of a codec, see core.cqrs.codec,
+behind the id reserved for envelopes, followed by the number of messages
+and each message prefixed with its length. The messages keep their own
+codec and fields, deadlines included, and listeners unpack envelopes
+before handling their messages one by one.
+
+A Batcher fills the envelopes of a bus: the messages sent to a destination
+are held until they fill an envelope, or until the linger time of the first
+one has passed, then sent as a single record.
+"""
+
+import asyncio
+import functools
+import logging
+import struct
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+from core.cqrs.codec import ENVELOPE_ID, FRAME_MARKER
+
+# The bytes starting every envelope, followed by the number of messages.
+ENVELOPE_HEADER = bytes((FRAME_MARKER, ENVELOPE_ID))
+# The default size of an envelope, small enough for the default record and
+# frame size limits of Kafka and RabbitMQ.
+DEFAULT_ENVELOPE_BYTES = 64 * 1024
+# The default seconds a message waits for others to fill its envelope.
+DEFAULT_LINGER = 0.005
+
+_U32 = struct.Struct(">I")
+
+
+def pack(messages: Sequence[bytes]) -> bytes:
+    """
+    Returns the envelope of messages.
+    """
+    parts = [ENVELOPE_HEADER, _U32.pack(len(messages))]
+    for message in messages:
+        parts.append(_U32.pack(len(message)))
+        parts.append(message)
+
+    return b"".join(parts)
+
+
+def unpack(message: bytes) -> List[bytes]:
+    """
+    Returns the messages of an envelope, or the message itself if it is not
+    an envelope.
+
+    Raises:
+        ValueError: If the envelope is truncated.
+    """
+    if message[:2] != ENVELOPE_HEADER:
+        return [message]
+
+    view = memoryview(message)
+    (count,) = _U32.unpack_from(view, 2)
+    offset = 2 + _U32.size
+    messages = []
+    for _ in range(count):
+        (size,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        if offset + size > len(view):
+            raise ValueError(f"Truncated envelope of {count} messages")
+
+        messages.append(bytes(view[offset : offset + size]))
+        offset += size
+
+    return messages
+
+
+def envelope_size(sizes: Sequence[int]) -> int:
+    """
+    Returns the size of the envelope of messages of the given sizes.
+    """
+    return len(ENVELOPE_HEADER) + _U32.size * (len(sizes) + 1) + sum(sizes)
+
+
+class Batcher:
+    """
+    Fills the envelopes of the messages sent to each destination.
+
+    The messages of a destination are sent when the next one would make
+    their envelope exceed max_bytes or max_messages, and at the latest
+    linger seconds after the first of them was added. A lone message is sent
+    as is rather than in an envelope.
+
+    Args:
+        max_bytes: The maximum size of an envelope. Larger messages are sent
+            on their own.
+        max_messages: The maximum number of messages of an envelope.
+        linger: The seconds a message waits for others; only flush sends
+            the messages when None. As nobody awaits the sends the linger
+            time triggers, their failures are logged.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_ENVELOPE_BYTES,
+        max_messages: int = 1000,
+        linger: Optional[float] = DEFAULT_LINGER,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.linger = linger
+        self._pending: Dict[str, List[bytes]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._senders: Dict[str, Callable[[str, bytes], Awaitable[None]]] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return sum(len(messages) for messages in self._pending.values())
+
+    async def add(
+        self,
+        send: Callable[[str, bytes], Awaitable[None]],
+        fqdn: str,
+        message: bytes,
+    ) -> None:
+        """
+        Adds a message for fqdn, sent later with send.
+        """
+        pending = self._pending.get(fqdn)
+        if pending is not None and (
+            len(pending) >= self.max_messages
+            or self._sizes[fqdn] + _U32.size + len(message) > self.max_bytes
+        ):
+            await self.flush(fqdn)
+            pending = None
+
+        if pending is None:
+            pending = self._pending[fqdn] = []
+            self._sizes[fqdn] = envelope_size(())
+            self._senders[fqdn] = send
+            if self.linger is not None:
+                timer = asyncio.create_task(self._linger(fqdn))
+                timer.add_done_callback(functools.partial(self._done, fqdn))
+                self._timers[fqdn] = timer
+
+        pending.append(message)
+        self._sizes[fqdn] += _U32.size + len(message)
+
+    async def flush(self, fqdn: Optional[str] = None) -> None:
+        """
+        Sends the pending messages of fqdn, or of every destination.
+        """
+        for destination in [fqdn] if fqdn is not None else list(self._pending):
+            timer = self._timers.pop(destination, None)
+            if timer is not None and timer is not asyncio.current_task():
+                timer.cancel()
+
+            messages = self._pending.pop(destination, None)
+            self._sizes.pop(destination, None)
+            send = self._senders.pop(destination, None)
+            if not messages or send is None:
+                continue
+
+            await send(
+                destination, messages[0] if len(messages) == 1 else pack(messages)
+            )
+
+    async def _linger(self, fqdn: str) -> None:
+        await asyncio.sleep(self.linger)  # type: ignore
+        await self.flush(fqdn)
+
+    @staticmethod
+    def _done(fqdn: str, timer: asyncio.Task) -> None:
+        # Nobody awaits the timers, so the failures of their sends are logged
+        if not timer.cancelled() and timer.exception() is not None:
+            logging.error(
+                "Sending the messages of %s failed", fqdn, exc_info=timer.exception()
+            )
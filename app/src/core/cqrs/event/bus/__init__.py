@@ -0,0 +1,5 @@
+"""
+Module for event bus implementations.
+"""
+
+from core.cqrs.event.bus.async_event_bus import AsyncEventBus
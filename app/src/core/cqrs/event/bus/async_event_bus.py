@@ -0,0 +1,111 @@
+"""
+Module for the asynchronous in-process event bus.
+"""
+
+import logging
+from typing import Any, Iterable, List, Optional, Type
+from core.cqrs.bus import DEFAULT_CONCURRENCY, BusInterface, execute_concurrently
+from core.cqrs.event.event import EventInterface
+from core.cqrs.event.subscribers import Subscribers
+from core.cqrs.executor import HandlerExecutor
+from core.cqrs.handler import HandlerType
+
+
+class AsyncEventBus(BusInterface):
+    """
+    An in-process event bus delivering each event to all its subscribers.
+
+    Subscribers of an event run concurrently, at most limit at a time, and
+    are isolated from each other: an exception raised by one is logged and
+    returned, and does not prevent the others from handling the event.
+    """
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_CONCURRENCY,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+    ) -> None:
+        """
+        Initializes the bus.
+
+        Args:
+            limit: The maximum number of subscribers handling an event at once.
+            executor: Runs the subscribers according to their execution policy,
+                see core.cqrs.executor.
+        """
+        self.limit = limit
+        self._subscribers = Subscribers()
+        self._executor = executor or HandlerExecutor()
+
+    def subscribe(
+        self,
+        event_type: Type[EventInterface],
+        handler: HandlerType,
+        name: Optional[str] = None,
+    ) -> str:
+        """
+        Subscribes a handler to an event type and its subclasses.
+
+        Args:
+            event_type (Type[EventInterface]): The event type to subscribe to.
+            handler (HandlerType): The handler, or coroutine function, to subscribe.
+            name (Optional[str]): The subscriber name, the qualified name of the
+                handler by default.
+
+        Returns:
+            str: The subscriber name.
+
+        Raises:
+            SubscriberAlreadyRegistered: If the name is already subscribed to the event type.
+        """
+        return self._subscribers.add(event_type, handler, name)
+
+    def register_handler(self, cq: Type[EventInterface], handler: HandlerType) -> None:
+        """
+        Subscribes a handler to an event type, see subscribe.
+        """
+        self.subscribe(cq, handler)
+
+    async def execute(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cq: EventInterface
+    ) -> List[BaseException]:
+        """
+        Publishes an event to all its subscribers and waits for them.
+
+        Args:
+            cq (EventInterface): The event to publish.
+
+        Returns:
+            List[BaseException]: The exceptions raised by the failed subscribers.
+        """
+        subscribers = self._subscribers.for_type(type(cq))
+
+        async def deliver(subscriber: Any) -> Any:
+            return await self._executor.run(subscriber[1], cq)
+
+        results = await execute_concurrently(
+            deliver, subscribers, self.limit, return_exceptions=True
+        )
+
+        failures = []
+        for (name, _), result in zip(subscribers, results):
+            if isinstance(result, BaseException):
+                logging.error(
+                    "Subscriber %s failed to handle %s", name, cq, exc_info=result
+                )
+                failures.append(result)
+
+        return failures
+
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[EventInterface]
+    ) -> List[List[BaseException]]:
+        """
+        Publishes events one after the other, preserving their order for
+        every subscriber.
+
+        Returns:
+            List[List[BaseException]]: The exceptions raised for each event.
+        """
+        return [await self.execute(cq) for cq in cqs]
@@ -0,0 +1,154 @@
+"""
+Module for asynchronous event bus implementation using Kafka.
+"""
+
+import asyncio
+import logging
+from abc import ABC
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar
+from core.di import Container
+from core.broker.kafka import KafkaBroker
+from core.cqrs.async_kafka_bus import KafkaBusInterface
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.message_types import TYPES
+from core.cqrs.codec import JSON, Codec
+from core.cqrs.bus import group_by_type
+from core.cqrs.event.event import EventInterface
+from core.cqrs.event.subscribers import Subscribers
+from core.cqrs.executor import HandlerExecutor
+from core.cqrs.handler import HandlerInterface
+from core.cqrs.registry import fqdn_of
+
+T = TypeVar("T", bound=EventInterface)  # pylint: disable=invalid-name
+H = TypeVar("H", bound=HandlerInterface)  # pylint: disable=invalid-name
+
+
+class KafkaEventBus(KafkaBusInterface[T, H, None], ABC):
+    """
+    Asynchronous event bus that uses Kafka as the broker interface.
+
+    Every subscriber consumes the topics of its events in a consumer group
+    of its own, named after it, so each one receives every event and commits
+    its own offsets: a slow subscriber falls behind without holding back the
+    others. Instances of the bus sharing a subscriber share its partitions.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        broker: KafkaBroker,
+        container: Optional[Container] = None,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+        poll_timeout: float = 1.0,
+        codec: Codec = JSON,
+    ):
+        """
+        Initializes the Kafka event bus.
+
+        Args:
+            broker: The Kafka broker instance.
+            container: The container to open a scope from for each received event.
+            executor: Runs the subscribers according to their execution policy.
+            poll_timeout: The seconds a subscriber waits for new events per poll.
+            codec: Encodes the sent messages, see core.cqrs.codec. Received
+                messages are decoded whatever the codec they were sent with.
+        """
+        super().__init__(broker, container, executor=executor, codec=codec)
+        self.subscribers = Subscribers()
+        self.poll_timeout = poll_timeout
+
+    def subscribe(
+        self, event_type: Type[T], handler: H, name: Optional[str] = None
+    ) -> str:
+        """
+        Subscribes a handler to an event type and returns its subscriber name,
+        the qualified name of the handler by default.
+        """
+        TYPES.register(event_type)
+        return self.subscribers.add(event_type, handler, name)
+
+    async def register_handler(  # pyright: ignore
+        self,
+        cq: Type[T],  # pylint: disable=arguments-renamed
+        handler: H,  # pyright: ignore
+    ) -> None:  # pylint: disable=arguments-renamed # pyright: ignore
+        """
+        Subscribes a handler to an event type, see subscribe.
+        """
+        self.subscribe(cq, handler)
+
+    async def execute(  # pyright: ignore
+        self, cq: T  # pylint: disable=arguments-renamed # pyright: ignore
+    ) -> str:
+        """
+        Publishes an event to the topic of its type.
+
+        :param cq: The event to publish.
+        :return: The uuid of the published event.
+        """
+        ap = AsyncProtocol.from_cq(cq)
+        await self.broker.send(fqdn_of(type(cq)), ap.to_bytes(self.codec))
+        return ap.uuid
+
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[T]  # pylint: disable=arguments-renamed # pyright: ignore
+    ) -> List[str]:
+        """
+        Publishes events, sending each type in a single batch.
+
+        :param cqs: The events to publish.
+        :return: The uuids of the published events, in order.
+        """
+        cqs = list(cqs)
+        uuids: List[str] = [""] * len(cqs)
+        for cq_type, (indexes, batch) in group_by_type(cqs).items():
+            aps = [AsyncProtocol.from_cq(cq) for cq in batch]
+            await self.broker.send_many(
+                fqdn_of(cq_type), [ap.to_bytes(self.codec) for ap in aps]
+            )
+            for index, ap in zip(indexes, aps):
+                uuids[index] = ap.uuid
+
+        return uuids
+
+    async def listen(self) -> None:
+        """
+        Consumes the events of every subscriber, each in its own consumer group.
+        """
+        groups: Dict[str, Dict[str, Any]] = {}
+        for event_type, name, handler in self.subscribers:
+            groups.setdefault(name, {})[fqdn_of(event_type)] = handler
+
+        await asyncio.gather(
+            *(self._consume(name, handlers) for name, handlers in groups.items())
+        )
+
+    async def _consume(self, name: str, handlers: Dict[str, Any]) -> None:
+        """
+        Delivers the events of a subscriber, committing each polled batch.
+        """
+        consumer = self.broker.consumer(list(handlers), name)
+        timeout_ms = int(self.poll_timeout * 1000)
+        try:
+            while True:
+                # The consumer blocks while polling, keep it off the event loop
+                records = await asyncio.to_thread(consumer.poll, timeout_ms)
+                for partition_records in records.values():
+                    for record in partition_records:
+                        await self._deliver(name, handlers[record.topic], record.value)
+
+                if records:
+                    consumer.commit()
+        finally:
+            consumer.close()
+
+    async def _deliver(self, name: str, handler: Any, message: Any) -> None:
+        """
+        Dispatches an event to a subscriber, logging its failure if any.
+        """
+        ap = AsyncProtocol.from_bytes(message)
+        cq = ap.to_cq()
+        try:
+            await self._dispatch(handler, cq, ap.uuid)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception("Subscriber %s failed to handle %s", name, cq)
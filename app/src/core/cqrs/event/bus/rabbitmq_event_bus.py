@@ -0,0 +1,159 @@
+"""
+Module for asynchronous event bus implementation using RabbitMQ.
+"""
+
+import asyncio
+import logging
+from abc import ABC
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar
+from core.di import Container
+from core.broker.rabbitmq import RabbitMQBroker
+from core.cqrs.async_rabbitmq_bus import RabbitMQBusInterface
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.message_types import TYPES
+from core.cqrs.codec import JSON, Codec
+from core.cqrs.event.event import EventInterface
+from core.cqrs.event.subscribers import Subscribers
+from core.cqrs.executor import HandlerExecutor
+from core.cqrs.handler import HandlerInterface
+from core.cqrs.registry import fqdn_of
+
+T = TypeVar("T", bound=EventInterface)  # pylint: disable=invalid-name
+H = TypeVar("H", bound=HandlerInterface)  # pylint: disable=invalid-name
+
+
+class RabbitMQEventBus(RabbitMQBusInterface[T, H, None], ABC):
+    """
+    Asynchronous event bus that uses RabbitMQ as the broker interface.
+
+    Events are published to a fanout exchange per event type. Every
+    subscriber has a durable queue of its own, named after it and bound to
+    the exchanges of its events, and acknowledges each event once handled:
+    a slow subscriber accumulates its own backlog without holding back the
+    others. Instances of the bus sharing a subscriber share its queue.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        broker: RabbitMQBroker,
+        container: Optional[Container] = None,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+        codec: Codec = JSON,
+    ):
+        """
+        Initializes the RabbitMQ event bus.
+
+        Args:
+            broker: The RabbitMQ broker instance.
+            container: The container to open a scope from for each received event.
+            executor: Runs the subscribers according to their execution policy.
+            codec: Encodes the sent messages, see core.cqrs.codec. Received
+                messages are decoded whatever the codec they were sent with.
+        """
+        super().__init__(broker, container, executor=executor, codec=codec)
+        self.subscribers = Subscribers()
+
+    def subscribe(
+        self, event_type: Type[T], handler: H, name: Optional[str] = None
+    ) -> str:
+        """
+        Subscribes a handler to an event type and returns its subscriber name,
+        the qualified name of the handler by default.
+        """
+        TYPES.register(event_type)
+        return self.subscribers.add(event_type, handler, name)
+
+    async def register_handler(  # pyright: ignore
+        self,
+        cq: Type[T],  # pylint: disable=arguments-renamed
+        handler: H,  # pyright: ignore
+    ) -> None:  # pylint: disable=arguments-renamed # pyright: ignore
+        """
+        Subscribes a handler to an event type, see subscribe.
+        """
+        self.subscribe(cq, handler)
+
+    async def execute(  # pyright: ignore
+        self, cq: T  # pylint: disable=arguments-renamed # pyright: ignore
+    ) -> str:
+        """
+        Publishes an event to the exchange of its type.
+
+        :param cq: The event to publish.
+        :return: The uuid of the published event.
+        """
+        ap = AsyncProtocol.from_cq(cq)
+        await self.broker.broadcast(fqdn_of(type(cq)), ap.to_bytes(self.codec))
+        return ap.uuid
+
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[T]  # pylint: disable=arguments-renamed # pyright: ignore
+    ) -> List[str]:
+        """
+        Publishes events in order.
+
+        :param cqs: The events to publish.
+        :return: The uuids of the published events, in order.
+        """
+        return [await self.execute(cq) for cq in cqs]
+
+    async def listen(self) -> None:
+        """
+        Consumes the events of every subscriber, each from its own queue.
+        """
+        await self.broker.connect()
+
+        if self.broker.connection is None:
+            raise BrokenPipeError("RabbitMQ not connected")
+
+        groups: Dict[str, Dict[str, Any]] = {}
+        for event_type, name, handler in self.subscribers:
+            groups.setdefault(name, {})[fqdn_of(event_type)] = handler
+
+        try:
+            await asyncio.gather(
+                *(self._consume(name, handlers) for name, handlers in groups.items())
+            )
+        except asyncio.CancelledError:
+            # Gracefully handle generator closure
+            await self.broker.connection["protocol"].close()
+            self.broker.connection["transport"].close()
+            raise
+
+    async def _consume(self, name: str, handlers: Dict[str, Any]) -> None:
+        """
+        Delivers the events of a subscriber, acknowledging each once handled.
+        """
+        channel = await self.broker.connection["protocol"].channel()  # pyright: ignore
+        queue_name = name + "#Events"
+        await channel.queue_declare(queue_name=queue_name, durable=True)
+        for exchange in handlers:
+            await channel.exchange_declare(exchange, "fanout", durable=True)
+            await channel.queue_bind(queue_name, exchange, "")
+
+        message_queue: asyncio.Queue = asyncio.Queue()
+
+        async def callback(
+            channel, body, envelope, properties
+        ):  # pylint: disable=unused-argument; pyright: ignore
+            """Callback to handle incoming messages."""
+            await message_queue.put((envelope, body))
+
+        await channel.basic_consume(callback, queue_name)
+
+        while True:
+            envelope, body = await message_queue.get()
+            await self._deliver(name, handlers[envelope.exchange_name], body)
+            await channel.basic_client_ack(envelope.delivery_tag)
+
+    async def _deliver(self, name: str, handler: Any, message: Any) -> None:
+        """
+        Dispatches an event to a subscriber, logging its failure if any.
+        """
+        ap = AsyncProtocol.from_bytes(message)
+        cq = ap.to_cq()
+        try:
+            await self._dispatch(handler, cq, ap.uuid)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception("Subscriber %s failed to handle %s", name, cq)
@@ -0,0 +1,7 @@
+"""Module containing base interfaces for events."""
+
+
+class EventInterface:  # pylint: disable=too-few-public-methods
+    """Base interface for domain events, handled by every subscriber."""
+
+    __slots__ = ()
@@ -0,0 +1,73 @@
+"""
+Module containing the subscriber lists of the event buses.
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple, Type
+from core.di import Provider
+from core.cqrs.exceptions import SubscriberAlreadyRegistered
+
+
+def subscriber_name(handler: Any) -> str:
+    """
+    Returns the default subscriber name of a handler: the qualified name of
+    its function, or of its class for handler instances and providers.
+    """
+    if isinstance(handler, Provider):
+        handler = handler.factory
+
+    if not hasattr(handler, "__qualname__"):
+        handler = type(handler)
+
+    return ".".join([handler.__module__, handler.__qualname__])
+
+
+class Subscribers:
+    """
+    The subscribers of each event type, by name.
+
+    An event is delivered to the subscribers of its type and of its base
+    classes. The subscribers of each concrete type are collected once, along
+    its MRO, and cached until a subscriber is added.
+    """
+
+    def __init__(self) -> None:
+        self._by_type: Dict[Type, Dict[str, Any]] = {}
+        self._resolved: Dict[Type, Tuple[Tuple[str, Any], ...]] = {}
+
+    def add(self, event_type: Type, handler: Any, name: Optional[str] = None) -> str:
+        """
+        Subscribes handler to event_type and returns its subscriber name.
+
+        Raises:
+            SubscriberAlreadyRegistered: If the name is already subscribed to event_type.
+        """
+        name = name or subscriber_name(handler)
+        subscribers = self._by_type.setdefault(event_type, {})
+        if name in subscribers:
+            raise SubscriberAlreadyRegistered.for_subscriber(event_type.__name__, name)
+
+        subscribers[name] = handler
+        self._resolved.clear()
+        return name
+
+    def for_type(self, event_type: Type) -> Tuple[Tuple[str, Any], ...]:
+        """
+        Returns the (name, handler) pairs an event of event_type is delivered to.
+        """
+        resolved = self._resolved.get(event_type)
+        if resolved is None:
+            resolved = self._resolved[event_type] = tuple(
+                item
+                for base in event_type.__mro__
+                for item in self._by_type.get(base, {}).items()
+            )
+
+        return resolved
+
+    def __iter__(self) -> Iterator[Tuple[Type, str, Any]]:
+        for event_type, subscribers in self._by_type.items():
+            for name, handler in subscribers.items():
+                yield event_type, name, handler
+
+    def __len__(self) -> int:
+        return sum(len(subscribers) for subscribers in self._by_type.values())
@@ -78,3 +78,147 @@ class HandlerNotFound(Exception):
             HandlerNotFound: An exception indicating that no handler was found for the comquerymand.
         """
         return cls(f"No handler has been found for {query}!")
+
+
+class QueryTimeout(TimeoutError):
+    """
+    Raised when the response to a query does not arrive before its deadline.
+    """
+
+    @classmethod
+    def for_query(cls, query: QueryInterface, timeout: float) -> QueryTimeout:
+        """
+        Creates a QueryTimeout exception for a given query.
+
+        Args:
+            query (QueryInterface): The query left without a response.
+            timeout (float): The seconds waited for the response.
+
+        Returns:
+            QueryTimeout: An exception indicating that the query timed out.
+        """
+        return cls(f"No response has been received for {query} within {timeout}s!")
+
+
+class SubscriberAlreadyRegistered(Exception):
+    """
+    Raised when a subscriber is already registered for an event.
+    """
+
+    @classmethod
+    def for_subscriber(cls, event_type: str, name: str) -> SubscriberAlreadyRegistered:
+        """
+        Creates a SubscriberAlreadyRegistered exception for a given subscriber.
+
+        Args:
+            event_type (str): The type of event subscribed to.
+            name (str): The name of the subscriber already registered.
+
+        Returns:
+            SubscriberAlreadyRegistered: An exception indicating that the
+            subscriber has been already registered for the event.
+        """
+        return cls(f"`{name}` has been already subscribed to `{event_type}`!")
+
+
+class CodecAlreadyRegistered(Exception):
+    """
+    Raised when another codec is already registered with the same id.
+    """
+
+    @classmethod
+    def for_codec(cls, codec_id: int) -> CodecAlreadyRegistered:
+        """
+        Creates a CodecAlreadyRegistered exception for a given codec id.
+
+        Args:
+            codec_id (int): The id of the codec.
+
+        Returns:
+            CodecAlreadyRegistered: An exception indicating that the codec id
+            has been already registered.
+        """
+        return cls(f"A codec has been already registered with id `{codec_id}`!")
+
+
+class UnknownCodec(ValueError):
+    """
+    Raised when a message is encoded with an unregistered codec.
+    """
+
+    @classmethod
+    def for_codec(cls, codec_id: int) -> UnknownCodec:
+        """
+        Creates an UnknownCodec exception for a given codec id.
+
+        Args:
+            codec_id (int): The id of the codec found in the message.
+
+        Returns:
+            UnknownCodec: An exception indicating that no codec is registered
+            with the id.
+        """
+        return cls(f"No codec has been registered with id `{codec_id}`!")
+
+
+class MessageTypeNotAllowed(LookupError):
+    """
+    Raised when a message names a type that has not been registered, while
+    the type registry is in allowlist mode.
+    """
+
+    @classmethod
+    def for_type(cls, fqdn: str) -> MessageTypeNotAllowed:
+        """
+        Creates a MessageTypeNotAllowed exception for a given message type.
+
+        Args:
+            fqdn (str): The fqdn of the message type.
+
+        Returns:
+            MessageTypeNotAllowed: An exception indicating that the message
+            type is not registered.
+        """
+        return cls(f"`{fqdn}` is not a registered message type!")
+
+
+class CompressorAlreadyRegistered(Exception):
+    """
+    Raised when another compressor is already registered with the same id.
+    """
+
+    @classmethod
+    def for_compressor(cls, compressor_id: int) -> CompressorAlreadyRegistered:
+        """
+        Creates a CompressorAlreadyRegistered exception for a given compressor id.
+
+        Args:
+            compressor_id (int): The id of the compressor.
+
+        Returns:
+            CompressorAlreadyRegistered: An exception indicating that the
+            compressor id has been already registered.
+        """
+        return cls(
+            f"A compressor has been already registered with id `{compressor_id}`!"
+        )
+
+
+class UnknownCompressor(ValueError):
+    """
+    Raised when a message is compressed with an unregistered compressor.
+    """
+
+    @classmethod
+    def for_compressor(cls, compressor_id: int) -> UnknownCompressor:
+        """
+        Creates an UnknownCompressor exception for a given compressor id.
+
+        Args:
+            compressor_id (int): The id of the compressor found in the message.
+
+        Returns:
+            UnknownCompressor: An exception indicating that no compressor is
+            registered with the id.
+        """
+        return cls(f"No compressor has been registered with id `{compressor_id}`!")
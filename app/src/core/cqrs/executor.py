@@ -0,0 +1,257 @@
+"""
+Module containing the executors handlers are dispatched to.
+
+Handlers declare where they run with an execution policy: INLINE handlers
+run on the event loop, THREAD handlers in a thread pool and PROCESS
+handlers in a process pool, so CPU-bound handlers neither stall the event
+loop nor contend for a single core.
+
+PROCESS handlers are never sent to the workers: their class, or function,
+is pickled by reference and the worker rebuilds the handler from its own
+container, once per message scope. Their commands and queries must be
+picklable, which module level dataclasses are.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from inspect import isclass
+from typing import Any, Callable, Coroutine, Dict, Optional, Sequence, Set
+from core.di import Container, Provider, di
+
+
+class ExecutionPolicy(Enum):
+    """
+    This enum lists where a handler is executed.
+
+    INLINE handlers are called on the event loop, THREAD handlers in a
+    thread pool and PROCESS handlers in a process pool.
+    """
+
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def executes_in(policy: ExecutionPolicy) -> Callable[[Any], Any]:
+    """
+    This decorator sets the execution policy of a handler class or function.
+    """
+
+    def _wrapper(handler: Any) -> Any:
+        setattr(handler, "execution_policy", policy)
+        return handler
+
+    return _wrapper
+
+
+def policy_of(handler: Any) -> ExecutionPolicy:
+    """
+    Returns the execution policy of a handler, of the class built by a
+    Provider, INLINE when none is declared.
+    """
+    if isinstance(handler, Provider):
+        handler = handler.factory
+
+    return getattr(handler, "execution_policy", ExecutionPolicy.INLINE)
+
+
+class HandlerExecutor:  # pylint: disable=too-many-instance-attributes
+    """
+    Runs handlers according to their execution policy.
+
+    The pools are created on first use. Each policy but INLINE has a number
+    of slots, bounding the handlers submitted to it which run at once.
+
+    Args:
+        max_threads: The size of the thread pool.
+        max_processes: The size of the process pool.
+        container_factory: Builds the container of each worker process, which
+            PROCESS handlers are resolved from. Must be picklable, hence a
+            module level function; the default container is used when None.
+        limits: The number of slots of each policy, the size of its pool
+            by default.
+    """
+
+    def __init__(
+        self,
+        max_threads: Optional[int] = None,
+        max_processes: Optional[int] = None,
+        container_factory: Optional[Callable[[], Container]] = None,
+        limits: Optional[Dict[ExecutionPolicy, int]] = None,
+    ) -> None:
+        self.max_threads = max_threads or min(32, (os.cpu_count() or 1) + 4)
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self.container_factory = container_factory
+        self.limits = {
+            ExecutionPolicy.THREAD: self.max_threads,
+            ExecutionPolicy.PROCESS: self.max_processes,
+            **(limits or {}),
+        }
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._slots: Dict[ExecutionPolicy, asyncio.Semaphore] = {}
+        self._tasks: Set[asyncio.Future] = set()
+
+    def executor(self, policy: ExecutionPolicy) -> Executor:
+        """
+        Returns the pool of a THREAD or PROCESS policy, creating it on first use.
+        """
+        if policy is ExecutionPolicy.THREAD:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    self.max_threads, thread_name_prefix="handler"
+                )
+            return self._threads
+
+        if policy is ExecutionPolicy.PROCESS:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(
+                    self.max_processes,
+                    initializer=_init_worker,
+                    initargs=(self.container_factory,),
+                )
+            return self._processes
+
+        raise ValueError(f"{policy} handlers run on the event loop")
+
+    async def run(self, handler: Any, cq: Any) -> Any:
+        """
+        Executes handler with cq according to its policy and returns the result.
+
+        Coroutine handlers are always awaited on the event loop.
+        """
+        policy = policy_of(handler)
+        if policy is ExecutionPolicy.INLINE or inspect.iscoroutinefunction(handler):
+            result = handler(cq)
+            return await result if inspect.isawaitable(result) else result
+
+        loop = asyncio.get_running_loop()
+        if policy is ExecutionPolicy.PROCESS:
+            return await loop.run_in_executor(
+                self.executor(policy), _run_in_worker, _reference(handler), cq
+            )
+
+        result = await loop.run_in_executor(self.executor(policy), handler, cq)
+        return await result if inspect.isawaitable(result) else result
+
+    async def run_many(self, handler: Any, cqs: Sequence[Any]) -> Any:
+        """
+        Executes the handle_many method of handler with cqs according to the
+        policy of handler and returns the result.
+
+        Coroutine methods are always awaited on the event loop.
+        """
+        policy = policy_of(handler)
+        batch = handler.handle_many
+        if policy is ExecutionPolicy.INLINE or inspect.iscoroutinefunction(batch):
+            result = batch(cqs)
+            return await result if inspect.isawaitable(result) else result
+
+        loop = asyncio.get_running_loop()
+        if policy is ExecutionPolicy.PROCESS:
+            return await loop.run_in_executor(
+                self.executor(policy),
+                _run_in_worker,
+                _reference(handler),
+                list(cqs),
+                "handle_many",
+            )
+
+        result = await loop.run_in_executor(self.executor(policy), batch, cqs)
+        return await result if inspect.isawaitable(result) else result
+
+    async def submit(
+        self, policy: ExecutionPolicy, coroutine: Coroutine[Any, Any, Any]
+    ) -> asyncio.Future:
+        """
+        Schedules coroutine once a slot of policy is free and returns its task.
+
+        Exceptions raised by the task are logged, since nobody awaits it.
+        """
+        slot = self._slots.get(policy)
+        if slot is None:
+            slot = self._slots[policy] = asyncio.Semaphore(self.limits[policy])
+
+        try:
+            await slot.acquire()
+        except asyncio.CancelledError:
+            coroutine.close()
+            raise
+
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(functools.partial(self._done, slot))
+        return task
+
+    async def join(self) -> None:
+        """
+        Waits for the submitted tasks to complete.
+        """
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts the pools down.
+        """
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=wait)
+
+        self._threads = None
+        self._processes = None
+
+    def _done(self, slot: asyncio.Semaphore, task: asyncio.Future) -> None:
+        slot.release()
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("Handler failed", exc_info=task.exception())
+
+
+def _reference(handler: Any) -> Any:
+    """
+    Returns what a worker process rebuilds handler from.
+    """
+    if isinstance(handler, Provider):
+        return handler.factory
+
+    if isclass(handler) or inspect.isroutine(handler):
+        return handler
+
+    return type(handler)
+
+
+# The state of a worker process of the PROCESS policy
+_worker_container: Container = di
+_worker_handlers: Dict[Any, Any] = {}
+
+
+def _init_worker(container_factory: Optional[Callable[[], Container]]) -> None:
+    global _worker_container  # pylint: disable=global-statement
+
+    if container_factory is not None:
+        _worker_container = container_factory()
+    _worker_handlers.clear()
+
+
+def _run_in_worker(reference: Any, cq: Any, method: str = "__call__") -> Any:
+    if not isclass(reference):
+        return _complete(getattr(reference, method)(cq))
+
+    if _worker_container.binding(reference) is None:
+        handler = _worker_handlers.get(reference)
+        if handler is None:
+            handler = _worker_handlers[reference] = reference()
+        return _complete(getattr(handler, method)(cq))
+
+    with _worker_container.scope() as scope:
+        return _complete(getattr(scope.get(reference), method)(cq))
+
+
+def _complete(result: Any) -> Any:
+    return asyncio.run(result) if inspect.iscoroutine(result) else result
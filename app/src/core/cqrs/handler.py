@@ -1,6 +1,17 @@
 """Module containing base interfaces for handlers."""
 
-from typing import Union, Generic, TypeVar, Callable, Any
+from typing import (
+    Union,
+    Generic,
+    TypeVar,
+    Callable,
+    Any,
+    ClassVar,
+    List,
+    Optional,
+    Sequence,
+)
+from core.cqrs.executor import ExecutionPolicy
 
 T = TypeVar("T")  # pylint: disable=invalid-name
 R = TypeVar("R")  # pylint: disable=invalid-name
@@ -9,9 +20,41 @@ R = TypeVar("R")  # pylint: disable=invalid-name
 class HandlerInterface(Generic[T, R]):  # pylint: disable=too-few-public-methods
     """Base interface for query handlers."""
 
+    # Where the broker buses run the handler, see core.cqrs.executor.
+    execution_policy: ClassVar[ExecutionPolicy] = ExecutionPolicy.INLINE
+
     # it should be async
     def __call__(self, cq: T) -> Union[None, R]:
         """Handles a query."""
 
 
+class BatchHandlerInterface(  # pylint: disable=too-few-public-methods
+    HandlerInterface[T, R]
+):
+    """
+    Base interface for handlers which can also handle a batch at once.
+
+    Buses executing several messages of the handled type call handle_many
+    once instead of calling the handler once per message, so it can for
+    instance write them to the database in bulk.
+    """
+
+    def handle_many(self, cqs: Sequence[T]) -> Optional[Sequence[Union[None, R]]]:
+        """Handles a batch, returning the results in order or None for commands."""
+        return [self(cq) for cq in cqs]
+
+
 HandlerType = Union[Callable[[Any], None], HandlerInterface[T, Union[None, R]]]
+
+
+def handle_many(handler: Any, cqs: Sequence[Any]) -> List[Any]:
+    """
+    Handles a batch with the handle_many method of handler, if it has one,
+    or by calling the handler once per message.
+    """
+    batch = getattr(handler, "handle_many", None)
+    if batch is None:
+        return [handler(cq) for cq in cqs]
+
+    results = batch(cqs)
+    return [None] * len(cqs) if results is None else list(results)
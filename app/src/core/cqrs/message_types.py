@@ -0,0 +1,96 @@
+"""
+Module containing the registry of the message types received from brokers.
+
+A received message names its type by fqdn. The registry maps every fqdn to
+its class and to the constructor building its instances, so decoding a
+message costs a dictionary lookup instead of an import. The types handled
+by the buses are registered along with their handlers, and the others are
+imported on first use, then registered.
+
+In allowlist mode, the registry never imports: a message of a type that
+has not been registered is rejected, so the content of a message can never
+make a listener import a module.
+"""
+
+from typing import Any, Callable, Dict, Optional, Type
+from core.cqrs.exceptions import MessageTypeNotAllowed
+from core.cqrs.schema import schema_of
+
+
+class TypeRegistry:
+    """
+    Maps the fqdn of message types to their class and constructor.
+
+    Attributes:
+        allowlist (bool): Whether unregistered types are rejected instead of
+            imported.
+    """
+
+    def __init__(self, allowlist: bool = False) -> None:
+        self.allowlist = allowlist
+        self._types: Dict[str, Type] = {}
+        self._constructors: Dict[str, Callable[..., Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __contains__(self, fqdn: str) -> bool:
+        return fqdn in self._types
+
+    def register(
+        self, cls: Type, constructor: Optional[Callable[..., Any]] = None
+    ) -> str:
+        """
+        Registers a message type and returns its fqdn.
+
+        Args:
+            cls (Type): The message type.
+            constructor (Optional[Callable[..., Any]]): Builds an instance from
+                the message parameters, the loader of its schema by default.
+        """
+        fqdn = ".".join([cls.__module__, cls.__name__])
+        if self._types.get(fqdn) is not cls or constructor is not None:
+            self._types[fqdn] = cls
+            self._constructors[fqdn] = constructor or schema_of(cls).load
+
+        return fqdn
+
+    def resolve(self, fqdn: str) -> Type:
+        """
+        Returns the message type of fqdn, importing it if unregistered.
+
+        Raises:
+            MessageTypeNotAllowed: If the type is unregistered in allowlist mode.
+        """
+        cls = self._types.get(fqdn)
+        if cls is None:
+            cls = self._import(fqdn)
+            self.register(cls)
+
+        return cls
+
+    def construct(self, fqdn: str, parameters: Dict[str, Any]) -> Any:
+        """
+        Returns an instance of the message type of fqdn built from parameters.
+
+        Raises:
+            MessageTypeNotAllowed: If the type is unregistered in allowlist mode.
+        """
+        constructor = self._constructors.get(fqdn)
+        if constructor is None:
+            self.resolve(fqdn)
+            constructor = self._constructors[fqdn]
+
+        return constructor(**parameters)
+
+    def _import(self, fqdn: str) -> Type:
+        if self.allowlist:
+            raise MessageTypeNotAllowed.for_type(fqdn)
+
+        module_name, _, class_name = fqdn.rpartition(".")
+        module = __import__(module_name, fromlist=[class_name])
+        return getattr(module, class_name)
+
+
+# The registry the buses register their message types in and decode with.
+TYPES = TypeRegistry()
@@ -0,0 +1,139 @@
+"""
+Module containing the middleware pipeline of the in-process buses.
+
+A middleware wraps the execution of a command or query: it receives the
+message and the next callable of the chain, and returns what the chain
+returns. Buses compose the chain once per message type, when its handler is
+registered, so executing a message costs one call per layer.
+"""
+
+import inspect
+import logging
+import time
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+R = TypeVar("R")  # pylint: disable=invalid-name
+
+Next = Callable[[Any], Any]
+
+
+class MiddlewareInterface(Generic[T, R]):  # pylint: disable=too-few-public-methods
+    """Base interface for middlewares."""
+
+    def __call__(
+        self, cq: T, call_next: Callable[[T], Union[None, R]]
+    ) -> Union[None, R]:
+        """Handles a message, usually by calling call_next with it."""
+        return call_next(cq)
+
+
+MiddlewareType = Union[Callable[[Any, Next], Any], MiddlewareInterface]
+
+
+def _layer(middleware: Callable[[Any, Next], Any], call_next: Next) -> Next:
+    def call(cq: Any) -> Any:
+        return middleware(cq, call_next)
+
+    return call
+
+
+def compose(handler: Next, middlewares: Sequence[MiddlewareType]) -> Next:
+    """
+    Wraps handler in middlewares, the first middleware being the outermost.
+
+    Each layer is a closure over the next one, and the __call__ of middleware
+    instances is bound once here, so a layer costs two plain calls and no
+    list walking.
+    """
+    chain = handler
+    for middleware in reversed(middlewares):
+        if not inspect.isroutine(middleware):
+            middleware = middleware.__call__
+        chain = _layer(middleware, chain)
+
+    return chain
+
+
+class LoggingMiddleware(MiddlewareInterface):  # pylint: disable=too-few-public-methods
+    """
+    Logs every message before it is handled.
+    """
+
+    def __init__(self, level: int = logging.DEBUG) -> None:
+        self.level = level
+
+    def __call__(self, cq: Any, call_next: Next) -> Any:
+        logging.log(self.level, "Handling %s", cq)
+        return call_next(cq)
+
+
+class TimingMiddleware(MiddlewareInterface):  # pylint: disable=too-few-public-methods
+    """
+    Reports the time spent handling every message.
+
+    Args:
+        report: Called with the message type and the elapsed seconds,
+            logs them at debug level by default.
+    """
+
+    def __init__(self, report: Optional[Callable[[Type, float], None]] = None) -> None:
+        self.report = report or (
+            lambda cq_type, elapsed: logging.debug(
+                "%s handled in %.6fs", cq_type.__name__, elapsed
+            )
+        )
+
+    def __call__(self, cq: Any, call_next: Next) -> Any:
+        start = time.perf_counter()
+        try:
+            return call_next(cq)
+        finally:
+            self.report(type(cq), time.perf_counter() - start)
+
+
+class RetryMiddleware(MiddlewareInterface):  # pylint: disable=too-few-public-methods
+    """
+    Handles a message again when it fails with one of the given exceptions.
+
+    Args:
+        attempts: The maximum number of times a message is handled.
+        exceptions: The exception types which trigger a retry.
+        delay: The seconds to wait before the first retry, doubled on each retry.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        delay: float = 0.0,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError(f"Attempts must be positive, got {attempts}")
+
+        self.attempts = attempts
+        self.exceptions = exceptions
+        self.delay = delay
+
+    def __call__(self, cq: Any, call_next: Next) -> Any:
+        delay = self.delay
+        for _ in range(self.attempts - 1):
+            try:
+                return call_next(cq)
+            except self.exceptions:
+                logging.debug("Retrying %s", cq, exc_info=True)
+                if delay:
+                    time.sleep(delay)
+                    delay *= 2
+
+        return call_next(cq)
@@ -0,0 +1,226 @@
+"""
+Module for the asynchronous in-process query bus.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Iterable, List, Optional, Type, Union
+from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.query.query import QueryInterface, QueryResponseInterface
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.query.gather import gather
+from core.cqrs.query.stream import is_stream
+from core.cqrs.query.single_flight import SingleFlight
+from core.cqrs.bus import (
+    DEFAULT_CONCURRENCY,
+    BusInterface,
+    execute_concurrently,
+    group_by_type,
+)
+from core.cqrs.dispatch import DispatchTable
+from core.cqrs.handler import HandlerType
+from core.cqrs.executor import HandlerExecutor
+from core.cqrs.exceptions import QueryAlreadyRegistered
+
+
+class AsyncQueryBus(BusInterface):
+    """
+    An in-process query bus awaiting coroutine handlers.
+
+    Concurrent identical queries share a single handler execution, and
+    repeated queries are served from the cache when one is set.
+
+    Attributes:
+        _handlers (DispatchTable): The query handlers, also dispatched to for
+        the subclasses of their query type.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[QueryCache] = None,
+        coalesce: bool = True,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+    ) -> None:
+        """
+        Initializes the bus.
+
+        Args:
+            cache: The cache serving repeated queries without calling their handler.
+            coalesce: Whether concurrent identical queries share a single execution.
+            executor: Runs the handlers according to their execution policy,
+                see core.cqrs.executor.
+        """
+        self._handlers = DispatchTable()
+        self._cache = cache
+        self._single_flight: Optional[SingleFlight] = (
+            SingleFlight() if coalesce else None
+        )
+        self._executor = executor or HandlerExecutor()
+
+    def register_handler(self, cq: Type[QueryInterface], handler: HandlerType) -> None:
+        """
+        Registers a query handler for a specific query type.
+
+        Args:
+            cq (Type[QueryInterface]): The query type to register the handler for.
+            handler (HandlerType): The handler, or coroutine function, to register.
+
+        Raises:
+            QueryAlreadyRegistered: If a handler is already registered for the query type.
+        """
+        if cq in self._handlers.registered:
+            raise QueryAlreadyRegistered.for_query(cq.__name__)
+
+        self._handlers.register(cq, handler)
+
+    async def execute(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cq: QueryInterface
+    ) -> Union[None, QueryResponseInterface]:
+        """
+        Execute a query and return the response.
+
+        Args:
+            cq (QueryInterface): The query to execute.
+
+        Returns:
+            Union[None, QueryResponseInterface]: The query response, or None if not applicable.
+
+        Raises:
+            HandlerNotFound: If no handler is registered for the query type.
+        """
+        if self._handlers.find(type(cq)) is None:
+            raise HandlerNotFound.for_query(cq)
+
+        if self._cache is None:
+            return await self._coalesced(cq)
+
+        return await self._cache.afetch(cq, self._coalesced)
+
+    async def execute_concurrently(
+        self,
+        cqs: Iterable[QueryInterface],
+        limit: int = DEFAULT_CONCURRENCY,
+        return_exceptions: bool = False,
+    ) -> List[Union[None, QueryResponseInterface]]:
+        """
+        Execute queries concurrently, at most limit at a time.
+
+        Args:
+            cqs (Iterable[QueryInterface]): The queries to execute.
+            limit (int): The maximum number of queries in flight.
+            return_exceptions (bool): Whether the exceptions raised are
+                returned in place of the responses, instead of raised.
+
+        Returns:
+            List[Union[None, QueryResponseInterface]]: The responses, in order.
+        """
+        return await execute_concurrently(self.execute, cqs, limit, return_exceptions)
+
+    async def gather(
+        self,
+        *cqs: QueryInterface,
+        timeout: Optional[float] = None,
+        partial: bool = False,
+    ) -> List[Any]:
+        """
+        Execute independent queries concurrently and return the responses in order.
+
+        Args:
+            *cqs (QueryInterface): The queries to execute.
+            timeout (Optional[float]): The seconds to wait for all the responses,
+                forever when None. The queries still running are cancelled.
+            partial (bool): Whether a QueryTimeout takes the place of each
+                missing response, instead of being raised for the first one.
+
+        Returns:
+            List[Any]: The responses, in order.
+
+        Raises:
+            HandlerNotFound: If a query has no handler, before any is executed.
+            QueryTimeout: If a response is missing at the timeout, unless partial.
+        """
+        for cq in cqs:
+            if self._handlers.find(type(cq)) is None:
+                raise HandlerNotFound.for_query(cq)
+
+        return await gather(self.execute, cqs, timeout, partial)
+
+    async def stream(self, cq: QueryInterface) -> AsyncIterator[Any]:
+        """
+        Execute a query and iterate over its response, chunk by chunk when its
+        handler is an async generator.
+
+        The response of a handler that does not stream is a single chunk.
+        Streamed queries are neither cached nor coalesced.
+
+        Args:
+            cq (QueryInterface): The query to execute.
+
+        Raises:
+            HandlerNotFound: If no handler is registered for the query type.
+        """
+        try:
+            handler = self._handlers[type(cq)]
+        except KeyError:
+            raise HandlerNotFound.for_query(cq) from None
+
+        result = await self._executor.run(handler, cq)
+        if not is_stream(result):
+            yield result
+            return
+
+        async for chunk in result:
+            yield chunk
+
+    async def _coalesced(self, cq: QueryInterface) -> Any:
+        if self._single_flight is None:
+            return await self._handle(cq)
+
+        return await self._single_flight.do(cq, self._handle)
+
+    async def _handle(self, cq: QueryInterface) -> Any:
+        return await self._executor.run(self._handlers[type(cq)], cq)
+
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[QueryInterface]
+    ) -> List[Union[None, QueryResponseInterface]]:
+        """
+        Execute queries grouped by type and return the responses in order.
+
+        Batch-aware handlers receive each group in a single handle_many call,
+        other handlers are executed concurrently once per query, both
+        according to the execution policy of the handler. When a cache is
+        set, only the queries it misses are executed.
+
+        Args:
+            cqs (Iterable[QueryInterface]): The queries to execute.
+
+        Returns:
+            List[Union[None, QueryResponseInterface]]: The responses, in order.
+
+        Raises:
+            HandlerNotFound: If a query has no handler, before any is executed.
+        """
+        cqs = list(cqs)
+        for cq in cqs:
+            if self._handlers.find(type(cq)) is None:
+                raise HandlerNotFound.for_query(cq)
+
+        if self._cache is None:
+            return await self._handle_many(cqs)
+
+        return await self._cache.afetch_many(cqs, self._handle_many)
+
+    async def _handle_many(self, cqs: List[QueryInterface]) -> List[Any]:
+        results: List[Any] = [None] * len(cqs)
+        for cq_type, (indexes, batch) in group_by_type(cqs).items():
+            handler = self._handlers[cq_type]
+            if hasattr(handler, "handle_many"):
+                responses = await self._executor.run_many(handler, batch)
+            else:
+                responses = await asyncio.gather(*(self._coalesced(cq) for cq in batch))
+
+            for index, response in zip(indexes, responses):
+                results[index] = response
+
+        return results
@@ -2,22 +2,109 @@
 Module for Dependency Injection Query Bus.
 """
 
-from typing import Type, Union
-from core.di import Container
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type, Union
+from core.di import Container, Provider
 from core.cqrs.exceptions import HandlerNotFound
 from core.cqrs.query.query import QueryInterface, QueryResponseInterface
-from core.cqrs.bus import BusInterface
-from core.cqrs.handler import HandlerType, HandlerInterface
+from core.cqrs.bus import BusInterface, execute_grouped
+from core.cqrs.handler import HandlerType, HandlerInterface, handle_many
+from core.cqrs.middleware import MiddlewareType, compose
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.registry import QUERY, HandlerRegistry, fqdn_of
 from core.cqrs.exceptions import QueryAlreadyRegistered
 
 
 class DIQueryBus(BusInterface):
     """
     A query bus implementation that utilizes a dependency injection container.
+
+    Handlers are wrapped in the middlewares, the first one being the
+    outermost, once per message type. When a cache is given, repeated
+    queries are served from it without calling their handler.
+
+    A handler bound to a query type also handles its subclasses which have
+    no handler of their own. The handler of each concrete type is looked up
+    once, along its MRO, and cached until a handler is registered.
     """
 
-    def __init__(self, container: Container) -> None:
+    def __init__(
+        self,
+        container: Container,
+        registry: Optional[HandlerRegistry] = None,
+        middlewares: Optional[Sequence[MiddlewareType]] = None,
+        cache: Optional[QueryCache] = None,
+    ) -> None:
         self._container = container
+        self._registry = registry
+        self._middlewares = tuple(middlewares or ())
+        self._cache = cache
+        self._chains: Dict[Type, Callable[[Any], Any]] = {}
+        self._batches: Dict[Type, Callable[[Any], Any]] = {}
+
+    def _chain(self, cq_type: Type, handler_type: Type) -> Callable[[Any], Any]:
+        """
+        Composes the middlewares around the handler bound to handler_type,
+        leased on each call, and caches the chain for cq_type.
+        """
+        container = self._container
+
+        def handle(cq: Any) -> Any:
+            with container.lease(handler_type) as handler:
+                return handler(cq)  # pyright: ignore
+
+        chain = self._chains[cq_type] = compose(handle, self._middlewares)
+        return chain
+
+    def _batch(self, cq_type: Type) -> Callable[[Any], Any]:
+        """
+        Returns the batch call of the handler of cq_type, or the middleware
+        chain of cq_type called once per message when the bus has middlewares,
+        and caches it for cq_type.
+        """
+        batch = self._batches.get(cq_type)
+        if batch is not None:
+            return batch
+
+        container = self._container
+        handler_type = self._handler_type(cq_type)
+
+        if self._middlewares:
+            chain = self._chains.get(cq_type) or self._chain(cq_type, handler_type)
+            batch = self._batches[cq_type] = functools.partial(handle_many, chain)
+            return batch
+
+        def handle(cqs: Any) -> Any:
+            with container.lease(handler_type) as handler:
+                return handle_many(handler, cqs)
+
+        batch = self._batches[cq_type] = handle
+        return batch
+
+    def _handler_type(self, cq_type: Type) -> Optional[Type]:
+        """
+        Returns the closest class of cq_type, in method resolution order,
+        with a handler bound in the container or declared in the registry.
+        """
+        for base in cq_type.__mro__:
+            if base in self._container or self._load_handler(base):
+                return base
+
+        return None
+
+    def _load_handler(self, cq_type: Type) -> bool:
+        """
+        Registers the handler declared for cq_type in the registry, if any.
+        """
+        if self._registry is None:
+            return False
+
+        fqdn = fqdn_of(cq_type)
+        if not self._registry.has(QUERY, fqdn):
+            return False
+
+        self._container[cq_type] = self._registry.resolve(fqdn, self._container)
+        return True
 
     def register_handler(self, cq: Type[QueryInterface], handler: HandlerType) -> None:
         """
@@ -25,19 +112,26 @@ class DIQueryBus(BusInterface):
 
         Args:
             cq (Type[QueryInterface]): The query type to register the handler for.
-            handler (HandlerType): The handler to register.
+            handler (HandlerType): The handler to register, or a Provider, such as a
+                pool of handlers, checked out for each execution.
 
         Raises:
             ValueError: If the handler is not a subclass of HandlerInterface.
             QueryAlreadyRegistered: If a handler is already registered for the query type.
         """
-        if not issubclass(handler.__class__, HandlerInterface):
+        if not isinstance(handler, Provider) and not issubclass(
+            handler.__class__, HandlerInterface
+        ):
             raise ValueError("Handler must be a subclass of Handler[TQuery]")
 
         if cq in self._container:
             raise QueryAlreadyRegistered.for_query(cq.__name__)
 
         self._container[cq] = handler
+        # The new handler may be closer to cached subclasses than their own.
+        self._chains.clear()
+        self._batches.clear()
+        self._chain(cq, cq)
 
     def execute(self, cq: QueryInterface) -> Union[None, QueryResponseInterface]:
         """
@@ -52,8 +146,47 @@ class DIQueryBus(BusInterface):
         Raises:
             HandlerNotFound: If no handler is found for the query.
         """
-        if type(cq) not in self._container:
-            raise HandlerNotFound.for_query(cq)
+        chain = self._chains.get(type(cq))
+        if chain is None:
+            handler_type = self._handler_type(type(cq))
+            if handler_type is None:
+                raise HandlerNotFound.for_query(cq)
+            chain = self._chain(type(cq), handler_type)
+
+        if self._cache is None:
+            return chain(cq)
+
+        return self._cache.fetch(cq, chain)
+
+    def execute_many(
+        self, cqs: Iterable[QueryInterface]
+    ) -> List[Union[None, QueryResponseInterface]]:
+        """
+        Executes queries grouped by type, each group in a single handler call.
+
+        Batch-aware handlers receive the whole group in handle_many, other
+        handlers are called once per query. When the bus has middlewares,
+        they wrap every query on its own, so the handler is called once per
+        query too. When a cache is set, only the queries it misses are
+        executed.
+
+        Args:
+            cqs (Iterable[QueryInterface]): The queries to execute.
+
+        Returns:
+            List[Union[None, QueryResponseInterface]]: The responses, in order.
+
+        Raises:
+            HandlerNotFound: If a query has no handler, before any is executed.
+        """
+        cqs = list(cqs)
+        for cq in cqs:
+            if type(cq) not in self._batches and self._handler_type(type(cq)) is None:
+                raise HandlerNotFound.for_query(cq)
+
+        if self._cache is None:
+            return execute_grouped(cqs, self._batch)
 
-        handler = self._container[type(cq)]
-        return handler(cq)  # pyright: ignore
+        return self._cache.fetch_many(
+            cqs, lambda missing: execute_grouped(missing, self._batch)
+        )
@@ -4,13 +4,39 @@ Module for asynchronous query bus implementation using Kafka.
 
 import logging
 from abc import ABC
-from typing import Type, TypeVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+)
 import asyncio
+import time
+from core.di import Container
+from core.broker.kafka import KafkaBroker
 from core.cqrs.async_kafka_bus import KafkaBusInterface
-from core.cqrs.query.query import QueryInterface, QueryResponseInterface
+from core.cqrs.query.query import (
+    DEFAULT_QUERY_TIMEOUT,
+    QueryInterface,
+    QueryResponseInterface,
+)
 from core.cqrs.handler import HandlerInterface
-from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.exceptions import HandlerNotFound, QueryTimeout
+from core.cqrs.executor import HandlerExecutor
 from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.message_types import TYPES
+from core.cqrs.codec import JSON, Codec
+from core.cqrs.bus import group_by_type
+from core.cqrs.registry import QUERY, HandlerRegistry, fqdn_of
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.query.gather import fill_timeouts
+from core.cqrs.query.responses import ResponseRouter
+from core.cqrs.query.single_flight import SingleFlight
 
 T = TypeVar("T", bound=QueryInterface)  # pylint: disable=invalid-name
 H = TypeVar("H", bound=HandlerInterface)  # pylint: disable=invalid-name
@@ -19,8 +45,54 @@ H = TypeVar("H", bound=HandlerInterface)  # pylint: disable=invalid-name
 class KafkaQueryBus(KafkaBusInterface[T, H, None], ABC):
     """
     Asynchronous query bus that uses Kafka as the broker interface.
+
+    The responses to the queries sent are consumed by a single task, polling
+    off the event loop while responses are awaited, and routed to their
+    query by uuid, see core.cqrs.query.responses.
     """
 
+    handler_kind = QUERY
+
+    # The seconds a poll for responses waits for them.
+    poll_interval = 0.1
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        broker: KafkaBroker,
+        container: Optional[Container] = None,
+        registry: Optional[HandlerRegistry] = None,
+        cache: Optional[QueryCache] = None,
+        coalesce: bool = True,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+        timeout: Optional[float] = DEFAULT_QUERY_TIMEOUT,
+        codec: Codec = JSON,
+    ):
+        """
+        Initializes the Kafka query bus.
+
+        Args:
+            broker: The Kafka broker instance.
+            container: The container to open a scope from for each received query.
+            registry: The registry to load query handlers from on demand.
+            cache: The cache serving repeated queries without a round-trip.
+            coalesce: Whether concurrent identical queries share a single round-trip.
+            executor: Runs the handlers of the received queries, see core.cqrs.executor.
+            timeout: The seconds to wait for a response before raising
+                QueryTimeout, forever when None. Sent queries carry the
+                matching deadline, so listeners skip them once it has passed.
+            codec: Encodes the sent messages, see core.cqrs.codec. Received
+                messages are decoded whatever the codec they were sent with.
+        """
+        super().__init__(
+            broker, container, registry, cache, executor=executor, codec=codec
+        )
+        self.single_flight: Optional[SingleFlight] = (
+            SingleFlight() if coalesce else None
+        )
+        self.timeout = timeout
+        self.responses = ResponseRouter(self._consume_responses)
+
     async def register_handler(  # pyright: ignore
         self,
         cq: Type[T],  # pylint: disable=arguments-renamed
@@ -29,29 +101,197 @@ class KafkaQueryBus(KafkaBusInterface[T, H, None], ABC):
         """
         Registers a handler for a specific query.
         """
-        fqdn = ".".join([cq.__module__, cq.__name__])
+        fqdn = TYPES.register(cq)
         self.handlers[fqdn] = handler
 
     async def execute(  # pyright: ignore
         self, cq: T  # pylint: disable=arguments-renamed # pyright: ignore
     ) -> QueryResponseInterface:
         """
-        Execute a query asynchronously.
+        Execute a query asynchronously, or serve it from the cache if one is set.
+        """
+        if self.cache is None:
+            return await self._coalesced(cq)
+
+        return await self.cache.afetch(cq, self._coalesced)
+
+    async def _coalesced(self, cq: T) -> QueryResponseInterface:
+        """
+        Shares the round-trip of an identical query already in flight, if any.
         """
-        await self.broker.connect(list(self.handlers.keys()))
+        if self.single_flight is None:
+            return await self._round_trip(cq)
+
+        return await self.single_flight.do(cq, self._round_trip)
+
+    async def _round_trip(self, cq: T) -> QueryResponseInterface:
+        """
+        Sends a query to its handler through the broker and awaits the response.
+        """
+        if self.broker.connection is None:
+            await self.broker.connect(self._queue_names())
 
         fqdn = ".".join([cq.__module__, cq.__class__.__name__])
-        if fqdn not in self.handlers:
+        if not self._has_handler(fqdn):
+            raise HandlerNotFound.for_query(cq)
+
+        deadline = self._deadline()
+        ap = AsyncProtocol.from_cq(cq, deadline=deadline)
+        with self.responses.expect([fqdn + "-Response"], [ap.uuid]) as futures:
+            await self.broker.send(fqdn, ap.to_bytes(self.codec))
+            responses = await self.responses.collect(futures, deadline)
+
+        if ap.uuid not in responses:
+            raise QueryTimeout.for_query(cq, self.timeout)  # pyright: ignore
+
+        return responses[ap.uuid]
+
+    def _deadline(self) -> Optional[float]:
+        """
+        Returns the deadline of a query sent now, None without timeout.
+        """
+        return None if self.timeout is None else time.time() + self.timeout
+
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[T]  # pylint: disable=arguments-renamed # pyright: ignore
+    ) -> List[QueryResponseInterface]:
+        """
+        Execute queries asynchronously, sending each type in a single batch.
+
+        Every query is checked for a handler before any is sent, and only the
+        queries the cache misses are sent when one is set.
+
+        :param cqs: The queries to execute.
+        :return: The responses, in order.
+        """
+        cqs = list(cqs)
+        self._check_handlers(cqs)
+
+        if self.cache is None:
+            return await self._round_trip_many(cqs)
+
+        return await self.cache.afetch_many(cqs, self._round_trip_many)
+
+    async def gather(
+        self, *cqs: T, timeout: Optional[float] = None, partial: bool = False
+    ) -> List[Any]:
+        """
+        Execute independent queries at once and return the responses in order.
+
+        Every query is sent before any response is awaited, and the responses
+        are awaited together, so the latency is the one of the slowest query.
+
+        Args:
+            *cqs (T): The queries to execute.
+            timeout (Optional[float]): The seconds to wait for all the responses,
+                the timeout of the bus when None.
+            partial (bool): Whether a QueryTimeout takes the place of each
+                missing response, instead of being raised for the first one.
+
+        Returns:
+            List[Any]: The responses, in order.
+
+        Raises:
+            HandlerNotFound: If a query has no handler, before any is sent.
+            QueryTimeout: If a response is missing at the timeout, unless partial.
+        """
+        queries = list(cqs)
+        self._check_handlers(queries)
+        timeout = self.timeout if timeout is None else timeout
+
+        async def scatter(missing: List[T]) -> List[Any]:
+            return await self._scatter(missing, timeout, partial)
+
+        if self.cache is None:
+            return await scatter(queries)
+
+        return await self.cache.afetch_many(queries, scatter)
+
+    async def stream(self, cq: T) -> AsyncIterator[Any]:
+        """
+        Execute a query and iterate over its response, chunk by chunk as its
+        handler streams it.
+
+        Chunks are yielded in order as soon as they arrive, and the timeout of
+        the bus bounds the whole stream. The response of a handler that does
+        not stream is a single chunk. Streamed queries are neither cached nor
+        coalesced.
+
+        Args:
+            cq (T): The query to execute.
+
+        Raises:
+            HandlerNotFound: If the query has no handler.
+            QueryTimeout: If the stream has not ended at the deadline.
+        """
+        if self.broker.connection is None:
+            await self.broker.connect(self._queue_names())
+
+        fqdn = fqdn_of(type(cq))
+        if not self._has_handler(fqdn):
             raise HandlerNotFound.for_query(cq)
 
-        ap = AsyncProtocol.from_cq(cq)
-        await self.broker.send(fqdn, ap.to_json())
+        deadline = self._deadline()
+        ap = AsyncProtocol.from_cq(cq, deadline=deadline)
+        with self.responses.expect_stream(fqdn + "-Response", ap.uuid) as queue:
+            await self.broker.send(fqdn, ap.to_bytes(self.codec))
+
+            try:
+                async for chunk in self.responses.stream(queue, ap.uuid, deadline):
+                    yield chunk
+            except TimeoutError:
+                raise QueryTimeout.for_query(  # pyright: ignore
+                    cq, self.timeout
+                ) from None
+
+    def _check_handlers(self, cqs: List[T]) -> None:
+        """
+        Raises HandlerNotFound for the first query type without handler.
+        """
+        for cq_type, (_, batch) in group_by_type(cqs).items():
+            if not self._has_handler(fqdn_of(cq_type)):
+                raise HandlerNotFound.for_query(batch[0])
 
-        response_fqdn = fqdn + "-Response"
-        return await self.get_response(response_fqdn, ap.uuid)
+    async def _round_trip_many(self, cqs: List[T]) -> List[QueryResponseInterface]:
+        """
+        Sends queries to their handlers in one batch per type and awaits the responses.
+        """
+        return await self._scatter(cqs, self.timeout, partial=False)
+
+    async def _scatter(
+        self, cqs: List[T], timeout: Optional[float], partial: bool
+    ) -> List[Any]:
+        """
+        Sends queries in one batch per type, then awaits all the responses together.
+        """
+        if self.broker.connection is None:
+            await self.broker.connect(self._queue_names())
+
+        deadline = None if timeout is None else time.time() + timeout
+        aps = [AsyncProtocol.from_cq(cq, deadline=deadline) for cq in cqs]
+        groups = group_by_type(cqs)
+        response_fqdns = [fqdn_of(cq_type) + "-Response" for cq_type in groups]
+        with self.responses.expect(response_fqdns, [ap.uuid for ap in aps]) as futures:
+            for cq_type, (indexes, _) in groups.items():
+                await self.broker.send_many(
+                    fqdn_of(cq_type),
+                    [aps[index].to_bytes(self.codec) for index in indexes],
+                )
+            responses = await self.responses.collect(futures, deadline)
+
+        return fill_timeouts(
+            cqs,
+            {
+                index: responses[ap.uuid]
+                for index, ap in enumerate(aps)
+                if ap.uuid in responses
+            },
+            timeout,
+            partial,
+        )
 
     async def get_response(
-        self, response_fqdn, uuid
+        self, response_fqdn, uuid, deadline: Optional[float] = None
     ) -> QueryResponseInterface:  # pyright: ignore
         """
         Retrieves a response for a given query.
@@ -59,50 +299,79 @@ class KafkaQueryBus(KafkaBusInterface[T, H, None], ABC):
         Args:
             response_fqdn (str): The fully qualified domain name of the response.
             uuid (str): The unique identifier of the query.
+            deadline (Optional[float]): The wall clock time to stop waiting at,
+                never when None.
 
         Returns:
             Any: The response to the query.
+
+        Raises:
+            TimeoutError: If the deadline passes before the response arrived.
         """
-        # await self.broker.connect()
-        consumer = self.broker.connection["consumer"]
+        responses = await self.get_responses(response_fqdn, [uuid], deadline)
+        return responses[uuid]
 
-        logging.debug("Subscribing to %s", response_fqdn)
-        consumer.subscribe(response_fqdn)
+    async def get_responses(
+        self,
+        response_fqdn: str,
+        uuids: List[str],
+        deadline: Optional[float] = None,
+    ) -> Dict[str, QueryResponseInterface]:
+        """
+        Retrieves the responses for several queries sent to the same handler.
 
+        Args:
+            response_fqdn (str): The fully qualified domain name of the responses.
+            uuids (List[str]): The unique identifiers of the queries.
+            deadline (Optional[float]): The wall clock time to stop waiting at,
+                never when None.
+
+        Returns:
+            Dict[str, QueryResponseInterface]: The responses, by query uuid.
+
+        Raises:
+            TimeoutError: If the deadline passes before every response arrived.
+        """
+        with self.responses.expect([response_fqdn], uuids) as futures:
+            responses = await self.responses.collect(futures, deadline)
+
+        if len(responses) < len(set(uuids)):
+            raise TimeoutError(
+                f"{len(set(uuids)) - len(responses)} responses pending on {response_fqdn}"
+            )
+
+        return responses
+
+    async def _consume_responses(self) -> None:
+        """
+        Polls the response topics and routes the responses to their queries,
+        for as long as responses are awaited.
+        """
         if self.broker.connection is None:
             raise BrokenPipeError("Kafka not connected")
 
-        logging.debug("Listening to response from %s", response_fqdn)
-        for event in consumer:
-            try:
-                logging.debug(
-                    "Event from %s waiting for %s", event.topic, response_fqdn
-                )
-                if event.topic == response_fqdn:
-                    message = event.value.decode()
-                    if message is None:
-                        # If the queue is empty, wait for a short period and try again
-                        # deckde and check uuid
-                        await asyncio.sleep(0.1)
-                        continue
-            except asyncio.CancelledError:
-                # Gracefully handle generator closure
-                await self.broker.connection["producer"].close()
-                await self.broker.connection["consumer"].close()
-                raise
-
-            body = event.value.decode()
-            ap = AsyncProtocol.from_json(body)
-
-            if ap.uuid == uuid:
-                # If the message has the correct UUID, return the response
-                consumer.commit()
-                response = ap.to_cq()
+        consumer = self.broker.connection["consumer"]
+        subscribed: Set[str] = set()
+        while self.responses:
+            if subscribed != self.responses.topics:
+                subscribed = set(self.responses.topics)
+                logging.debug("Subscribing to %s", sorted(subscribed))
+                consumer.subscribe(sorted(subscribed))
 
-                return response  # pyright: ignore
+            # The consumer blocks while polling, keep it off the event loop
+            records = await asyncio.to_thread(
+                consumer.poll, int(self.poll_interval * 1000)
+            )
+            routed = False
+            for partition_records in records.values():
+                for event in partition_records:
+                    logging.debug("Event from %s", event.topic)
+                    if event.topic in subscribed:
+                        ap = AsyncProtocol.from_bytes(event.value)
+                        routed = self.responses.route(ap) or routed
 
-            # If the message has a different UUID, reject it and continue waiting
-            # await consumer.reject(message, requeue=True)
+            if routed:
+                consumer.commit()
 
     async def listen(self) -> None:
         """
@@ -3,15 +3,40 @@ Module for asynchronous query bus implementation using RabbitMQ.
 """
 
 from abc import ABC
-from typing import Type, TypeVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+)
 import asyncio
+import time
 from aioamqp.exceptions import EmptyQueue  # pyright: ignore
+from core.di import Container
 from core.cqrs.async_rabbitmq_bus import RabbitMQBusInterface
-from core.cqrs.query.query import QueryInterface, QueryResponseInterface
+from core.cqrs.query.query import (
+    DEFAULT_QUERY_TIMEOUT,
+    QueryInterface,
+    QueryResponseInterface,
+)
 from core.cqrs.handler import HandlerInterface
-from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.exceptions import HandlerNotFound, QueryTimeout
+from core.cqrs.executor import HandlerExecutor
 from core.broker.rabbitmq import RabbitMQBroker
 from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.message_types import TYPES
+from core.cqrs.codec import JSON, Codec
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.query.gather import fill_timeouts
+from core.cqrs.query.responses import ResponseRouter
+from core.cqrs.query.single_flight import SingleFlight
+from core.cqrs.bus import group_by_type
+from core.cqrs.registry import QUERY, HandlerRegistry, fqdn_of
 
 T = TypeVar("T", bound=QueryInterface)  # pylint: disable=invalid-name
 H = TypeVar("H", bound=HandlerInterface)  # pylint: disable=invalid-name
@@ -20,18 +45,55 @@ H = TypeVar("H", bound=HandlerInterface)  # pylint: disable=invalid-name
 class RabbitMQQueryBus(RabbitMQBusInterface[T, H, None], ABC):
     """
     Asynchronous query bus that uses RabbitMQ as the broker interface.
+
+    The responses to the queries sent are consumed by a single task, on a
+    channel of its own, while responses are awaited, and routed to their
+    query by uuid, see core.cqrs.query.responses.
     """
 
-    def __init__(self, broker: RabbitMQBroker):
+    handler_kind = QUERY
+
+    # The seconds between two checks for responses.
+    poll_interval = 0.1
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        broker: RabbitMQBroker,
+        container: Optional[Container] = None,
+        registry: Optional[HandlerRegistry] = None,
+        cache: Optional[QueryCache] = None,
+        coalesce: bool = True,
+        *,
+        executor: Optional[HandlerExecutor] = None,
+        timeout: Optional[float] = DEFAULT_QUERY_TIMEOUT,
+        codec: Codec = JSON,
+    ):
         """
         Initializes the RabbitMQ query bus.
 
         Args:
             broker: The RabbitMQ broker instance.
+            container: The container to open a scope from for each received query.
+            registry: The registry to load query handlers from on demand.
+            cache: The cache serving repeated queries without a round-trip.
+            coalesce: Whether concurrent identical queries share a single round-trip.
+            executor: Runs the handlers of the received queries, see core.cqrs.executor.
+            timeout: The seconds to wait for a response before raising
+                QueryTimeout, forever when None. Sent queries carry the
+                matching deadline, so listeners skip them once it has passed.
+            codec: Encodes the sent messages, see core.cqrs.codec. Received
+                messages are decoded whatever the codec they were sent with.
         """
         self.broker = broker
         self.handlers = {}
-        super().__init__(self.broker)
+        super().__init__(
+            self.broker, container, registry, cache, executor=executor, codec=codec
+        )
+        self.single_flight: Optional[SingleFlight] = (
+            SingleFlight() if coalesce else None
+        )
+        self.timeout = timeout
+        self.responses = ResponseRouter(self._consume_responses)
 
     async def register_handler(  # pyright: ignore
         self,
@@ -45,37 +107,244 @@ class RabbitMQQueryBus(RabbitMQBusInterface[T, H, None], ABC):
             query: The type of query to register the handler for.
             handler: The handler to register for the query.
         """
-        fqdn = ".".join([cq.__module__, cq.__name__])
+        fqdn = TYPES.register(cq)
         self.handlers[fqdn] = handler
 
     async def execute(  # pyright: ignore
         self, cq: T  # pylint: disable=arguments-renamed # pyright: ignore
     ) -> QueryResponseInterface:
         """
-        Execute a query asynchronously.
+        Execute a query asynchronously, or serve it from the cache if one is set.
 
         :param query: The query to execute.
         """
+        if self.cache is None:
+            return await self._coalesced(cq)
+
+        return await self.cache.afetch(cq, self._coalesced)
+
+    async def _coalesced(self, cq: T) -> QueryResponseInterface:
+        """
+        Shares the round-trip of an identical query already in flight, if any.
+        """
+        if self.single_flight is None:
+            return await self._round_trip(cq)
+
+        return await self.single_flight.do(cq, self._round_trip)
+
+    async def _round_trip(self, cq: T) -> QueryResponseInterface:
+        """
+        Sends a query to its handler through the broker and awaits the response.
+        """
         fqdn = ".".join([cq.__module__, cq.__class__.__name__])
-        if fqdn not in self.handlers:
+        if not self._has_handler(fqdn):
             raise HandlerNotFound.for_query(cq)
 
-        ap = AsyncProtocol.from_cq(cq)
-        await self.broker.send(fqdn, ap.to_json())
+        deadline = self._deadline()
+        ap = AsyncProtocol.from_cq(cq, deadline=deadline)
+        with self.responses.expect([fqdn + "#Response"], [ap.uuid]) as futures:
+            await self.broker.send(fqdn, ap.to_bytes(self.codec))
+            responses = await self.responses.collect(futures, deadline)
+
+        if ap.uuid not in responses:
+            raise QueryTimeout.for_query(cq, self.timeout)  # pyright: ignore
+
+        return responses[ap.uuid]
+
+    def _deadline(self) -> Optional[float]:
+        """
+        Returns the deadline of a query sent now, None without timeout.
+        """
+        return None if self.timeout is None else time.time() + self.timeout
 
-        response_fqdn = fqdn + "#Response"
-        return await self.get_response(response_fqdn, ap.uuid)
+    async def execute_many(  # pylint: disable=invalid-overridden-method # pyright: ignore
+        self, cqs: Iterable[T]  # pylint: disable=arguments-renamed # pyright: ignore
+    ) -> List[QueryResponseInterface]:
+        """
+        Execute queries asynchronously, sending each type in a single batch.
 
-    async def get_response(self, response_fqdn, uuid) -> QueryResponseInterface:
+        Every query is checked for a handler before any is sent, and only the
+        queries the cache misses are sent when one is set.
+
+        :param cqs: The queries to execute.
+        :return: The responses, in order.
+        """
+        cqs = list(cqs)
+        self._check_handlers(cqs)
+
+        if self.cache is None:
+            return await self._round_trip_many(cqs)
+
+        return await self.cache.afetch_many(cqs, self._round_trip_many)
+
+    async def gather(
+        self, *cqs: T, timeout: Optional[float] = None, partial: bool = False
+    ) -> List[Any]:
+        """
+        Execute independent queries at once and return the responses in order.
+
+        Every query is sent before any response is awaited, and the responses
+        are awaited together, so the latency is the one of the slowest query.
+
+        Args:
+            *cqs (T): The queries to execute.
+            timeout (Optional[float]): The seconds to wait for all the responses,
+                the timeout of the bus when None.
+            partial (bool): Whether a QueryTimeout takes the place of each
+                missing response, instead of being raised for the first one.
+
+        Returns:
+            List[Any]: The responses, in order.
+
+        Raises:
+            HandlerNotFound: If a query has no handler, before any is sent.
+            QueryTimeout: If a response is missing at the timeout, unless partial.
+        """
+        queries = list(cqs)
+        self._check_handlers(queries)
+        timeout = self.timeout if timeout is None else timeout
+
+        async def scatter(missing: List[T]) -> List[Any]:
+            return await self._scatter(missing, timeout, partial)
+
+        if self.cache is None:
+            return await scatter(queries)
+
+        return await self.cache.afetch_many(queries, scatter)
+
+    async def stream(self, cq: T) -> AsyncIterator[Any]:
+        """
+        Execute a query and iterate over its response, chunk by chunk as its
+        handler streams it.
+
+        Chunks are yielded in order as soon as they arrive, and the timeout of
+        the bus bounds the whole stream. The response of a handler that does
+        not stream is a single chunk. Streamed queries are neither cached nor
+        coalesced.
+
+        Args:
+            cq (T): The query to execute.
+
+        Raises:
+            HandlerNotFound: If the query has no handler.
+            QueryTimeout: If the stream has not ended at the deadline.
+        """
+        fqdn = fqdn_of(type(cq))
+        if not self._has_handler(fqdn):
+            raise HandlerNotFound.for_query(cq)
+
+        deadline = self._deadline()
+        ap = AsyncProtocol.from_cq(cq, deadline=deadline)
+        with self.responses.expect_stream(fqdn + "#Response", ap.uuid) as queue:
+            await self.broker.send(fqdn, ap.to_bytes(self.codec))
+
+            try:
+                async for chunk in self.responses.stream(queue, ap.uuid, deadline):
+                    yield chunk
+            except TimeoutError:
+                raise QueryTimeout.for_query(  # pyright: ignore
+                    cq, self.timeout
+                ) from None
+
+    def _check_handlers(self, cqs: List[T]) -> None:
+        """
+        Raises HandlerNotFound for the first query type without handler.
+        """
+        for cq_type, (_, batch) in group_by_type(cqs).items():
+            if not self._has_handler(fqdn_of(cq_type)):
+                raise HandlerNotFound.for_query(batch[0])
+
+    async def _round_trip_many(self, cqs: List[T]) -> List[QueryResponseInterface]:
+        """
+        Sends queries to their handlers in one batch per type and awaits the responses.
+        """
+        return await self._scatter(cqs, self.timeout, partial=False)
+
+    async def _scatter(
+        self, cqs: List[T], timeout: Optional[float], partial: bool
+    ) -> List[Any]:
+        """
+        Sends queries in one batch per type, then awaits all the responses together.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        aps = [AsyncProtocol.from_cq(cq, deadline=deadline) for cq in cqs]
+        groups = group_by_type(cqs)
+        response_fqdns = [fqdn_of(cq_type) + "#Response" for cq_type in groups]
+        with self.responses.expect(response_fqdns, [ap.uuid for ap in aps]) as futures:
+            for cq_type, (indexes, _) in groups.items():
+                await self.broker.send_many(
+                    fqdn_of(cq_type),
+                    [aps[index].to_bytes(self.codec) for index in indexes],
+                )
+            responses = await self.responses.collect(futures, deadline)
+
+        return fill_timeouts(
+            cqs,
+            {
+                index: responses[ap.uuid]
+                for index, ap in enumerate(aps)
+                if ap.uuid in responses
+            },
+            timeout,
+            partial,
+        )
+
+    async def get_response(
+        self, response_fqdn, uuid, deadline: Optional[float] = None
+    ) -> QueryResponseInterface:
         """
         Retrieves a response for a given query.
 
         Args:
             response_fqdn (str): The fully qualified domain name of the response.
             uuid (str): The unique identifier of the query.
+            deadline (Optional[float]): The wall clock time to stop waiting at,
+                never when None.
 
         Returns:
             Any: The response to the query.
+
+        Raises:
+            TimeoutError: If the deadline passes before the response arrived.
+        """
+        responses = await self.get_responses(response_fqdn, [uuid], deadline)
+        return responses[uuid]
+
+    async def get_responses(
+        self,
+        response_fqdn: str,
+        uuids: List[str],
+        deadline: Optional[float] = None,
+    ) -> Dict[str, QueryResponseInterface]:
+        """
+        Retrieves the responses for several queries sent to the same handler.
+
+        Args:
+            response_fqdn (str): The fully qualified domain name of the responses.
+            uuids (List[str]): The unique identifiers of the queries.
+            deadline (Optional[float]): The wall clock time to stop waiting at,
+                never when None.
+
+        Returns:
+            Dict[str, QueryResponseInterface]: The responses, by query uuid.
+
+        Raises:
+            TimeoutError: If the deadline passes before every response arrived.
+        """
+        with self.responses.expect([response_fqdn], uuids) as futures:
+            responses = await self.responses.collect(futures, deadline)
+
+        if len(responses) < len(set(uuids)):
+            raise TimeoutError(
+                f"{len(set(uuids)) - len(responses)} responses pending on {response_fqdn}"
+            )
+
+        return responses
+
+    async def _consume_responses(self) -> None:
+        """
+        Gets the messages of the response queues and routes the responses to
+        their queries, for as long as responses are awaited.
         """
         await self.broker.connect()
 
@@ -83,31 +352,31 @@ class RabbitMQQueryBus(RabbitMQBusInterface[T, H, None], ABC):
             raise BrokenPipeError("RabbitMQ not connected")
 
         channel = await self.broker.connection["protocol"].channel()
-        await channel.queue_declare(queue_name=response_fqdn, durable=True)
+        declared: Set[str] = set()
+        while self.responses:
+            received = False
+            for response_fqdn in sorted(self.responses.topics):
+                if response_fqdn not in declared:
+                    await channel.queue_declare(queue_name=response_fqdn, durable=True)
+                    declared.add(response_fqdn)
 
-        while True:
-            try:
-                message = await channel.basic_get(response_fqdn)
-                if message is None:
-                    # If the queue is empty, wait for a short period and try again
-                    await asyncio.sleep(0.1)
+                try:
+                    message = await channel.basic_get(response_fqdn)
+                except EmptyQueue as _:
                     continue
-            except EmptyQueue as _:
-                await asyncio.sleep(0.1)
-                continue
-
-            body = message["message"].decode()
-            ap = AsyncProtocol.from_json(body)
 
-            if ap.uuid == uuid:
-                # If the message has the correct UUID, return the response
-                await channel.basic_client_ack(message["delivery_tag"])
-                response = ap.to_cq()
+                if message is None:
+                    continue
 
-                return response  # pyright: ignore
+                received = True
+                ap = AsyncProtocol.from_bytes(message["message"])
+                if self.responses.route(ap):
+                    # If the message has an awaited UUID, keep the response
+                    await channel.basic_client_ack(message["delivery_tag"])
 
-            # If the message has a different UUID, reject it and continue waiting
-            # await channel.basic_reject(message[0].delivery_tag, requeue=True)
+            if not received:
+                # If the queues are empty, wait for a short period and try again
+                await asyncio.sleep(self.poll_interval)
 
     async def listen(self) -> None:
         """
@@ -2,11 +2,15 @@
 Module for handling simple command bus operations.
 """
 
-from typing import Dict, Type, Union
+import functools
+from typing import Iterable, List, Optional, Sequence, Type, Union
 from core.cqrs.exceptions import HandlerNotFound
 from core.cqrs.query.query import QueryInterface, QueryResponseInterface
-from core.cqrs.bus import BusInterface
-from core.cqrs.handler import HandlerType
+from core.cqrs.bus import BusInterface, execute_grouped
+from core.cqrs.dispatch import DispatchTable
+from core.cqrs.handler import HandlerType, handle_many
+from core.cqrs.middleware import MiddlewareType, compose
+from core.cqrs.query.cache import QueryCache
 from core.cqrs.exceptions import QueryAlreadyRegistered
 
 
@@ -15,12 +19,28 @@ class SimpleQueryBus(BusInterface):
     A simple implementation of the Query Bus pattern.
 
     Attributes:
-        _handlers (Dict[Type[QueryInterface], QueryInterface]):
-        A dictionary of query handlers.
+        _handlers (DispatchTable): The query handlers, wrapped in the bus
+        middlewares, also dispatched to for the subclasses of their query type.
     """
 
-    def __init__(self) -> None:
-        self._handlers: Dict[Type[QueryInterface], HandlerType] = {}
+    def __init__(
+        self,
+        middlewares: Optional[Sequence[MiddlewareType]] = None,
+        cache: Optional[QueryCache] = None,
+    ) -> None:
+        """
+        Initializes the bus.
+
+        Args:
+            middlewares: The middlewares wrapping every handler, the first
+                one being the outermost. They are composed once per query
+                type, when its handler is registered.
+            cache: The cache serving repeated queries without calling their handler.
+        """
+        self._middlewares = tuple(middlewares or ())
+        self._cache = cache
+        self._handlers = DispatchTable()
+        self._batches = DispatchTable()
 
     def register_handler(self, cq: Type[QueryInterface], handler: HandlerType) -> None:
         """
@@ -33,10 +53,13 @@ class SimpleQueryBus(BusInterface):
         Raises:
             QueryAlreadyRegistered: If a handler is already registered for the query type.
         """
-        if cq in self._handlers:
+        if cq in self._handlers.registered:
             raise QueryAlreadyRegistered.for_query(cq.__name__)
 
-        self._handlers[cq] = handler
+        chain = compose(handler, self._middlewares)
+        self._handlers.register(cq, chain)
+        # Without middlewares, the chain is the handler and keeps its handle_many
+        self._batches.register(cq, functools.partial(handle_many, chain))
 
     def execute(self, cq: QueryInterface) -> Union[None, QueryResponseInterface]:
         """
@@ -51,8 +74,45 @@ class SimpleQueryBus(BusInterface):
         Raises:
             HandlerNotFound: If no handler is registered for the query type.
         """
-        if type(cq) not in self._handlers:
-            raise HandlerNotFound.for_query(cq)
+        try:
+            handler = self._handlers[type(cq)]
+        except KeyError:
+            raise HandlerNotFound.for_query(cq) from None
+
+        if self._cache is None:
+            return handler(cq)
+
+        return self._cache.fetch(cq, handler)
+
+    def execute_many(
+        self, cqs: Iterable[QueryInterface]
+    ) -> List[Union[None, QueryResponseInterface]]:
+        """
+        Execute queries grouped by type, each group in a single handler call.
+
+        Batch-aware handlers receive the whole group in handle_many, other
+        handlers are called once per query. When the bus has middlewares,
+        they wrap every query on its own, so the handler is called once per
+        query too. When a cache is set, only the queries it misses are
+        executed.
+
+        Args:
+            cqs (Iterable[QueryInterface]): The queries to execute.
+
+        Returns:
+            List[Union[None, QueryResponseInterface]]: The responses, in order.
+
+        Raises:
+            HandlerNotFound: If a query has no handler, before any is executed.
+        """
+        cqs = list(cqs)
+        for cq in cqs:
+            if self._batches.find(type(cq)) is None:
+                raise HandlerNotFound.for_query(cq)
+
+        if self._cache is None:
+            return execute_grouped(cqs, self._batches.__getitem__)
 
-        handler = self._handlers[type(cq)]
-        return handler(cq)
+        return self._cache.fetch_many(
+            cqs, lambda missing: execute_grouped(missing, self._batches.__getitem__)
+        )
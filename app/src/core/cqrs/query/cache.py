@@ -0,0 +1,315 @@
+"""
+Module containing the query result cache of the query buses.
+
+Queries are frozen dataclasses, hence hashable: a query is its own cache
+key. Entries are evicted least recently used first, once the cache holds
+more than its maximum number of entries or bytes, and expire after the ttl
+of the policy of their query type. Commands declare the query types they
+make stale in their invalidates attribute, and command buses sharing the
+cache drop those entries once the command is executed.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+MISS = object()
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Represents how the results of a query type are cached.
+
+    Attributes:
+        ttl (Optional[float]): The seconds a result is served for, forever when None.
+        cacheable (bool): Whether the results are cached at all.
+    """
+
+    ttl: Optional[float] = 60.0
+    cacheable: bool = True
+
+
+def approximate_size(value: Any, depth: int = 3) -> int:
+    """
+    Returns the approximate memory size of value, following containers,
+    dataclasses and object attributes up to depth levels.
+    """
+    size = sys.getsizeof(value)
+    if depth == 0 or isinstance(value, (str, bytes, bytearray, int, float, bool)):
+        return size
+
+    if isinstance(value, dict):
+        return size + sum(
+            approximate_size(key, depth - 1) + approximate_size(item, depth - 1)
+            for key, item in value.items()
+        )
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approximate_size(item, depth - 1) for item in value)
+
+    if is_dataclass(value):
+        return size + sum(
+            approximate_size(getattr(value, field.name), depth - 1)
+            for field in fields(value)
+        )
+
+    if hasattr(value, "__dict__"):
+        return size + approximate_size(vars(value), depth - 1)
+
+    return size
+
+
+class QueryCache:  # pylint: disable=too-many-instance-attributes
+    """
+    A thread-safe LRU cache of query results with per-query-type ttl.
+
+    Args:
+        max_entries: The maximum number of cached results.
+        max_bytes: The memory budget of the cached results and their queries.
+        default_policy: The policy of the query types without a policy of their own.
+        policies: The policies of specific query types.
+        sizeof: Estimates the memory size of a query or result.
+        clock: Returns the current time in seconds.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        default_policy: CachePolicy = CachePolicy(),
+        policies: Optional[Dict[Type, CachePolicy]] = None,
+        sizeof: Callable[[Any], int] = approximate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_policy = default_policy
+        self.sizeof = sizeof
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._policies: Dict[Type, CachePolicy] = dict(policies or {})
+        # query -> (result, expiry, size)
+        self._entries: "OrderedDict[Any, Tuple[Any, float, int]]" = OrderedDict()
+        self._by_type: Dict[Type, Dict[Any, None]] = {}
+        # Bumped by invalidate, so results computed meanwhile are not cached
+        self._generations: Dict[Type, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """
+        The approximate memory size of the cached entries, in bytes.
+        """
+        return self._bytes
+
+    def set_policy(self, query_type: Type, policy: CachePolicy) -> None:
+        """
+        Sets the policy of a query type.
+        """
+        self._policies[query_type] = policy
+        if not policy.cacheable:
+            self.invalidate(query_type)
+
+    def policy(self, query_type: Type) -> CachePolicy:
+        """
+        Returns the policy of a query type.
+        """
+        return self._policies.get(query_type, self.default_policy)
+
+    def get(self, query: Any) -> Any:
+        """
+        Returns the cached result of query, or MISS.
+        """
+        with self._lock:
+            try:
+                entry = self._entries.get(query)
+            except TypeError:  # unhashable query
+                entry = None
+
+            if entry is not None:
+                if entry[1] > self.clock():
+                    self._entries.move_to_end(query)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(query)
+
+            self.misses += 1
+            return MISS
+
+    def fetch(self, query: Any, compute: Callable[[Any], Any]) -> Any:
+        """
+        Returns the cached result of query, or computes and caches it.
+
+        A result is not cached if the query type is invalidated while it is
+        being computed, since it may predate the invalidating command.
+        """
+        result = self.get(query)
+        if result is not MISS:
+            return result
+
+        generation = self._generations.get(type(query), 0)
+        result = compute(query)
+        self.put(query, result, generation)
+        return result
+
+    async def afetch(self, query: Any, compute: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Returns the cached result of query, or awaits, computes and caches it.
+        """
+        result = self.get(query)
+        if result is not MISS:
+            return result
+
+        generation = self._generations.get(type(query), 0)
+        result = await compute(query)
+        self.put(query, result, generation)
+        return result
+
+    def fetch_many(
+        self, queries: Sequence[Any], compute: Callable[[List[Any]], Sequence[Any]]
+    ) -> List[Any]:
+        """
+        Returns the results of queries, computing the missing ones in a single call.
+
+        Args:
+            queries: The queries to answer.
+            compute: Returns the results of a list of queries, in order.
+        """
+        results, missing, generations = self._lookup_many(queries)
+        if missing:
+            computed = compute([queries[index] for index in missing])
+            self._store_many(queries, results, missing, generations, computed)
+
+        return results
+
+    async def afetch_many(
+        self,
+        queries: Sequence[Any],
+        compute: Callable[[List[Any]], Awaitable[Sequence[Any]]],
+    ) -> List[Any]:
+        """
+        Returns the results of queries, awaiting the missing ones in a single call.
+        """
+        results, missing, generations = self._lookup_many(queries)
+        if missing:
+            computed = await compute([queries[index] for index in missing])
+            self._store_many(queries, results, missing, generations, computed)
+
+        return results
+
+    def _lookup_many(
+        self, queries: Sequence[Any]
+    ) -> Tuple[List[Any], List[int], List[int]]:
+        results = [self.get(query) for query in queries]
+        missing = [index for index, result in enumerate(results) if result is MISS]
+        generations = [
+            self._generations.get(type(queries[index]), 0) for index in missing
+        ]
+        return results, missing, generations
+
+    def _store_many(  # pylint: disable=too-many-arguments
+        self,
+        queries: Sequence[Any],
+        results: List[Any],
+        missing: List[int],
+        generations: List[int],
+        computed: Sequence[Any],
+    ) -> None:
+        for index, generation, result in zip(missing, generations, computed):
+            results[index] = result
+            # Partial results hold an exception in place of the missing ones
+            if not isinstance(result, BaseException):
+                self.put(queries[index], result, generation)
+
+    def put(self, query: Any, result: Any, generation: Optional[int] = None) -> None:
+        """
+        Caches the result of query according to the policy of its type.
+
+        Args:
+            query: The query, used as key.
+            result: The result of the query.
+            generation: When given, the result is only cached if the query
+                type has not been invalidated since this generation.
+        """
+        policy = self.policy(type(query))
+        if not policy.cacheable or policy.ttl == 0:
+            return
+
+        try:
+            hash(query)
+        except TypeError:
+            return
+
+        size = self.sizeof(query) + self.sizeof(result)
+        if size > self.max_bytes:
+            return
+
+        expiry = float("inf") if policy.ttl is None else self.clock() + policy.ttl
+        with self._lock:
+            if generation is not None and generation != self._generations.get(
+                type(query), 0
+            ):
+                return
+
+            if query in self._entries:
+                self._remove(query)
+
+            self._entries[query] = (result, expiry, size)
+            self._by_type.setdefault(type(query), {})[query] = None
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *query_types: Type) -> None:
+        """
+        Drops the cached results of the given query types.
+        """
+        with self._lock:
+            for query_type in query_types:
+                self._generations[query_type] = self._generations.get(query_type, 0) + 1
+                for query in list(self._by_type.get(query_type, ())):
+                    self._remove(query)
+
+    def invalidate_for(self, *commands: Any) -> None:
+        """
+        Drops the cached results of the query types the commands invalidate,
+        read from each command so that it may depend on its fields.
+        """
+        query_types = {
+            query_type
+            for command in commands
+            for query_type in getattr(command, "invalidates", ())
+        }
+        if query_types:
+            self.invalidate(*query_types)
+
+    def clear(self) -> None:
+        """
+        Drops every cached result.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._by_type.clear()
+            self._bytes = 0
+
+    def _remove(self, query: Any) -> None:
+        _, _, size = self._entries.pop(query)
+        self._bytes -= size
+
+        queries = self._by_type[type(query)]
+        del queries[query]
+        if not queries:
+            del self._by_type[type(query)]
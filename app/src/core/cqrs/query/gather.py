@@ -0,0 +1,97 @@
+"""
+Module for the scatter-gather execution of independent queries.
+
+The queries are all sent at once and their responses awaited together, so
+the latency of the whole is the one of the slowest query instead of the sum
+of all of them.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from core.cqrs.exceptions import QueryTimeout
+
+
+def fill_timeouts(
+    cqs: Sequence[Any],
+    results: Dict[int, Any],
+    timeout: Optional[float],
+    partial: bool,
+) -> List[Any]:
+    """
+    Returns the results of queries in order, from the ones received by position.
+
+    Args:
+        cqs: The queries.
+        results: The results received before the timeout, by query position.
+        timeout: The seconds waited for the results.
+        partial: Whether a QueryTimeout takes the place of each missing result,
+            instead of being raised for the first one.
+
+    Raises:
+        QueryTimeout: If a result is missing, unless partial.
+    """
+    ordered = []
+    for index, cq in enumerate(cqs):
+        if index in results:
+            ordered.append(results[index])
+            continue
+
+        error = QueryTimeout.for_query(cq, timeout)  # pyright: ignore
+        if not partial:
+            raise error
+
+        ordered.append(error)
+
+    return ordered
+
+
+async def gather(
+    execute: Callable[[Any], Awaitable[Any]],
+    cqs: Sequence[Any],
+    timeout: Optional[float] = None,
+    partial: bool = False,
+) -> List[Any]:
+    """
+    Executes queries concurrently and returns their results in order.
+
+    The queries still running at the timeout, or when a query fails, are
+    cancelled.
+
+    Args:
+        execute: Executes a single query.
+        cqs: The queries to execute.
+        timeout: The seconds to wait for all the results, forever when None.
+        partial: Whether a QueryTimeout takes the place of each missing result,
+            instead of being raised for the first one.
+
+    Raises:
+        QueryTimeout: If a query is still running at the timeout, unless partial.
+        Exception: The exception raised by the first failed query.
+    """
+    if not cqs:
+        return []
+
+    tasks = [asyncio.ensure_future(execute(cq)) for cq in cqs]
+    done, pending = await asyncio.wait(
+        tasks, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION
+    )
+    for task in pending:
+        task.cancel()
+
+    if pending:
+        await asyncio.wait(pending)
+
+    for task in done:
+        if task.exception() is not None:
+            raise task.exception()  # pyright: ignore
+
+    return fill_timeouts(
+        cqs,
+        {
+            index: task.result()
+            for index, task in enumerate(tasks)
+            if task not in pending
+        },
+        timeout,
+        partial,
+    )
@@ -1,9 +1,16 @@
 """Module containing base interfaces for queries."""
 
+# The seconds the broker query buses wait for a response by default.
+DEFAULT_QUERY_TIMEOUT = 30.0
+
 
 class QueryInterface:  # pylint: disable=too-few-public-methods
     """Base interface for query."""
 
+    __slots__ = ()
+
 
 class QueryResponseInterface:  # pylint: disable=too-few-public-methods
     """Interface for query responses."""
+
+    __slots__ = ()
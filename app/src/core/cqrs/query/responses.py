@@ -0,0 +1,173 @@
+"""
+Module routing the responses received by the broker query buses to the
+queries awaiting them.
+
+A broker query bus reads its response queues from a single task, for as long
+as responses are awaited, and hands each response over by the uuid of its
+query. Concurrent queries thus neither read the broker at once nor take the
+responses of one another.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+)
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.query.stream import StreamBuffer
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(deadline - time.time(), 0.0)
+
+
+class ResponseRouter:
+    """
+    Routes the received responses to the queries awaiting them, by uuid.
+
+    A query expects its response before it is sent, so the response cannot
+    arrive unclaimed. Responses nobody awaits, such as late ones, are
+    dropped. The consume coroutine function is started with the first
+    expected response and is meant to return once none is awaited anymore:
+    it reads the response queues listed in topics and routes what it reads.
+    When it fails, the error is raised in every query awaiting a response.
+
+    Args:
+        consume: Reads the response queues while responses are awaited.
+
+    Attributes:
+        topics (Set[str]): The response queues expected responses arrive on.
+    """
+
+    def __init__(self, consume: Callable[[], Awaitable[None]]) -> None:
+        self.topics: Set[str] = set()
+        self._consume = consume
+        self._task: Optional[asyncio.Future] = None
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, asyncio.Queue] = {}
+
+    def __len__(self) -> int:
+        return len(self._futures) + len(self._streams)
+
+    @contextmanager
+    def expect(
+        self, topics: Iterable[str], uuids: Iterable[str]
+    ) -> Iterator[Dict[str, asyncio.Future]]:
+        """
+        Awaits the responses to uuids, arriving on topics, for the duration
+        of the with block, and yields their futures by uuid.
+        """
+        loop = asyncio.get_running_loop()
+        futures = {uuid: loop.create_future() for uuid in uuids}
+        self._futures.update(futures)
+        self._start(topics)
+        try:
+            yield futures
+        finally:
+            for uuid in futures:
+                self._futures.pop(uuid, None)
+
+    @contextmanager
+    def expect_stream(self, topic: str, uuid: str) -> Iterator[asyncio.Queue]:
+        """
+        Awaits the streamed response to uuid, arriving on topic, for the
+        duration of the with block, and yields the queue of its messages.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._streams[uuid] = queue
+        self._start([topic])
+        try:
+            yield queue
+        finally:
+            self._streams.pop(uuid, None)
+
+    def route(self, ap: AsyncProtocol) -> bool:
+        """
+        Hands a received response over to the query awaiting it, and returns
+        whether one awaited it.
+        """
+        queue = self._streams.get(ap.uuid)
+        if queue is not None:
+            queue.put_nowait(ap)
+            return True
+
+        future = self._futures.pop(ap.uuid, None)
+        if future is None or future.done():
+            return False
+
+        future.set_result(ap.to_cq())
+        return True
+
+    def fail(self, error: Exception) -> None:
+        """
+        Raises error in every query awaiting a response.
+        """
+        for future in self._futures.values():
+            if not future.done():
+                future.set_exception(error)
+        for queue in self._streams.values():
+            queue.put_nowait(error)
+
+        self._futures.clear()
+        self._streams.clear()
+
+    @staticmethod
+    async def collect(
+        futures: Dict[str, asyncio.Future], deadline: Optional[float]
+    ) -> Dict[str, Any]:
+        """
+        Awaits futures until all are done or the deadline passes, never when
+        None, and returns the received responses by uuid.
+        """
+        if futures:
+            await asyncio.wait(futures.values(), timeout=_remaining(deadline))
+
+        return {
+            uuid: future.result() for uuid, future in futures.items() if future.done()
+        }
+
+    @staticmethod
+    async def stream(
+        queue: asyncio.Queue, uuid: str, deadline: Optional[float]
+    ) -> AsyncIterator[Any]:
+        """
+        Yields the chunks of the streamed response to uuid, in order, as
+        their messages arrive in queue.
+
+        Raises:
+            TimeoutError: If the deadline passes before the end of the stream.
+        """
+        buffer = StreamBuffer()
+        while not buffer.done:
+            try:
+                message = await asyncio.wait_for(queue.get(), _remaining(deadline))
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Stream {uuid} pending") from None
+
+            if isinstance(message, Exception):
+                raise message
+
+            buffer.add(message)
+            for chunk in buffer.ready():
+                yield chunk
+
+    def _start(self, topics: Iterable[str]) -> None:
+        self.topics.update(topics)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        try:
+            await self._consume()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # Nobody awaits this task, the queries awaiting responses do
+            self.fail(error)
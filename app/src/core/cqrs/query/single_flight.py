@@ -0,0 +1,55 @@
+"""
+Module containing the single-flight coalescing of identical in-flight queries.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Runs a single execution per key among concurrent callers.
+
+    The first caller of a key starts the execution; callers arriving while
+    it is in flight await the same result, or exception, instead of starting
+    their own. The key is forgotten once the execution completes, so later
+    callers start a fresh one. Unhashable keys are never coalesced.
+
+    Cancelling a caller does not cancel the execution others are waiting on.
+
+    Attributes:
+        shared (int): The number of callers served by another caller's execution.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Any, asyncio.Future] = {}
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Any, compute: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Returns the result of compute(key), sharing an in-flight execution of key.
+        """
+        try:
+            future = self._calls.get(key)
+        except TypeError:  # unhashable key
+            return await compute(key)
+
+        if future is None:
+            future = asyncio.ensure_future(compute(key))
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Any, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        # Mark the exception as retrieved, in case every caller was cancelled.
+        if not future.cancelled():
+            future.exception()
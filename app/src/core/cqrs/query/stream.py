@@ -0,0 +1,82 @@
+"""
+Module for the streamed responses of queries.
+
+A query handler streams its response by being an async generator, or by
+returning any async iterable: every item it yields is sent back as soon as
+it is produced, so neither the handler nor the reply holds the whole result.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.codec import JSON, Codec
+
+
+def is_stream(result: Any) -> bool:
+    """
+    Whether a handler result is streamed.
+    """
+    return hasattr(result, "__aiter__")
+
+
+async def response_messages(
+    result: Any, uuid: str, codec: Codec = JSON
+) -> AsyncIterator[bytes]:
+    """
+    Yields the messages replying with result to the query of uuid, encoded
+    with codec.
+
+    A streamed result is replied with a chunk message per item followed by
+    the end message, any other result with a single message.
+    """
+    if not is_stream(result):
+        yield AsyncProtocol.from_cq(result, uuid=uuid).to_bytes(codec)
+        return
+
+    count = 0
+    async for chunk in result:
+        yield AsyncProtocol.from_cq(chunk, uuid=uuid, sequence=count).to_bytes(codec)
+        count += 1
+
+    yield AsyncProtocol.end_of_stream(uuid, count).to_bytes(codec)
+
+
+class StreamBuffer:
+    """
+    Puts the messages of a streamed response back in order.
+
+    Brokers may deliver the chunks of a stream out of order, across
+    partitions for instance, so early chunks are held until the ones before
+    them arrived. A response that is not streamed is a stream of one chunk.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: Dict[int, Any] = {}
+        self._next = 0
+        self._count: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether every chunk of the stream has been taken.
+        """
+        return self._count is not None and self._next >= self._count
+
+    def add(self, ap: AsyncProtocol) -> None:
+        """
+        Adds a received message of the stream.
+        """
+        if ap.end:
+            self._count = ap.sequence
+        elif ap.sequence is None:
+            self._chunks[0] = ap.to_cq()
+            self._count = 1
+        else:
+            self._chunks[ap.sequence] = ap.to_cq()
+
+    def ready(self) -> Iterator[Any]:
+        """
+        Takes the chunks following the ones already taken, in order.
+        """
+        while self._next in self._chunks:
+            yield self._chunks.pop(self._next)
+            self._next += 1
@@ -0,0 +1,230 @@
+"""
+This module contains the handler registry, which maps command and query
+types to the handlers declared for them with the handles decorator.
+
+The registry can be saved as a manifest, mapping each fqdn to the module
+and qualified name of its handler, with:
+
+    python -m core.cqrs.registry build example -o handlers.json
+
+A registry loaded from a manifest imports a handler module only when the
+handler is first needed, so a worker only pays for the handlers it uses.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+from inspect import isclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type
+from core.di import Container, Provider
+from core.cqrs.command.command import BaseCommandInterface
+from core.cqrs.query.query import QueryInterface
+from core.cqrs.exceptions import CommandAlreadyRegistered, QueryAlreadyRegistered
+from core.cqrs.message_types import TYPES
+
+COMMAND = "command"
+QUERY = "query"
+
+
+def fqdn_of(cq: Type) -> str:
+    """
+    Returns the fqdn a command or query type is sent and registered under.
+    """
+    return ".".join([cq.__module__, cq.__name__])
+
+
+def _kind_of(cq: Type) -> str:
+    if issubclass(cq, BaseCommandInterface):
+        return COMMAND
+    if issubclass(cq, QueryInterface):
+        return QUERY
+
+    raise ValueError(f"{cq} is neither a command nor a query")
+
+
+class HandlerRegistry:
+    """
+    This class maps the fqdn of commands and queries to their handler.
+
+    Targets are "module:qualname" strings, grouped by kind (COMMAND or
+    QUERY); handlers are imported from their target on first load.
+    """
+
+    def __init__(self, manifest: Optional[str] = None) -> None:
+        self._targets: Dict[str, Dict[str, str]] = {COMMAND: {}, QUERY: {}}
+        self._handlers: Dict[str, Any] = {}
+
+        if manifest is not None and os.path.exists(manifest):
+            self.load_manifest(manifest)
+
+    def __len__(self) -> int:
+        return sum(len(targets) for targets in self._targets.values())
+
+    def handles(self, cq: Type) -> Callable[[Any], Any]:
+        """
+        This decorator declares the decorated class or function as the handler of cq.
+
+        Raises:
+            CommandAlreadyRegistered: If another handler is declared for the command.
+            QueryAlreadyRegistered: If another handler is declared for the query.
+        """
+        kind = _kind_of(cq)
+        fqdn = fqdn_of(cq)
+
+        def _wrapper(handler: Any) -> Any:
+            target = f"{handler.__module__}:{handler.__qualname__}"
+            if self._targets[kind].get(fqdn, target) != target:
+                if kind == COMMAND:
+                    raise CommandAlreadyRegistered.for_command(fqdn)
+                raise QueryAlreadyRegistered.for_query(fqdn)  # pyright: ignore
+
+            self._targets[kind][fqdn] = target
+            self._handlers[fqdn] = handler
+            TYPES.register(cq)
+            return handler
+
+        return _wrapper
+
+    def fqdns(self, kind: str) -> List[str]:
+        """
+        Returns the fqdns which have a handler of the given kind.
+        """
+        return list(self._targets[kind])
+
+    def has(self, kind: str, fqdn: str) -> bool:
+        """
+        Whether a handler of the given kind is declared for fqdn.
+        """
+        return fqdn in self._targets[kind]
+
+    def load(self, fqdn: str) -> Any:
+        """
+        Returns the handler declared for fqdn, importing its module if needed.
+
+        Raises:
+            KeyError: If no handler is declared for fqdn.
+        """
+        handler = self._handlers.get(fqdn)
+        if handler is not None:
+            return handler
+
+        target = self._targets[COMMAND].get(fqdn) or self._targets[QUERY][fqdn]
+        module_name, qualname = target.split(":")
+        handler = importlib.import_module(module_name)
+        for name in qualname.split("."):
+            handler = getattr(handler, name)
+
+        self._handlers[fqdn] = handler
+        return handler
+
+    def resolve(self, fqdn: str, container: Optional[Container] = None) -> Any:
+        """
+        Returns a handler for fqdn, ready to be registered on a bus.
+
+        Functions are returned as is. Classes bound in the container are
+        returned as their Provider, so buses build them with their lifetime,
+        other classes are instantiated.
+
+        A handler imported after the container was frozen is bound on the
+        container it was injected into, which the frozen snapshot no longer
+        sees: it is returned as the Provider it was injected with.
+        """
+        handler = self.load(fqdn)
+        if not isclass(handler):
+            return handler
+
+        if container is not None:
+            binding = container.binding(handler)
+            if not isinstance(binding, Provider):
+                binding = getattr(handler, "__di_provider__", None)
+            if isinstance(binding, Provider):
+                return binding
+
+        return handler()
+
+    def scan(self, packages: Iterable[str]) -> None:
+        """
+        Imports every module of packages, declaring the handlers they contain.
+
+        Directories are walked on disk, so namespace packages, which have no
+        __init__ module, are scanned too.
+        """
+        for package_name in packages:
+            package = importlib.import_module(package_name)
+            for path in getattr(package, "__path__", ()):
+                for directory, subdirectories, files in os.walk(path):
+                    subdirectories[:] = sorted(
+                        name for name in subdirectories if name.isidentifier()
+                    )
+                    relative = os.path.relpath(directory, path)
+                    prefix = ".".join(
+                        [package_name]
+                        if relative == os.curdir
+                        else [package_name, *relative.split(os.sep)]
+                    )
+                    for file in sorted(files):
+                        name, extension = os.path.splitext(file)
+                        if extension == ".py" and name != "__init__":
+                            importlib.import_module(f"{prefix}.{name}")
+
+    def manifest(self) -> Dict[str, Dict[str, str]]:
+        """
+        Returns the targets of the declared handlers, by kind and fqdn.
+        """
+        return {
+            kind: dict(sorted(targets.items()))
+            for kind, targets in self._targets.items()
+        }
+
+    def load_manifest(self, path: str) -> None:
+        """
+        Declares the handlers listed in a manifest, without importing them.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        for kind, targets in manifest.items():
+            self._targets[kind].update(targets)
+
+    def save_manifest(self, path: str) -> None:
+        """
+        Writes the manifest of the declared handlers to path.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, delete=False, encoding="utf-8"
+        ) as file:
+            json.dump(self.manifest(), file, indent=4)
+            file.write("\n")
+
+        os.replace(file.name, path)
+
+
+registry = HandlerRegistry(os.getenv("CQRS_HANDLER_MANIFEST"))
+handles = registry.handles
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Builds the manifest of the handlers declared in the given packages.
+    """
+    parser = argparse.ArgumentParser(prog="python -m core.cqrs.registry")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build the handler manifest")
+    build.add_argument("packages", nargs="+")
+    build.add_argument("-o", "--output", default="handlers.json")
+    arguments = parser.parse_args(argv)
+
+    registry.scan(arguments.packages)
+    registry.save_manifest(arguments.output)
+    print(f"{len(registry)} handlers written to {arguments.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    # Handlers declare themselves on core.cqrs.registry.registry, not on the
+    # registry of this __main__ module.
+    sys.exit(importlib.import_module("core.cqrs.registry").main())
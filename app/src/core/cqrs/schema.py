@@ -0,0 +1,274 @@
+"""
+Module containing the schemas converting messages to their parameters.
+
+A schema is compiled once per message type from its dataclass fields: it
+reads the fields directly, so slotted dataclasses are supported, and
+converts the values JSON cannot hold with converters chosen from the field
+annotations, so no per-message type inspection is needed.
+
+Fields annotated with datetime, date, UUID or Decimal are sent as strings,
+enums as their value, nested dataclasses as their own parameters and tuples
+and sets as lists, also within containers and dict values. Other values
+are sent as is.
+"""
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import types
+import typing
+import uuid
+from collections import abc
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+Converter = Callable[[Any], Any]
+
+
+class Schema:  # pylint: disable=too-few-public-methods
+    """
+    The compiled conversions of a message type to its parameters and back.
+
+    The conversions of a dataclass are generated as the source of a dump
+    and a load function, as dataclasses does for __init__, so that a
+    message costs a function call rather than a loop over its fields. The
+    dump of a dataclass whose instances keep their fields in a dictionary
+    copies it and only converts the fields needing it; a slotted one reads
+    each field. A dataclass without converted fields is loaded by its class
+    directly. The types which are not dataclasses are converted from and to
+    their instance dictionary.
+
+    Attributes:
+        cls (Type): The message type.
+        names (Optional[Tuple[str, ...]]): The names of the fields, None if
+            the message type is not a dataclass.
+        dump (Callable[[Any], Dict[str, Any]]): Returns the parameters of a
+            message, ready to be encoded.
+        load (Callable[..., Any]): Returns the message built from its
+            decoded parameters, passed as keyword arguments.
+    """
+
+    __slots__ = ("cls", "names", "dump", "load")
+
+    def __init__(self, cls: Type) -> None:
+        self.cls = cls
+        self.names: Optional[Tuple[str, ...]] = None
+        self.dump: Callable[[Any], Dict[str, Any]] = _instance_dictionary
+        self.load: Callable[..., Any] = cls
+        if not dataclasses.is_dataclass(cls):
+            return
+
+        fields = [field for field in dataclasses.fields(cls) if field.init]
+        self.names = tuple(field.name for field in fields)
+        hints = _type_hints(cls)
+        namespace: Dict[str, Any] = {"cls": cls}
+        # The instance dictionary holds the parameters as is, unless the
+        # fields are slotted or some are not parameters of __init__
+        copied = _has_instance_dictionary(cls) and len(fields) == len(
+            dataclasses.fields(cls)
+        )
+        dumped = []
+        loaded = []
+        for index, field in enumerate(fields):
+            name = field.name
+            converters = _converters(hints.get(name, field.type))
+            if converters is None:
+                if not copied:
+                    dumped.append(f"{name!r}: message.{name}")
+                continue
+
+            namespace[f"dump_{index}"], namespace[f"load_{index}"] = converters
+            if copied:
+                dumped.append(
+                    f"    if (value := parameters[{name!r}]) is not None:\n"
+                    f"        parameters[{name!r}] = dump_{index}(value)\n"
+                )
+            else:
+                dumped.append(
+                    f"{name!r}: None if (value := message.{name}) is None"
+                    f" else dump_{index}(value)"
+                )
+            loaded.append(
+                f"    if (value := parameters.get({name!r})) is not None:\n"
+                f"        parameters[{name!r}] = load_{index}(value)\n"
+            )
+
+        if copied:
+            source = (
+                "def dump(message):\n"
+                "    parameters = message.__dict__.copy()\n"
+                + "".join(dumped)
+                + "    return parameters\n"
+            )
+        else:
+            source = f"def dump(message):\n    return {{{', '.join(dumped)}}}\n"
+        if loaded:
+            source += (
+                "def load(**parameters):\n"
+                + "".join(loaded)
+                + "    return cls(**parameters)\n"
+            )
+        exec(source, namespace)  # pylint: disable=exec-used
+        self.dump = namespace["dump"]
+        self.load = namespace.get("load", cls)
+
+
+_schemas: Dict[Type, Schema] = {}
+
+
+def schema_of(cls: Type) -> Schema:
+    """
+    Returns the schema of a message type, compiled on first use.
+    """
+    schema = _schemas.get(cls)
+    if schema is None:
+        schema = _schemas[cls] = Schema(cls)
+
+    return schema
+
+
+def _instance_dictionary(message: Any) -> Dict[str, Any]:
+    return dict(getattr(message, "__dict__", {}))
+
+
+def _has_instance_dictionary(cls: Type) -> bool:
+    """
+    Returns whether the instances of cls have a __dict__, which a class gets
+    unless it and all its bases declare __slots__.
+    """
+    return any("__dict__" in vars(base) for base in cls.__mro__)
+
+
+def _type_hints(cls: Type) -> Dict[str, Any]:
+    """
+    Returns the resolved annotations of cls, or none if they cannot be, in
+    which case its values are sent as is.
+    """
+    try:
+        return typing.get_type_hints(cls)
+    except (NameError, TypeError):
+        return {}
+
+
+def _converters(annotation: Any) -> Optional[Tuple[Converter, Converter]]:
+    """
+    Returns the functions dumping and loading the non None values annotated
+    with annotation, or None if they are sent as is.
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union or origin is types.UnionType:
+        members = [arg for arg in args if arg is not types.NoneType]
+        return _converters(members[0]) if len(members) == 1 else None
+
+    if origin is not None or annotation in (tuple, set, frozenset):
+        # Bare tuples and sets are containers of items sent as is
+        return _generic_converters(origin or annotation, args)
+
+    if not isinstance(annotation, type):
+        return None
+    if dataclasses.is_dataclass(annotation):
+        return _nested_converters(annotation)
+    for base, converters in _SCALARS.items():
+        if issubclass(annotation, base):
+            return converters(annotation)
+
+    return None
+
+
+def _nested_converters(cls: Type) -> Tuple[Converter, Converter]:
+    """
+    Returns the converters of a nested dataclass, whose schema is compiled
+    when first used so that recursive types are supported.
+    """
+
+    def dump(value: Any) -> Any:
+        return schema_of(cls).dump(value)
+
+    def load(value: Any) -> Any:
+        return schema_of(cls).load(**value)
+
+    return dump, load
+
+
+def _generic_converters(
+    origin: Any, args: Tuple[Any, ...]
+) -> Optional[Tuple[Converter, Converter]]:
+    """
+    Returns the converters of a parameterized container, or None if its
+    items are sent as is.
+    """
+    if origin is tuple and args and args[-1] is not Ellipsis:
+        items = [_converters(arg) for arg in args]
+        dumpers = [_nullable(item[0]) if item else _same for item in items]
+        loaders = [_nullable(item[1]) if item else _same for item in items]
+        return (
+            lambda value: [dump(item) for dump, item in zip(dumpers, value)],
+            lambda value: tuple(load(item) for load, item in zip(loaders, value)),
+        )
+
+    if origin in (dict, abc.Mapping, abc.MutableMapping) and len(args) == 2:
+        values = _converters(args[1])
+        if values is None:
+            return None
+
+        dump_value, load_value = _nullable(values[0]), _nullable(values[1])
+        return (
+            lambda value: {key: dump_value(item) for key, item in value.items()},
+            lambda value: {key: load_value(item) for key, item in value.items()},
+        )
+
+    container = _CONTAINERS.get(origin)
+    if container is None:
+        return None
+
+    items = _converters(args[0]) if args else None
+    if items is None:
+        return None if container is list else (list, container)
+
+    dump_item, load_item = _nullable(items[0]), _nullable(items[1])
+    return (
+        lambda value: [dump_item(item) for item in value],
+        lambda value: container(load_item(item) for item in value),
+    )
+
+
+# The type the items of a container are loaded in, by container origin.
+# Tuples and sets are loaded back from the lists JSON holds them in, even
+# when their items need no conversion, so that frozen messages stay hashable.
+_CONTAINERS: Dict[Any, Callable[..., Any]] = {
+    list: list,
+    abc.Sequence: list,
+    abc.MutableSequence: list,
+    tuple: tuple,
+    set: set,
+    abc.MutableSet: set,
+    frozenset: frozenset,
+    abc.Set: frozenset,
+}
+
+
+# The converters of the scalar types JSON cannot hold, by the base type of
+# the annotation, tried in order so that datetime comes before date.
+_SCALARS: Dict[Type, Callable[[Type], Tuple[Converter, Converter]]] = {
+    enum.Enum: lambda cls: (attrgetter("value"), cls),
+    datetime.datetime: lambda _: (
+        datetime.datetime.isoformat,
+        datetime.datetime.fromisoformat,
+    ),
+    datetime.date: lambda _: (datetime.date.isoformat, datetime.date.fromisoformat),
+    uuid.UUID: lambda cls: (str, cls),
+    decimal.Decimal: lambda cls: (str, cls),
+}
+
+
+def _nullable(convert: Converter) -> Converter:
+    """
+    Returns convert, letting None through.
+    """
+    return lambda value: None if value is None else convert(value)
+
+
+def _same(value: Any) -> Any:
+    return value
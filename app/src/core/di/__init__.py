@@ -4,5 +4,7 @@ that can be used to inject dependencies into classes
 automatically using the inject decorator.
 """
 
-from .container import Container, di
+from .container import Container, Scope, di, use_container, current_container
 from .inject import inject
+from .pool import InstancePool
+from .provider import Lifetime, Provider
@@ -3,21 +3,70 @@ This module contains the Container class which is a simple
 implementation of a dependency injection container.
 """
 
-from typing import Union, Type, Any, Dict, TypeVar, overload
-from .exceptions import ContainerServiceNotFoundError
+from __future__ import annotations
+import asyncio
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Union,
+    Type,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    overload,
+)
+from .exceptions import (
+    ContainerServiceNotFoundError,
+    ContainerScopeError,
+    ContainerFrozenError,
+)
+from .graph import dependency_graph, topological_levels
+from .profiler import ResolutionProfiler
+from .provider import Lifetime, Provider
 
 T = TypeVar("T")
 
+_MISSING = object()
+
+_active: ContextVar[Optional[Container]] = ContextVar(
+    "core_di_active_container", default=None
+)
+
 
 class Container:
     """
     This class is a simple implementation of a dependency injection container.
+
+    A binding is either a plain value, returned as is, or a Provider,
+    which builds the service lazily according to its lifetime.
+
+    A container created with a parent overlays the parent bindings:
+    lookups fall back to the parent and writes stay local.
+
+    Once frozen, a container is an immutable flat snapshot which can be
+    read from many threads without locking.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, parent: Optional[Container] = None) -> None:
         self._bindings: Dict[Union[str, Type], Any] = {}
+        self._parent = parent
+        self._ancestors: tuple = () if parent is None else (*parent._ancestors, parent)
+        self._frozen = False
+        self.profiler: Optional[ResolutionProfiler] = (
+            None if parent is None else parent.profiler
+        )
 
     def __setitem__(self, key: Union[str, Type], value: Any) -> None:
+        if self._frozen:
+            raise ContainerFrozenError(f"Cannot bind {key}, the container is frozen")
+
         # If value is a string, it is an alias
         self._bindings[key] = value
 
@@ -28,16 +77,471 @@ class Container:
     def __getitem__(self, key: Type[T]) -> T: ...
 
     def __getitem__(self, key: Union[str, Type]) -> Any:
-        if key not in self:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
             raise ContainerServiceNotFoundError(f"Service {key} not found in container")
 
-        return self._bindings[key]
+        return value
 
     def __contains__(self, key: Union[str, Type]) -> bool:
-        return key in self._bindings
+        container: Optional[Container] = self
+        while container is not None:
+            if key in container._bindings:
+                return True
+            container = container._parent
+
+        return False
+
+    def get(self, key: Union[str, Type], default: Any = None) -> Any:
+        """
+        Returns the service bound to key, or default if it is not bound.
+        """
+        if self.profiler is not None:
+            return self._profiled_get(key, default)
+
+        # pylint: disable=protected-access
+        container: Optional[Container] = self
+        while container is not None:
+            value = container._bindings.get(key, _MISSING)
+            if value is not _MISSING:
+                if isinstance(value, Provider):
+                    return value.resolve(self)
+                return value
+            container = container._parent
+
+        return default
+
+    def _profiled_get(self, key: Union[str, Type], default: Any) -> Any:
+        value = self.binding(key, _MISSING)
+        if value is _MISSING:
+            return default
+
+        if not isinstance(value, Provider):
+            self.profiler.record(key, 0.0, True)  # pyright: ignore
+            return value
+
+        if value.lifetime is Lifetime.SINGLETON:
+            hit = value.built
+        else:
+            hit = value.lifetime is not Lifetime.TRANSIENT and self.has_scoped(value)
+
+        start = time.perf_counter()
+        try:
+            return value.resolve(self)
+        finally:
+            self.profiler.record(  # pyright: ignore
+                key, time.perf_counter() - start, hit
+            )
+
+    def enable_profiling(
+        self, profiler: Optional[ResolutionProfiler] = None
+    ) -> ResolutionProfiler:
+        """
+        Records the resolutions of this container and of the scopes opened afterwards.
+
+        Profiling is off by default and only costs an attribute check when off.
+        """
+        self.profiler = profiler or ResolutionProfiler()
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """
+        Stops recording the resolutions of this container.
+        """
+        self.profiler = None
+
+    def binding(self, key: Union[str, Type], default: Any = None) -> Any:
+        """
+        Returns the raw binding of key, without resolving providers.
+        """
+        # pylint: disable=protected-access
+        container: Optional[Container] = self
+        while container is not None:
+            value = container._bindings.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            container = container._parent
+
+        return default
+
+    async def aget(self, key: Union[str, Type]) -> Any:
+        """
+        Returns the service bound to key, awaiting async factories.
+        """
+        value = self.binding(key, _MISSING)
+        if value is _MISSING:
+            raise ContainerServiceNotFoundError(f"Service {key} not found in container")
+
+        if isinstance(value, Provider):
+            return await value.aresolve(self)
+
+        return value
+
+    def register(
+        self,
+        key: Union[str, Type],
+        factory: Callable[[], Any],
+        lifetime: Lifetime = Lifetime.SINGLETON,
+        dependencies: Optional[Iterable[Any]] = None,
+        pool_size: Optional[int] = None,
+    ) -> Provider:
+        """
+        Binds key to a factory which is called lazily on resolution.
+
+        Args:
+            key: The name or type the service is bound to.
+            factory: The callable, or coroutine function, building the service.
+            lifetime: How long a built service is reused.
+            dependencies: The keys the factory needs, inferred from the
+                injection plan of the factory when omitted.
+            pool_size: The maximum number of instances of a pooled service.
+        """
+        provider = Provider(
+            factory,
+            lifetime,
+            None if dependencies is None else tuple(dependencies),
+            pool_size,
+        )
+        self[key] = provider
+        return provider
+
+    def singleton(
+        self,
+        key: Union[str, Type],
+        factory: Callable[[], Any],
+        dependencies: Optional[Iterable[Any]] = None,
+    ) -> Provider:
+        """
+        Binds key to a factory called once, on first resolution.
+        """
+        return self.register(key, factory, Lifetime.SINGLETON, dependencies)
+
+    def transient(
+        self,
+        key: Union[str, Type],
+        factory: Callable[[], Any],
+        dependencies: Optional[Iterable[Any]] = None,
+    ) -> Provider:
+        """
+        Binds key to a factory called on every resolution.
+        """
+        return self.register(key, factory, Lifetime.TRANSIENT, dependencies)
+
+    def scoped(
+        self,
+        key: Union[str, Type],
+        factory: Callable[[], Any],
+        dependencies: Optional[Iterable[Any]] = None,
+    ) -> Provider:
+        """
+        Binds key to a factory called once per scope.
+        """
+        return self.register(key, factory, Lifetime.SCOPED, dependencies)
+
+    def pooled(
+        self,
+        key: Union[str, Type],
+        factory: Callable[[], Any],
+        size: Optional[int] = None,
+        dependencies: Optional[Iterable[Any]] = None,
+    ) -> Provider:
+        """
+        Binds key to a bounded pool of instances, lent to one scope or lease at a time.
+        """
+        return self.register(key, factory, Lifetime.POOLED, dependencies, size)
+
+    @contextmanager
+    def lease(
+        self, key: Union[str, Type], timeout: Optional[float] = None
+    ) -> Iterator[Any]:
+        """
+        Checks out the service bound to key for the duration of the with block.
+
+        Pooled services are taken from their pool, waiting up to timeout
+        seconds for a release, and returned to it on exit; other services
+        are resolved as usual.
+
+        Raises:
+            ContainerServiceNotFoundError: If key is not bound.
+            ContainerPoolExhaustedError: If no pooled instance was released in time.
+        """
+        value = self.binding(key, _MISSING)
+        if value is _MISSING:
+            raise ContainerServiceNotFoundError(f"Service {key} not found in container")
+
+        if not isinstance(value, Provider) or value.pool is None:
+            yield self.get(key)
+            return
+
+        with value.pool.lease(timeout) as instance:
+            yield instance
+
+    def _flatten(self) -> Dict[Union[str, Type], Any]:
+        # pylint: disable=protected-access
+        containers: List[Container] = []
+        container: Optional[Container] = self
+        while container is not None:
+            containers.append(container)
+            container = container._parent
+
+        bindings: Dict[Union[str, Type], Any] = {}
+        for container in reversed(containers):
+            bindings.update(container._bindings)
+
+        return bindings
+
+    def providers(self) -> Dict[Union[str, Type], Provider]:
+        """
+        Returns the providers visible from this container, by key.
+        """
+        return {
+            key: value
+            for key, value in self._flatten().items()
+            if isinstance(value, Provider)
+        }
+
+    @property
+    def frozen(self) -> bool:
+        """
+        Whether the container has been frozen.
+        """
+        return self._frozen
+
+    def freeze(self) -> Container:
+        """
+        Turns the container into an immutable, read-optimized snapshot.
+
+        The parent bindings are copied into a single flat dict, so lookups
+        no longer walk the parent chain, and singletons already built are
+        stored as plain values. Any later write raises ContainerFrozenError;
+        scopes can still be opened from a frozen container.
+        """
+        bindings = self._flatten()
+        for key, value in bindings.items():
+            if (
+                isinstance(value, Provider)
+                and value.lifetime is Lifetime.SINGLETON
+                and value.built
+            ):
+                bindings[key] = value.resolve(self)
+
+        self._bindings = bindings
+        self._parent = None
+        self._frozen = True
+        return self
+
+    async def warm_up(self, *keys: Union[str, Type]) -> None:
+        """
+        Builds singleton services ahead of their first resolution.
+
+        The dependency graph of keys (all async providers by default) is
+        sorted topologically; each level is built concurrently with
+        asyncio.gather once the previous levels are ready. Pools among
+        keys are filled up to their size.
+
+        Raises:
+            ContainerCycleError: If the dependency graph contains a cycle.
+        """
+        if not keys:
+            keys = tuple(
+                key for key, provider in self.providers().items() if provider.is_async
+            )
+
+        for level in topological_levels(dependency_graph(self, keys)):
+            singletons = [
+                key
+                for key in level
+                if isinstance(provider := self.binding(key), Provider)
+                and provider.lifetime is Lifetime.SINGLETON
+            ]
+            await asyncio.gather(*(self.aget(key) for key in singletons))
+
+            for key in level:
+                if (
+                    isinstance(provider := self.binding(key), Provider)
+                    and provider.pool
+                ):
+                    provider.pool.fill()
+
+    def has_scoped(self, provider: Provider) -> bool:  # pylint: disable=unused-argument
+        """
+        Whether this container holds an instance of a scoped provider.
+        """
+        return False
+
+    def resolve_scoped(self, provider: Provider) -> Any:
+        """
+        Returns the instance of a scoped provider for this container.
+        """
+        raise ContainerScopeError(
+            f"Scoped service {provider.factory} cannot be resolved outside of a scope"
+        )
+
+    def resolve_pooled(self, provider: Provider) -> Any:
+        """
+        Returns the instance of a pooled provider leased by this container.
+        """
+        raise ContainerScopeError(
+            f"Pooled service {provider.factory} must be leased or resolved within a scope"
+        )
+
+    def scope(self) -> Scope:
+        """
+        Opens a child scope overlaying this container.
+        """
+        return Scope(self)
+
+    def active(self) -> Container:
+        """
+        Returns the entered scope descending from this container, or the container itself.
+
+        Injected callables resolve through this method, so services built
+        while a scope is entered receive the scoped bindings.
+        """
+        active = _active.get()
+        # pylint: disable-next=protected-access
+        if active is None or (active is not self and self not in active._ancestors):
+            return self
+
+        return active
+
+
+class Scope(Container):
+    """
+    This class is a short-lived child container, typically opened per message.
+
+    Scoped services are built once per scope and disposed, by calling their
+    close method, in reverse creation order when the scope is closed.
+    Pooled services are checked out once per scope and returned to their
+    pool, without being closed, when the scope is closed.
+    Entering the scope makes it the active container of the current context.
+    """
+
+    def __init__(self, parent: Container) -> None:
+        super().__init__(parent)
+        self._instances: Optional[Dict[Provider, Any]] = None
+        self._disposables: Optional[List[Any]] = None
+        self._leases: Optional[List[Provider]] = None
+        self._token: Any = None
+
+    def has_scoped(self, provider: Provider) -> bool:
+        return self._instances is not None and provider in self._instances
+
+    def resolve_scoped(self, provider: Provider) -> Any:
+        if self._instances is None:
+            self._instances = {}
+        elif provider in self._instances:
+            return self._instances[provider]
+
+        token = _active.set(self)
+        try:
+            instance = provider.factory()
+        finally:
+            _active.reset(token)
+
+        self._instances[provider] = instance
+        if hasattr(instance, "close"):
+            if self._disposables is None:
+                self._disposables = []
+            self._disposables.append(instance)
+
+        return instance
+
+    def resolve_pooled(self, provider: Provider) -> Any:
+        if self._instances is None:
+            self._instances = {}
+        elif provider in self._instances:
+            return self._instances[provider]
+
+        token = _active.set(self)
+        try:
+            instance = provider.pool.acquire()  # pyright: ignore
+        finally:
+            _active.reset(token)
+
+        self._instances[provider] = instance
+        if self._leases is None:
+            self._leases = []
+        self._leases.append(provider)
+
+        return instance
+
+    def _release(self, instances: Optional[Dict[Provider, Any]]) -> None:
+        leases, self._leases = self._leases, None
+        for provider in leases or ():
+            provider.pool.release(instances[provider])  # pyright: ignore
+
+    def close(self) -> None:
+        """
+        Disposes the scoped services built by this scope.
+        """
+        disposables, self._disposables = self._disposables, None
+        instances, self._instances = self._instances, None
+        try:
+            for instance in reversed(disposables or ()):
+                result = instance.close()
+                if inspect.isawaitable(result):
+                    raise ContainerScopeError(
+                        f"Scoped service {instance} has an async close, use aclose"
+                    )
+        finally:
+            self._release(instances)
+
+    async def aclose(self) -> None:
+        """
+        Disposes the scoped services built by this scope, awaiting async closes.
+        """
+        disposables, self._disposables = self._disposables, None
+        instances, self._instances = self._instances, None
+        try:
+            for instance in reversed(disposables or ()):
+                result = instance.close()
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            self._release(instances)
+
+    def __enter__(self) -> Scope:
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _active.reset(self._token)
+        self.close()
+
+    async def __aenter__(self) -> Scope:
+        self._token = _active.set(self)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        _active.reset(self._token)
+        await self.aclose()
+
+
+@contextmanager
+def use_container(container: Container) -> Iterator[Container]:
+    """
+    Makes container the active container of the current context.
+
+    Context variables are local to each thread and asyncio task, so every
+    listener thread can wire and use its own container, typically a child
+    of di: services injected from di resolve their dependencies from it.
+    """
+    token = _active.set(container)
+    try:
+        yield container
+    finally:
+        _active.reset(token)
+
+
+def current_container() -> Container:
+    """
+    Returns the active container of the current context, or di.
+    """
+    return _active.get() or di
 
 
 di: Container = Container()
 
 
-__all__ = ["Container", "di"]
+__all__ = ["Container", "Scope", "di", "use_container", "current_container"]
@@ -7,3 +7,33 @@ class ContainerServiceNotFoundError(Exception):
     """
     This exception is raised when a service is not found in the container.
     """
+
+
+class ContainerScopeError(Exception):
+    """
+    This exception is raised when a scoped service is resolved outside of a scope.
+    """
+
+
+class ContainerServiceNotReadyError(Exception):
+    """
+    This exception is raised when an async service is resolved synchronously before being built.
+    """
+
+
+class ContainerCycleError(Exception):
+    """
+    This exception is raised when the services dependency graph contains a cycle.
+    """
+
+
+class ContainerFrozenError(Exception):
+    """
+    This exception is raised when a frozen container is written to.
+    """
+
+
+class ContainerPoolExhaustedError(Exception):
+    """
+    This exception is raised when no pooled instance is released in time.
+    """
@@ -0,0 +1,132 @@
+"""
+This module builds the dependency graph of the services bound in a container.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple, TYPE_CHECKING
+from .exceptions import ContainerCycleError
+from .provider import Provider
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .container import Container
+
+
+def _plan_of(factory: Any) -> Any:
+    """
+    Returns the injection plan of an injected function or class, if any.
+    """
+    plan = getattr(factory, "__di_plan__", None)
+    if plan is None and isinstance(factory, type):
+        plan = getattr(factory.__init__, "__di_plan__", None)
+
+    return plan
+
+
+def dependencies_of(provider: Provider, container: "Container") -> Tuple[Any, ...]:
+    """
+    Returns the keys a provider depends on.
+
+    Explicit dependencies win; otherwise they are inferred from the injection
+    plan of the factory, probing the container by name then by type like
+    the inject decorator does.
+    """
+    if provider.dependencies is not None:
+        return tuple(provider.dependencies)
+
+    plan = _plan_of(provider.factory)
+    if plan is None:
+        return ()
+
+    dependencies = []
+    for name, the_type, _ in plan.steps:
+        if name in container:
+            dependencies.append(name)
+        elif the_type is not None and the_type in container:
+            dependencies.append(the_type)
+
+    return tuple(dependencies)
+
+
+def dependency_graph(
+    container: "Container", keys: Iterable[Any]
+) -> Dict[Any, Tuple[Any, ...]]:
+    """
+    Returns the dependencies of keys and, transitively, of their dependencies.
+
+    Only keys bound to a provider have dependencies; plain values are leaves.
+    """
+    graph: Dict[Any, Tuple[Any, ...]] = {}
+    stack = list(keys)
+
+    while stack:
+        key = stack.pop()
+        if key in graph:
+            continue
+
+        binding = container.binding(key)
+        if isinstance(binding, Provider):
+            graph[key] = dependencies_of(binding, container)
+        else:
+            graph[key] = ()
+
+        stack.extend(graph[key])
+
+    return graph
+
+
+def _find_cycle(graph: Dict[Any, Tuple[Any, ...]]) -> List[Any]:
+    visiting: List[Any] = []
+    done = set()
+
+    def visit(key: Any) -> List[Any]:
+        if key in done:
+            return []
+        if key in visiting:
+            return [*visiting[visiting.index(key) :], key]
+
+        visiting.append(key)
+        for dependency in graph.get(key, ()):
+            cycle = visit(dependency)
+            if cycle:
+                return cycle
+        visiting.pop()
+        done.add(key)
+        return []
+
+    for key in graph:
+        cycle = visit(key)
+        if cycle:
+            return cycle
+
+    return []
+
+
+def topological_levels(graph: Dict[Any, Tuple[Any, ...]]) -> List[List[Any]]:
+    """
+    Sorts the graph in levels whose keys only depend on keys of previous levels.
+
+    Keys of the same level are independent from each other and can be built
+    concurrently.
+
+    Raises:
+        ContainerCycleError: If the graph contains a cycle.
+    """
+    pending = {key: set(dependencies) for key, dependencies in graph.items()}
+    levels: List[List[Any]] = []
+
+    while pending:
+        level = [key for key, dependencies in pending.items() if not dependencies]
+        if not level:
+            cycle = " -> ".join(str(key) for key in _find_cycle(graph))
+            raise ContainerCycleError(f"Dependency cycle detected: {cycle}")
+
+        for key in level:
+            del pending[key]
+        for dependencies in pending.values():
+            dependencies.difference_update(level)
+
+        levels.append(level)
+
+    return levels
+
+
+__all__ = ["dependencies_of", "dependency_graph", "topological_levels"]
@@ -5,13 +5,21 @@ This module provides the inject decorator that can be used to inject dependencie
 import asyncio
 import functools
 import sys
+import time
 from typing import Any, ForwardRef, Optional, Callable, NewType, Tuple, Union, Dict
-from inspect import Parameter as InspectParameter, isclass, signature
+from inspect import Parameter as InspectParameter, isclass, signature, unwrap
+from inspect import CO_VARKEYWORDS  # pylint: disable=no-name-in-module
 from .container import Container, di
+from .introspection import introspection_cache
+from .provider import Lifetime
 
 # gestire tipi di ritorno
 Undefined = NewType("Undefined", int)
 
+_MISSING = object()
+
+_VARIADIC_KINDS = (InspectParameter.VAR_POSITIONAL, InspectParameter.VAR_KEYWORD)
+
 
 class Parameter:  # pylint: disable=too-few-public-methods
     """
@@ -39,137 +47,227 @@ def _resolve_forward_reference(module: Any, ref: Union[str, ForwardRef]) -> Any:
 def _inspect_function_arguments(function: Callable):
     """
     This function is used to inspect the arguments of a function.
+
+    The result is memoized in the introspection cache, which can persist it
+    across launches when DI_INTROSPECTION_CACHE points to a file.
     """
     if isinstance(
         function, functools._lru_cache_wrapper  # pylint: disable=protected-access
     ):
         function = function.__wrapped__
 
-    parameters_name: Tuple[str, ...] = tuple(signature(function).parameters.keys())
-    parameters = {}
-
-    for name, parameter in signature(function).parameters.items():
-        if isinstance(parameter.annotation, (str, ForwardRef)) and hasattr(
-            function, "__module__"
-        ):
-            annotation = _resolve_forward_reference(
-                function.__module__, parameter.annotation
+    entries = introspection_cache.get(function, Undefined)
+
+    if entries is None:
+        entries = []
+        for parameter in signature(function).parameters.values():
+            if parameter.kind in _VARIADIC_KINDS:
+                continue
+
+            if isinstance(parameter.annotation, (str, ForwardRef)) and hasattr(
+                function, "__module__"
+            ):
+                annotation = _resolve_forward_reference(
+                    function.__module__, parameter.annotation
+                )
+            else:
+                annotation = parameter.annotation
+
+            entries.append(
+                (
+                    parameter.name,
+                    annotation,
+                    (
+                        parameter.default
+                        if parameter.default is not InspectParameter.empty
+                        else Undefined
+                    ),
+                )
             )
-        else:
-            annotation = parameter.annotation
 
-        parameters[name] = Parameter(
-            parameter.name,
-            annotation,
-            (
-                parameter.default
-                if parameter.default is not InspectParameter.empty
-                else Undefined
-            ),
-        )
+        entries = tuple(entries)
+        introspection_cache.set(function, entries, Undefined)
+
+    parameters_name: Tuple[str, ...] = tuple(name for name, _, _ in entries)
+    parameters = {
+        name: Parameter(name, annotation, default)
+        for name, annotation, default in entries
+    }
 
     return parameters_name, parameters
 
 
-def _resolve_function_kwargs(
-    parameters_name: Tuple[str, ...],
-    parameters: Dict[str, Parameter],
-    container: Container,
-):
+def _binding_type(the_type: Any) -> Any:
     """
-    This function is used to resolve the function arguments.
+    This function returns the annotation usable as a container key, or None.
     """
-    resolved_kwargs = {}
+    if the_type is None or the_type is InspectParameter.empty:
+        return None
 
-    for name in parameters_name:
-        if name in container:
-            resolved_kwargs[name] = container[name]
-            continue
+    if isinstance(the_type, (str, ForwardRef)):
+        return None
 
-        if parameters[name].the_type in container:
-            resolved_kwargs[name] = container[parameters[name].the_type]
-            continue
+    try:
+        hash(the_type)
+    except TypeError:
+        return None
 
-        if parameters[name].default != InspectParameter.empty:
-            resolved_kwargs[name] = parameters[name].default
+    return the_type
 
-    return resolved_kwargs
 
-
-def _wrap(service: Any, container: Container):
+class InjectionPlan:  # pylint: disable=too-few-public-methods
     """
-    This function is used to wrap a function with a dependency injection.
+    This class is a resolution plan compiled once per injected callable.
+
+    Each step is a ``(name, type, default)`` triple: the container is probed by
+    name first, then by type, and a parameter left unresolved falls back to
+    its default. ``resolve`` walks the precomputed steps following the
+    positional arguments, so no per-call set or dict merging is needed.
     """
-    parameters_name, parameters = _inspect_function_arguments(service)
 
-    def _resolve_kwargs(args, kwargs) -> dict:
-        passed_kwargs = {**kwargs}
+    __slots__ = ("names", "arity", "steps", "_suffixes")
+
+    def __init__(
+        self, parameters_name: Tuple[str, ...], parameters: Dict[str, Parameter]
+    ):
+        self.names = parameters_name
+        self.arity = len(parameters_name)
+        self.steps: Tuple[Tuple[str, Any, Any], ...] = tuple(
+            (
+                name,
+                _binding_type(parameters[name].the_type),
+                parameters[name].default,
+            )
+            for name in parameters_name
+        )
+        self._suffixes = tuple(self.steps[offset:] for offset in range(self.arity + 1))
 
-        if args:
-            for key, value in enumerate(args):
-                passed_kwargs[parameters_name[key]] = value
+    def resolve(self, offset: int, kwargs: Dict[str, Any], container: Container):
+        """
+        This method fills kwargs with the parameters not passed by the caller.
 
-        if set(passed_kwargs.keys()) == set(parameters_name):
-            return passed_kwargs
+        Args:
+            offset: The number of positional arguments passed by the caller.
+            kwargs: The keyword arguments passed by the caller, updated in place.
+            container: The container to resolve the dependencies from.
+        """
+        get = container.get
+        missing = None
 
-        resolved_kwargs = _resolve_function_kwargs(
-            parameters_name, parameters, container
-        )
+        for name, the_type, default in self._suffixes[offset]:
+            if name in kwargs:
+                continue
 
-        all_kwargs = {**resolved_kwargs, **passed_kwargs}
+            value = get(name, _MISSING)
+            if value is _MISSING and the_type is not None:
+                value = get(the_type, _MISSING)
 
-        if len(all_kwargs) < len(parameters_name):
-            missing_args = set(parameters_name) - set(all_kwargs.keys())
-            raise ValueError(f"DI Missing arguments: {missing_args}")
+            if value is not _MISSING:
+                kwargs[name] = value
+            elif default is Undefined:
+                missing = [name] if missing is None else [*missing, name]
 
-        return all_kwargs
+        if missing is not None:
+            raise ValueError(f"DI Missing arguments: {set(missing)}")
 
-    @functools.wraps(service)
-    def _wrapped(*args, **kwargs):
-        if len(args) == len(parameters_name):
-            return service(*args, **kwargs)
+        return kwargs
 
-        if parameters_name == tuple(kwargs.keys()):
-            return service(**kwargs)
 
-        all_kwargs = _resolve_kwargs(args, kwargs)
-        return service(**all_kwargs)
+def _accepts_extra_keywords(function: Callable) -> bool:
+    """
+    This function tells whether function takes a **kwargs parameter.
+    """
+    code = getattr(unwrap(function), "__code__", None)
+    if code is None:
+        return any(
+            parameter.kind is InspectParameter.VAR_KEYWORD
+            for parameter in signature(function).parameters.values()
+        )
 
-    @functools.wraps(service)
-    async def _async_wrapped(*args, **kwargs):
-        if len(args) == len(parameters_name):
-            return await service(*args, **kwargs)
+    return bool(code.co_flags & CO_VARKEYWORDS)
 
-        if parameters_name == tuple(kwargs.keys()):
-            return await service(**kwargs)
 
-        all_kwargs = _resolve_kwargs(args, kwargs)
-        return await service(**all_kwargs)
+def _wrap(service: Any, container: Container):
+    """
+    This function is used to wrap a function with a dependency injection.
+
+    A call passing as many arguments as the injected parameters skips the
+    resolution. When the function takes **kwargs, the keywords only count
+    if they all name injected parameters.
+    """
+    plan = InjectionPlan(*_inspect_function_arguments(service))
+    arity = plan.arity
+    resolve = plan.resolve
+    names = frozenset(plan.names)
+    exact = not _accepts_extra_keywords(service)
+
+    def _profiled_resolve(args, kwargs, target):
+        start = time.perf_counter()
+        try:
+            return resolve(len(args), kwargs, target)
+        finally:
+            target.profiler.record(service, time.perf_counter() - start)
 
     if asyncio.iscoroutinefunction(service):
-        return _async_wrapped
 
-    return _wrapped
+        async def _async_wrapped(*args, **kwargs):
+            if len(args) + len(kwargs) >= arity and (exact or names.issuperset(kwargs)):
+                return await service(*args, **kwargs)
+
+            target = container.active()
+            if target.profiler is None:
+                return await service(*args, **resolve(len(args), kwargs, target))
+
+            return await service(*args, **_profiled_resolve(args, kwargs, target))
 
+        wrapped = functools.wraps(service)(_async_wrapped)
+    else:
+
+        def _wrapped(*args, **kwargs):
+            if len(args) + len(kwargs) >= arity and (exact or names.issuperset(kwargs)):
+                return service(*args, **kwargs)
+
+            target = container.active()
+            if target.profiler is None:
+                return service(*args, **resolve(len(args), kwargs, target))
+
+            return service(*args, **_profiled_resolve(args, kwargs, target))
+
+        wrapped = functools.wraps(service)(_wrapped)
 
-def inject(_service: Optional[Union[str, Any]] = None, container: Container = di):
+    setattr(wrapped, "__di_plan__", plan)
+
+    return wrapped
+
+
+def inject(
+    _service: Optional[Union[str, Any]] = None,
+    container: Container = di,
+    lifetime: Lifetime = Lifetime.SINGLETON,
+    pool_size: Optional[int] = None,
+):
     """
     This decorator is used to inject dependencies into a class.
+
+    Decorated classes are bound to themselves in the container with the given
+    lifetime and are only built when first resolved. Pooled classes keep up
+    to pool_size instances. The provider of a class is also kept on its
+    __di_provider__ attribute.
     """
 
-    def _wrapper(*args, **kwargs):  # pylint: disable=unused-argument
+    def _wrapper(service: Any):
         """
         This function is used to inject dependencies into a class.
         """
-        if _service is not None and isclass(_service):
-            setattr(
-                _service, "__init__", _wrap(getattr(_service, "__init__"), container)
+        if isclass(service):
+            setattr(service, "__init__", _wrap(getattr(service, "__init__"), container))
+            provider = container.register(
+                service, service, lifetime, pool_size=pool_size
             )
-            _service_instance = _service()
-            container[_service] = lambda _: _service_instance
-            return _service
+            setattr(service, "__di_provider__", provider)
+            return service
 
-        service_function = _wrap(_service, container)
+        service_function = _wrap(service, container)
         container[service_function.__name__] = service_function
         return service_function
 
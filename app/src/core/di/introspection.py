@@ -0,0 +1,226 @@
+"""
+This module contains the IntrospectionCache class which memoizes the
+parameters of injected callables, optionally persisting them on disk.
+"""
+
+import atexit
+import marshal
+import os
+import sys
+import threading
+from inspect import Parameter as InspectParameter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_LITERALS = (type(None), bool, int, float, str, bytes)
+
+# (name, annotation, default) of every parameter of a callable
+Entries = Tuple[Tuple[str, Any, Any], ...]
+
+
+def _encode_annotation(annotation: Any) -> Optional[tuple]:
+    if annotation is InspectParameter.empty:
+        return ("empty",)
+
+    if annotation is None:
+        return ("none",)
+
+    module = getattr(annotation, "__module__", None)
+    qualname = getattr(annotation, "__qualname__", None)
+    if (
+        isinstance(module, str)
+        and isinstance(qualname, str)
+        and "<locals>" not in qualname
+        and _lookup(module, qualname) is annotation
+    ):
+        return ("ref", module, qualname)
+
+    return None
+
+
+def _decode_annotation(encoded: tuple) -> Any:
+    if encoded[0] == "empty":
+        return InspectParameter.empty
+
+    if encoded[0] == "none":
+        return None
+
+    return _lookup(encoded[1], encoded[2])
+
+
+def _encode_entries(entries: Entries, undefined: Any) -> Optional[tuple]:
+    """
+    Returns the persistable form of entries, or None if they have none.
+    """
+    encoded = []
+    for name, the_type, default in entries:
+        annotation = _encode_annotation(the_type)
+        if annotation is None:
+            return None
+        if default is undefined:
+            encoded.append((name, annotation, ("undefined",)))
+        elif isinstance(default, _LITERALS):
+            encoded.append((name, annotation, ("value", default)))
+        else:
+            return None
+
+    return tuple(encoded)
+
+
+def _lookup(module: str, qualname: str) -> Any:
+    """
+    Returns module.qualname from the already imported modules, or None.
+    """
+    value = sys.modules.get(module)
+    for name in qualname.split("."):
+        value = getattr(value, name, None)
+
+    return value
+
+
+class IntrospectionCache:
+    """
+    This class memoizes the parameters of injected callables.
+
+    Entries are keyed on module, qualname and the mtime of the module source,
+    so an edited module is inspected again. When a path is given, entries
+    are persisted with marshal at exit and loaded back on the next launch;
+    annotations are stored as references to already imported classes, so
+    loading the cache never imports anything. Callables whose annotations
+    or defaults cannot be stored this way are only memoized in memory.
+    New entries are only encoded when saved, so that a launch filling the
+    cache costs no more at startup than a launch without it.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._memory: Dict[tuple, Entries] = {}
+        self._disk: Optional[Dict[tuple, tuple]] = None
+        self._pending: Dict[tuple, Tuple[Entries, Any]] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        if path is not None:
+            atexit.register(self.save)
+
+    def _key(self, function: Callable) -> Optional[tuple]:
+        module = getattr(function, "__module__", None)
+        qualname = getattr(function, "__qualname__", None)
+        if module is None or qualname is None or "<locals>" in qualname:
+            return None
+
+        mtime = self._mtimes.get(module)
+        if mtime is None:
+            filename = getattr(sys.modules.get(module), "__file__", None)
+            if filename is None:
+                return None
+
+            try:
+                mtime = self._mtimes[module] = os.stat(filename).st_mtime
+            except OSError:
+                return None
+
+        return (module, qualname, mtime)
+
+    def _load(self) -> Dict[tuple, tuple]:
+        disk: Dict[tuple, tuple] = {}
+        if self.path is not None and os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as file:
+                    disk = marshal.load(file)
+            except (OSError, EOFError, ValueError, TypeError):
+                disk = {}
+
+        return disk
+
+    def get(self, function: Callable, undefined: Any) -> Optional[Entries]:
+        """
+        Returns the cached parameters of function, or None.
+
+        Args:
+            function: The inspected callable.
+            undefined: The marker of parameters without a default.
+        """
+        key = self._key(function)
+        if key is None:
+            return None
+
+        entries = self._memory.get(key)
+        if entries is not None or self.path is None:
+            return entries
+
+        if self._disk is None:
+            with self._lock:
+                if self._disk is None:
+                    self._disk = self._load()
+
+        encoded = self._disk.get(key)
+        if encoded is None:
+            return None
+
+        decoded = []
+        for name, annotation, default in encoded:
+            the_type = _decode_annotation(annotation)
+            if the_type is None and annotation[0] == "ref":
+                return None
+            decoded.append(
+                (name, the_type, undefined if default[0] == "undefined" else default[1])
+            )
+
+        entries = self._memory[key] = tuple(decoded)
+        return entries
+
+    def set(self, function: Callable, entries: Entries, undefined: Any) -> None:
+        """
+        Stores the parameters of function.
+
+        Args:
+            function: The inspected callable.
+            entries: The (name, annotation, default) of its parameters.
+            undefined: The marker of parameters without a default.
+        """
+        key = self._key(function)
+        if key is None:
+            return
+
+        self._memory[key] = entries
+        if self.path is not None:
+            self._pending[key] = (entries, undefined)
+
+    def save(self) -> None:
+        """
+        Writes the cache to its path, if any persistable entry was added.
+        """
+        if self.path is None or not self._pending:
+            return
+
+        with self._lock:
+            if self._disk is None:
+                self._disk = self._load()
+
+            pending, self._pending = self._pending, {}
+            added = False
+            for key, (entries, undefined) in pending.items():
+                encoded = _encode_entries(entries, undefined)
+                if encoded is not None:
+                    self._disk[key] = encoded
+                    added = True
+
+            if not added:
+                return
+
+            # drop the entries of modules edited since they were cached
+            disk = {
+                key: value
+                for key, value in self._disk.items()
+                if self._mtimes.get(key[0], key[2]) == key[2]
+            }
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as file:
+                marshal.dump(disk, file)
+            os.replace(temporary, self.path)
+
+
+introspection_cache = IntrospectionCache(os.getenv("DI_INTROSPECTION_CACHE"))
+
+
+__all__ = ["IntrospectionCache", "introspection_cache"]
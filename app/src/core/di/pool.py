@@ -0,0 +1,125 @@
+"""
+This module contains the InstancePool class which lends a bounded
+number of service instances to concurrent callers.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+from .exceptions import ContainerPoolExhaustedError
+
+# Same default as concurrent.futures.ThreadPoolExecutor, so a pool can serve
+# every worker of a default executor without waiting.
+DEFAULT_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+
+
+class InstancePool:
+    """
+    This class holds up to size instances built by factory.
+
+    Instances are built on demand and checked out for the exclusive use of
+    one caller at a time; a caller finding every instance checked out waits
+    until one is released. Idle instances are reused last-in first-out, so
+    the most recently used, warmest, instance is handed out first.
+    """
+
+    __slots__ = ("factory", "size", "_idle", "_created", "_condition")
+
+    def __init__(self, factory: Callable[[], Any], size: int = DEFAULT_POOL_SIZE):
+        if size < 1:
+            raise ValueError(f"Pool size must be positive, got {size}")
+
+        self.factory = factory
+        self.size = size
+        self._idle: List[Any] = []
+        self._created = 0
+        self._condition = threading.Condition()
+
+    @property
+    def created(self) -> int:
+        """
+        The number of instances built so far.
+        """
+        return self._created
+
+    @property
+    def idle(self) -> int:
+        """
+        The number of instances available for checkout.
+        """
+        return len(self._idle)
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Checks out an instance, building one if the pool is not full.
+
+        Args:
+            timeout: The number of seconds to wait for a release when every
+                instance is checked out, forever when None.
+
+        Raises:
+            ContainerPoolExhaustedError: If no instance was released in time.
+        """
+        with self._condition:
+            while not self._idle:
+                if self._created < self.size:
+                    self._created += 1
+                    break
+
+                if not self._condition.wait(timeout):
+                    raise ContainerPoolExhaustedError(
+                        f"No instance of {self.factory} released within {timeout}s"
+                    )
+            else:
+                return self._idle.pop()
+
+        try:
+            return self.factory()
+        except BaseException:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, instance: Any) -> None:
+        """
+        Returns a checked out instance to the pool.
+        """
+        with self._condition:
+            self._idle.append(instance)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Checks out an instance for the duration of the with block.
+        """
+        instance = self.acquire(timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def fill(self) -> None:
+        """
+        Builds the missing instances so the first checkouts find them warm.
+        """
+        while True:
+            with self._condition:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+
+            try:
+                instance = self.factory()
+            except BaseException:
+                with self._condition:
+                    self._created -= 1
+                    self._condition.notify()
+                raise
+
+            self.release(instance)
+
+
+__all__ = ["InstancePool", "DEFAULT_POOL_SIZE"]
@@ -0,0 +1,130 @@
+"""
+This module contains the ResolutionProfiler class which records
+how services are resolved from a container.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class ResolutionStats:  # pylint: disable=too-few-public-methods
+    """
+    This class holds the resolution statistics of a single service key.
+    """
+
+    __slots__ = ("count", "total", "hits", "misses", "samples")
+
+    def __init__(self, max_samples: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+
+def _label(key: Any) -> str:
+    if isinstance(key, str):
+        return key
+
+    qualname = getattr(key, "__qualname__", None)
+    if qualname is None:
+        return repr(key)
+
+    return f"{getattr(key, '__module__', '?')}.{qualname}"
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ResolutionProfiler:
+    """
+    This class records, per service key, how many times it was resolved,
+    how long resolutions took and whether a cached instance was reused.
+
+    Times are inclusive: resolving a service includes building its
+    dependencies. The p99 is computed over the last max_samples resolutions.
+    """
+
+    def __init__(self, max_samples: int = 1024) -> None:
+        self.max_samples = max_samples
+        self._stats: Dict[Any, ResolutionStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Any, elapsed: float, hit: Optional[bool] = None) -> None:
+        """
+        Records a resolution of key.
+
+        Args:
+            key: The resolved service key, or the injected callable.
+            elapsed: The resolution time, in seconds.
+            hit: Whether an existing instance was returned without a factory
+                call, None when it does not apply.
+        """
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(key, ResolutionStats(self.max_samples))
+
+        stats.count += 1
+        stats.total += elapsed
+        stats.samples.append(elapsed)
+        if hit:
+            stats.hits += 1
+        elif hit is not None:
+            stats.misses += 1
+
+    def reset(self) -> None:
+        """
+        Drops every recorded resolution.
+        """
+        with self._lock:
+            self._stats = {}
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the statistics per service, slowest cumulative time first.
+
+        Times are in seconds.
+        """
+        report = {}
+        for key, stats in sorted(
+            self._stats.items(), key=lambda item: item[1].total, reverse=True
+        ):
+            report[_label(key)] = {
+                "count": stats.count,
+                "total": stats.total,
+                "mean": stats.total / stats.count if stats.count else 0.0,
+                "p99": _percentile(list(stats.samples), 0.99),
+                "hits": stats.hits,
+                "misses": stats.misses,
+            }
+
+        return report
+
+    def format_table(self) -> str:
+        """
+        Returns the report as a text table, times in microseconds.
+        """
+        header = (
+            f"{'service':<48}{'count':>9}{'total us':>12}{'mean us':>10}"
+            f"{'p99 us':>10}{'hits':>9}{'misses':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for label, stats in self.report().items():
+            lines.append(
+                f"{label[-48:]:<48}{stats['count']:>9}{stats['total'] * 1e6:>12.1f}"
+                f"{stats['mean'] * 1e6:>10.2f}{stats['p99'] * 1e6:>10.2f}"
+                f"{stats['hits']:>9}{stats['misses']:>9}"
+            )
+
+        return "\n".join(lines)
+
+
+__all__ = ["ResolutionProfiler", "ResolutionStats"]
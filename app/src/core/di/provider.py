@@ -0,0 +1,139 @@
+"""
+This module contains the Provider class which builds services
+lazily according to their lifetime.
+"""
+
+import asyncio
+import inspect
+import threading
+from enum import Enum
+from typing import Any, Callable, Optional, Tuple, TYPE_CHECKING
+from .exceptions import ContainerServiceNotReadyError
+from .pool import DEFAULT_POOL_SIZE, InstancePool
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .container import Container
+
+_EMPTY = object()
+
+
+class Lifetime(Enum):
+    """
+    This enum lists the lifetimes a provided service can have.
+
+    SINGLETON services are built once and shared, TRANSIENT services are
+    built on every resolution and SCOPED services are built once per scope.
+    POOLED services are taken from a bounded pool of instances, each one
+    lent to a single scope or lease at a time.
+    """
+
+    SINGLETON = "singleton"
+    TRANSIENT = "transient"
+    SCOPED = "scoped"
+    POOLED = "pooled"
+
+
+class Provider:  # pylint: disable=too-many-instance-attributes
+    """
+    This class builds a service on first resolution using its factory.
+
+    Factories may be coroutine functions: async singletons are built by
+    ``aresolve`` (or ``Container.warm_up``) and can be resolved synchronously
+    afterwards.
+    """
+
+    __slots__ = (
+        "factory",
+        "lifetime",
+        "dependencies",
+        "is_async",
+        "pool",
+        "_instance",
+        "_lock",
+        "_pending",
+    )
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        lifetime: Lifetime = Lifetime.SINGLETON,
+        dependencies: Optional[Tuple[Any, ...]] = None,
+        pool_size: Optional[int] = None,
+    ) -> None:
+        self.factory = factory
+        self.lifetime = lifetime
+        self.dependencies = dependencies
+        self.is_async = inspect.iscoroutinefunction(factory)
+        self.pool: Optional[InstancePool] = (
+            InstancePool(factory, pool_size or DEFAULT_POOL_SIZE)
+            if lifetime is Lifetime.POOLED
+            else None
+        )
+        self._instance: Any = _EMPTY
+        self._lock = threading.RLock()
+        self._pending: Optional[asyncio.Future] = None
+
+        if self.is_async and lifetime is not Lifetime.SINGLETON:
+            raise ValueError(f"Async factory {factory} must have a singleton lifetime")
+
+    @property
+    def built(self) -> bool:
+        """
+        Whether the singleton instance has already been built.
+        """
+        return self._instance is not _EMPTY
+
+    def resolve(self, container: "Container") -> Any:
+        """
+        Returns the service, building it if its lifetime requires it.
+
+        Singletons are cached with double-checked locking, so once built
+        they are returned without acquiring the lock.
+        """
+        if self.lifetime is Lifetime.TRANSIENT:
+            return self.factory()
+
+        if self.lifetime is Lifetime.SCOPED:
+            return container.resolve_scoped(self)
+
+        if self.lifetime is Lifetime.POOLED:
+            return container.resolve_pooled(self)
+
+        instance = self._instance
+        if instance is _EMPTY:
+            if self.is_async:
+                raise ContainerServiceNotReadyError(
+                    f"Async service {self.factory} must be awaited before use"
+                )
+
+            with self._lock:
+                instance = self._instance
+                if instance is _EMPTY:
+                    instance = self._instance = self.factory()
+
+        return instance
+
+    async def aresolve(self, container: "Container") -> Any:
+        """
+        Returns the service, awaiting its factory if it is a coroutine function.
+
+        Concurrent resolutions of an async singleton share a single build.
+        """
+        if not self.is_async or self._instance is not _EMPTY:
+            return self.resolve(container)
+
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._build())
+
+        return await asyncio.shield(self._pending)
+
+    async def _build(self) -> Any:
+        try:
+            self._instance = await self.factory()
+        finally:
+            self._pending = None
+
+        return self._instance
+
+
+__all__ = ["Lifetime", "Provider"]
@@ -3,15 +3,20 @@ Module for handling example commands.
 """
 
 import logging
-from core.di import inject
+from core.di import inject, Lifetime
 from core.cqrs.handler import HandlerInterface
+from core.cqrs.registry import handles
 from example.domain.command.example_command import ExampleCommand
 
 
-@inject
+@handles(ExampleCommand)
+@inject(lifetime=Lifetime.POOLED)
 class ExampleCommandHandler(HandlerInterface):
     """
     Handles ExampleCommand instances.
+
+    Instances are pooled: each dispatch checks one out, so concurrent
+    dispatches never share a handler.
     """
 
     def __init__(self, foo):  # pylint: disable=disallowed-name
@@ -4,10 +4,12 @@ Module for handling example queries.
 
 from core.di import inject
 from core.cqrs.handler import HandlerInterface
+from core.cqrs.registry import handles
 from example.domain.query.example_query import ExampleQuery
 from example.domain.query.example_response import ExampleResponse
 
 
+@handles(ExampleQuery)
 @inject
 class ExampleQueryHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
     """
@@ -15,6 +15,7 @@ async def main():
     """
     The main entry point for the application
     """
+    await di.warm_up()
     await di["example.infrastructure.cli.main"].run()
 
 
@@ -0,0 +1,68 @@
+"""Fake broker, consumer and producer shared by the unit tests."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+from collections import namedtuple
+from core.broker.broker import BrokerInterface
+
+# A consumed Kafka record.
+Record = namedtuple("Record", ["topic", "value"])
+
+
+class StopConsuming(Exception):
+    """Stops the fake consumer."""
+
+
+class FakeConsumer:
+    """A Kafka consumer polling the records given to it once."""
+
+    def __init__(self, records):
+        self.records = records
+        self.commits = 0
+        self.closed = False
+
+    def poll(self, timeout_ms):  # pylint: disable=unused-argument
+        """Returns the records, then stops."""
+        if self.records is None:
+            raise StopConsuming()
+        records, self.records = self.records, None
+        return {"partition": records}
+
+    def commit(self):
+        """Counts the commits."""
+        self.commits += 1
+
+    def close(self):
+        """Marks the consumer closed."""
+        self.closed = True
+
+
+class FakeProducer:
+    """A Kafka producer which sends nothing."""
+
+    def __init__(self):
+        self.closed = False
+
+    def flush(self):
+        """Flushes nothing."""
+
+    def close(self):
+        """Marks the producer closed."""
+        self.closed = True
+
+
+class FakeBroker(BrokerInterface):
+    """A broker recording the messages sent to it."""
+
+    def __init__(self, connection=None):
+        self.sent = []
+        self.connection = connection
+
+    async def connect(self, *args, **kwargs):
+        """Connects nowhere."""
+
+    async def send(self, cq, message):
+        self.sent.append((cq, message))
+
+    async def receive(self, cq):
+        return None
@@ -0,0 +1,149 @@
+"""Unit tests for the asynchronous in-process buses."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.bus import execute_concurrently
+from core.cqrs.command.bus.async_command_bus import AsyncCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.exceptions import CommandAlreadyRegistered, HandlerNotFound
+from core.cqrs.query.bus.async_query_bus import AsyncQueryBus
+from core.cqrs.query.cache import MISS, QueryCache
+from core.cqrs.query.query import QueryInterface
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetUser(QueryInterface):
+    """A query."""
+
+    user_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class CreateUser(CommandInterface):
+    """A command making GetUser results stale."""
+
+    invalidates = (GetUser,)
+
+    user_id: int
+
+
+class TestAsyncCommandBus(TestCase):
+    """AsyncCommandBus test class."""
+
+    def test_execute(self):
+        """
+        Test that coroutine and plain handlers are awaited or called.
+        """
+        bus = AsyncCommandBus()
+        created = []
+
+        async def create_user(command):
+            await asyncio.sleep(0)
+            created.append(command.user_id)
+
+        bus.register_handler(CreateUser, create_user)
+        bus.register_handler(CommandInterface, lambda command: created.append(0))
+
+        asyncio.run(bus.execute(CreateUser(user_id=1)))
+        asyncio.run(bus.execute(CommandInterface()))
+
+        assert created == [1, 0]
+
+    def test_errors(self):
+        """
+        Test that duplicate registrations and missing handlers raise.
+        """
+        bus = AsyncCommandBus()
+        bus.register_handler(CreateUser, print)
+
+        with self.assertRaises(CommandAlreadyRegistered):
+            bus.register_handler(CreateUser, print)
+
+        with self.assertRaises(HandlerNotFound):
+            asyncio.run(bus.execute(CommandInterface()))
+
+    def test_invalidates_cache(self):
+        """
+        Test that executed commands drop the query types they invalidate.
+        """
+        cache = QueryCache()
+        cache.put(GetUser(user_id=1), "alice")
+        bus = AsyncCommandBus(cache=cache)
+
+        async def create_user(command):  # pylint: disable=unused-argument
+            return None
+
+        bus.register_handler(CreateUser, create_user)
+        asyncio.run(bus.execute(CreateUser(user_id=2)))
+
+        assert cache.get(GetUser(user_id=1)) is MISS
+
+    def test_execute_concurrently(self):
+        """
+        Test that no more than limit handlers run at the same time.
+        """
+        bus = AsyncCommandBus()
+        running = []
+        peak = []
+
+        async def create_user(command):  # pylint: disable=unused-argument
+            running.append(command)
+            peak.append(len(running))
+            await asyncio.sleep(0.001)
+            running.remove(command)
+
+        bus.register_handler(CreateUser, create_user)
+
+        asyncio.run(
+            bus.execute_concurrently(
+                (CreateUser(user_id=user_id) for user_id in range(20)), limit=3
+            )
+        )
+
+        assert len(peak) == 20
+        assert max(peak) == 3
+
+
+class TestAsyncQueryBusConcurrency(TestCase):
+    """AsyncQueryBus concurrency test class."""
+
+    def test_execute_concurrently(self):
+        """
+        Test that responses are returned in order, exceptions included on demand.
+        """
+        bus = AsyncQueryBus(coalesce=False)
+
+        async def get_user(query):
+            await asyncio.sleep(0.001 * (5 - query.user_id))
+            if query.user_id == 3:
+                raise LookupError(query.user_id)
+            return f"user {query.user_id}"
+
+        bus.register_handler(GetUser, get_user)
+        queries = [GetUser(user_id=user_id) for user_id in range(5)]
+
+        responses = asyncio.run(
+            bus.execute_concurrently(queries, limit=2, return_exceptions=True)
+        )
+
+        assert responses[:3] == ["user 0", "user 1", "user 2"]
+        assert isinstance(responses[3], LookupError)
+        assert responses[4] == "user 4"
+
+        with self.assertRaises(LookupError):
+            asyncio.run(bus.execute_concurrently(queries))
+
+    def test_invalid_limit(self):
+        """
+        Test that a limit lower than 1 is rejected.
+        """
+
+        async def execute(cq):
+            return cq
+
+        with self.assertRaises(ValueError):
+            asyncio.run(execute_concurrently(execute, [1], limit=0))
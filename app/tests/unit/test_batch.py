@@ -0,0 +1,348 @@
+"""Unit tests for the batch execution of the buses."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import threading
+from dataclasses import dataclass
+from unittest import TestCase
+from core.di import Container
+from core.cqrs.command.bus.async_command_bus import AsyncCommandBus
+from core.cqrs.command.bus.di_command_bus import DICommandBus
+from core.cqrs.command.bus.kafka_command_bus import KafkaCommandBus
+from core.cqrs.command.bus.simple_command_bus import SimpleCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.executor import ExecutionPolicy, HandlerExecutor, executes_in
+from core.cqrs.handler import BatchHandlerInterface, HandlerInterface
+from core.cqrs.middleware import RetryMiddleware, TimingMiddleware
+from core.cqrs.query.bus.async_query_bus import AsyncQueryBus
+from core.cqrs.query.bus.di_query_bus import DIQueryBus
+from core.cqrs.query.bus.simple_query_bus import SimpleQueryBus
+from core.cqrs.query.cache import MISS, QueryCache
+from core.cqrs.query.query import QueryInterface
+from .fakes import FakeBroker
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetUser(QueryInterface):
+    """A query."""
+
+    user_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetGroup(QueryInterface):
+    """Another query."""
+
+    group_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class CreateUser(CommandInterface):
+    """A command making GetUser results stale."""
+
+    invalidates = (GetUser,)
+
+    user_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class UpdateUser(CommandInterface):
+    """A command making GetUser results stale only when it renames the user."""
+
+    user_id: int
+    name: str = ""
+
+    @property
+    def invalidates(self):
+        """The query types the update makes stale."""
+        return (GetUser,) if self.name else ()
+
+
+class GetUserHandler(BatchHandlerInterface):
+    """Handles GetUser, recording the batches it receives."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, cq):
+        return f"user {cq.user_id}"
+
+    def handle_many(self, cqs):
+        self.batches.append(list(cqs))
+        return [self(cq) for cq in cqs]
+
+
+class CreateUserHandler(BatchHandlerInterface):
+    """Handles CreateUser, recording the batches it receives."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, cq):
+        self.batches.append([cq])
+
+    def handle_many(self, cqs):
+        self.batches.append(list(cqs))
+
+
+class RecordingHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+    """Handles commands one at a time, recording them."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, cq):
+        self.calls.append(cq)
+
+
+class FlakyHandler(BatchHandlerInterface):
+    """Handles GetUser, failing the first time it gets user 2."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, cq):
+        self.calls.append(cq.user_id)
+        if self.calls.count(2) == 1 and cq.user_id == 2:
+            raise ConnectionError("flaky")
+        return f"user {cq.user_id}"
+
+
+@executes_in(ExecutionPolicy.THREAD)
+class ThreadedHandler(CreateUserHandler):  # pylint: disable=too-few-public-methods
+    """Handles CreateUser in the thread pool, recording where it runs."""
+
+    def handle_many(self, cqs):
+        self.batches.append(threading.current_thread().name)
+
+
+class TestSimpleBuses(TestCase):
+    """Simple buses batch test class."""
+
+    def test_query_order(self):
+        """
+        Test that mixed queries are answered in order, one batch per type.
+        """
+        bus = SimpleQueryBus()
+        handler = GetUserHandler()
+        bus.register_handler(GetUser, handler)
+        bus.register_handler(GetGroup, lambda query: f"group {query.group_id}")
+
+        responses = bus.execute_many(
+            [GetUser(user_id=1), GetGroup(group_id=2), GetUser(user_id=3)]
+        )
+
+        assert responses == ["user 1", "group 2", "user 3"]
+        assert handler.batches == [[GetUser(user_id=1), GetUser(user_id=3)]]
+
+    def test_command_batch(self):
+        """
+        Test that a batch-aware command handler receives the whole batch.
+        """
+        bus = SimpleCommandBus()
+        handler = CreateUserHandler()
+        bus.register_handler(CreateUser, handler)
+
+        results = bus.execute_many([CreateUser(user_id=1), CreateUser(user_id=2)])
+
+        assert results == [None, None]
+        assert len(handler.batches) == 1
+
+    def test_middlewares_per_message(self):
+        """
+        Test that the middlewares wrap every message of a batch on its own.
+        """
+        types = []
+        bus = SimpleQueryBus(
+            [
+                TimingMiddleware(lambda cq_type, elapsed: types.append(cq_type)),
+                RetryMiddleware(attempts=2),
+            ]
+        )
+        handler = FlakyHandler()
+        bus.register_handler(GetUser, handler)
+
+        responses = bus.execute_many([GetUser(user_id=1), GetUser(user_id=2)])
+
+        assert responses == ["user 1", "user 2"]
+        assert handler.calls == [1, 2, 2]
+        assert types == [GetUser, GetUser]
+
+    def test_handler_not_found(self):
+        """
+        Test that nothing is executed when a message has no handler.
+        """
+        bus = SimpleCommandBus()
+        handler = CreateUserHandler()
+        bus.register_handler(CreateUser, handler)
+
+        with self.assertRaises(HandlerNotFound):
+            bus.execute_many([CreateUser(user_id=1), CommandInterface()])
+
+        assert not handler.batches
+
+    def test_cached(self):
+        """
+        Test that only the queries the cache misses are executed, until a
+        batch of commands invalidates them.
+        """
+        cache = QueryCache()
+        query_bus = SimpleQueryBus(cache=cache)
+        command_bus = SimpleCommandBus(cache=cache)
+        handler = GetUserHandler()
+        query_bus.register_handler(GetUser, handler)
+        command_bus.register_handler(CreateUser, CreateUserHandler())
+
+        query_bus.execute(GetUser(user_id=1))
+        query_bus.execute_many([GetUser(user_id=1), GetUser(user_id=2)])
+        command_bus.execute_many([CreateUser(user_id=3)])
+        query_bus.execute_many([GetUser(user_id=1)])
+
+        assert handler.batches == [[GetUser(user_id=2)], [GetUser(user_id=1)]]
+
+
+class TestDIBuses(TestCase):
+    """DI buses batch test class."""
+
+    def test_query_order(self):
+        """
+        Test that the handler batch call is used and responses keep their order.
+        """
+        bus = DIQueryBus(Container())
+        handler = GetUserHandler()
+        bus.register_handler(GetUser, handler)
+
+        responses = bus.execute_many([GetUser(user_id=2), GetUser(user_id=1)])
+
+        assert responses == ["user 2", "user 1"]
+        assert len(handler.batches) == 1
+
+    def test_per_item_fallback(self):
+        """
+        Test that handlers without a batch call are called once per command.
+        """
+        handler = RecordingHandler()
+        bus = DICommandBus(Container())
+        bus.register_handler(CreateUser, handler)
+
+        bus.execute_many([CreateUser(user_id=1), CreateUser(user_id=2)])
+
+        assert handler.calls == [CreateUser(user_id=1), CreateUser(user_id=2)]
+
+    def test_middlewares_per_message(self):
+        """
+        Test that the middlewares wrap every command of a batch on its own.
+        """
+        types = []
+        handler = CreateUserHandler()
+        bus = DICommandBus(
+            Container(),
+            middlewares=[
+                TimingMiddleware(lambda cq_type, elapsed: types.append(cq_type))
+            ],
+        )
+        bus.register_handler(CreateUser, handler)
+
+        bus.execute_many([CreateUser(user_id=1), CreateUser(user_id=2)])
+
+        assert types == [CreateUser, CreateUser]
+        assert handler.batches == [[CreateUser(user_id=1)], [CreateUser(user_id=2)]]
+
+    def test_handler_not_found(self):
+        """
+        Test that the DI bus raises before executing anything.
+        """
+        bus = DIQueryBus(Container())
+        handler = GetUserHandler()
+        bus.register_handler(GetUser, handler)
+
+        with self.assertRaises(HandlerNotFound):
+            bus.execute_many([GetUser(user_id=1), GetGroup(group_id=1)])
+
+        assert not handler.batches
+
+
+class TestAsyncBuses(TestCase):
+    """Asynchronous buses batch test class."""
+
+    def test_async_query_bus(self):
+        """
+        Test that coroutine handlers are executed per query, in order.
+        """
+        bus = AsyncQueryBus(cache=QueryCache())
+
+        async def get_group(query):
+            return f"group {query.group_id}"
+
+        bus.register_handler(GetUser, GetUserHandler())
+        bus.register_handler(GetGroup, get_group)
+
+        responses = asyncio.run(
+            bus.execute_many([GetGroup(group_id=1), GetUser(user_id=2)])
+        )
+
+        assert responses == ["group 1", "user 2"]
+
+    def test_batch_policy(self):
+        """
+        Test that handle_many runs according to the execution policy of its handler.
+        """
+        executor = HandlerExecutor()
+        self.addCleanup(executor.shutdown)
+        bus = AsyncCommandBus(executor=executor)
+        handler = ThreadedHandler()
+        bus.register_handler(CreateUser, handler)
+
+        asyncio.run(bus.execute_many([CreateUser(user_id=1), CreateUser(user_id=2)]))
+
+        assert len(handler.batches) == 1
+        assert handler.batches[0].startswith("handler")
+
+    def test_send_many(self):
+        """
+        Test that the default send_many sends each message.
+        """
+        broker = FakeBroker()
+
+        asyncio.run(broker.send_many("topic", ["a", "b"]))
+
+        assert broker.sent == [("topic", "a"), ("topic", "b")]
+
+    def test_broker_command_bus(self):
+        """
+        Test that a broker command bus sends a batch and returns the uuids in order.
+        """
+        broker = FakeBroker()
+        bus = KafkaCommandBus(broker)
+        asyncio.run(bus.register_handler(CreateUser, CreateUserHandler()))
+
+        uuids = asyncio.run(
+            bus.execute_many([CreateUser(user_id=1), CreateUser(user_id=2)])
+        )
+
+        assert len(broker.sent) == 2
+        assert all(
+            uuid.encode() in message for uuid, (_, message) in zip(uuids, broker.sent)
+        )
+
+        with self.assertRaises(HandlerNotFound):
+            asyncio.run(bus.execute_many([CreateUser(user_id=3), CommandInterface()]))
+        assert len(broker.sent) == 2
+
+    def test_broker_invalidates_per_command(self):
+        """
+        Test that a broker command bus reads invalidates from each command.
+        """
+        cache = QueryCache()
+        cache.put(GetUser(user_id=1), "user 1")
+        bus = KafkaCommandBus(FakeBroker(), cache=cache)
+        asyncio.run(bus.register_handler(UpdateUser, RecordingHandler()))
+
+        asyncio.run(bus.execute_many([UpdateUser(user_id=1)]))
+        assert cache.get(GetUser(user_id=1)) == "user 1"
+
+        asyncio.run(bus.execute_many([UpdateUser(user_id=1, name="ada")]))
+        assert cache.get(GetUser(user_id=1)) is MISS
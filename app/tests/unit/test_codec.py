@@ -0,0 +1,165 @@
+"""Unit tests for the protocol message codecs."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import json
+from dataclasses import dataclass
+from unittest import TestCase, skipIf
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs import codec as codecs
+from core.cqrs.codec import (
+    BINARY,
+    JSON,
+    MSGPACK,
+    Codec,
+    MsgpackCodec,
+    decode,
+    encode,
+    register_codec,
+)
+from core.cqrs.command.bus.kafka_command_bus import KafkaCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.exceptions import CodecAlreadyRegistered, UnknownCodec
+from .fakes import FakeBroker
+
+
+@dataclass(frozen=True, kw_only=True)
+class CreateUser(CommandInterface):
+    """A command."""
+
+    user_id: int
+    name: str
+
+
+class ReversedJsonCodec(Codec):
+    """A codec sending JSON backwards."""
+
+    codec_id = 42
+    content_type = "application/x-reversed-json"
+
+    def dumps(self, data):
+        return json.dumps(data).encode()[::-1]
+
+    def loads(self, payload):
+        return json.loads(payload[::-1])
+
+
+class TestBinaryCodec(TestCase):
+    """BinaryCodec test class."""
+
+    def test_round_trip(self):
+        """
+        Test that every supported value, of every width, is decoded back.
+        """
+        data = {
+            "constants": [None, True, False],
+            "ints": [0, -128, 127, 300, -(2**31), 2**40, -(2**63), 2**70, -(2**70)],
+            "floats": [0.5, -1e300],
+            "strings": ["", "é", "x" * 300],
+            "bytes": [b"", b"\x00" * 300],
+            "nested": {"list": list(range(300)), "tuple": (1, "a")},
+            "large": {str(index): index for index in range(300)},
+        }
+
+        decoded = BINARY.loads(BINARY.dumps(data))
+
+        assert decoded == {
+            **data,
+            "nested": {"list": list(range(300)), "tuple": [1, "a"]},
+        }
+
+    def test_unsupported(self):
+        """
+        Test that values without binary encoding are rejected, as JSON does.
+        """
+        with self.assertRaises(TypeError):
+            BINARY.dumps({"set": {1}})
+
+        with self.assertRaises(ValueError):
+            BINARY.loads(b"?")
+
+    def test_compact(self):
+        """
+        Test that a typical message is smaller than in JSON.
+        """
+        ap = AsyncProtocol.from_cq(CreateUser(user_id=12345, name="bob"), deadline=1.5)
+
+        assert len(ap.to_bytes(BINARY)) < len(ap.to_bytes())
+        assert AsyncProtocol.from_bytes(ap.to_bytes(BINARY)) == ap
+
+
+class TestMsgpackCodec(TestCase):
+    """MsgpackCodec test class."""
+
+    @skipIf(MSGPACK is None, "msgpack is not installed")
+    def test_round_trip(self):
+        """
+        Test that a message is framed with the msgpack id and decoded back.
+        """
+        ap = AsyncProtocol.from_cq(CreateUser(user_id=12345, name="bob"), deadline=1.5)
+
+        message = ap.to_bytes(MSGPACK)  # pyright: ignore
+
+        assert message[:2] == bytes((0, 2))
+        assert len(message) < len(ap.to_bytes(BINARY))
+        assert AsyncProtocol.from_bytes(message) == ap
+        assert decode(encode({"blob": b"\x00", 1: (1, 2)}, MSGPACK)) == {  # type: ignore
+            "blob": b"\x00",
+            1: [1, 2],
+        }
+
+    @skipIf(MSGPACK is not None, "msgpack is installed")
+    def test_not_installed(self):
+        """
+        Test that the codec requires msgpack.
+        """
+        with self.assertRaises(ModuleNotFoundError):
+            MsgpackCodec()
+
+
+class TestFrames(TestCase):
+    """Codec framing test class."""
+
+    def test_json_plain(self):
+        """
+        Test that JSON messages are plain JSON, readable by older listeners.
+        """
+        ap = AsyncProtocol.from_cq(CreateUser(user_id=1, name="bob"))
+
+        assert ap.to_bytes() == ap.to_json().encode()
+        assert AsyncProtocol.from_bytes(ap.to_bytes()) == ap
+
+    def test_registered(self):
+        """
+        Test that framed messages are decoded by the codec they name.
+        """
+        message = encode({"a": 1}, ReversedJsonCodec())
+        assert message[:2] == bytes((0, 42))
+
+        with self.assertRaises(UnknownCodec):
+            decode(message)
+
+        register_codec(ReversedJsonCodec())
+        self.addCleanup(codecs._codecs.pop, 42)  # pylint: disable=protected-access
+        assert decode(message) == {"a": 1}
+
+        with self.assertRaises(CodecAlreadyRegistered):
+            register_codec(type("Other", (ReversedJsonCodec,), {"codec_id": 1})())
+
+        assert decode(encode({"a": 1}, JSON)) == {"a": 1}
+
+    def test_bus_codec(self):
+        """
+        Test that a bus sends its messages with its codec.
+        """
+        broker = FakeBroker()
+        bus = KafkaCommandBus(broker, codec=BINARY)
+        asyncio.run(bus.register_handler(CreateUser, print))
+
+        uuid = asyncio.run(bus.execute(CreateUser(user_id=1, name="bob")))
+
+        message = broker.sent[0][1]
+        assert message[:2] == bytes((0, BINARY.codec_id))
+        assert AsyncProtocol.from_bytes(message).uuid == uuid
@@ -0,0 +1,105 @@
+"""Unit tests for the compression of protocol messages."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import lzma
+import os
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs import compression
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.codec import BINARY, COMPRESSED_ID, FRAME_MARKER
+from core.cqrs.command.bus.kafka_command_bus import KafkaCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.compression import (
+    Compressed,
+    Compressor,
+    compress,
+    decompress,
+    register_compressor,
+)
+from core.cqrs.exceptions import CompressorAlreadyRegistered, UnknownCompressor
+from .fakes import FakeBroker
+
+
+@dataclass(frozen=True, kw_only=True)
+class Upload(CommandInterface):
+    """A command with a large parameter."""
+
+    content: str
+
+
+class LzmaCompressor(Compressor):
+    """A compressor from the standard library."""
+
+    compressor_id = 42
+
+    def compress(self, data):
+        return lzma.compress(data)
+
+    def decompress(self, data):
+        return lzma.decompress(data)
+
+
+class TestCompressed(TestCase):
+    """Compressed codec test class."""
+
+    def test_threshold(self):
+        """
+        Test that only the messages reaching the threshold are compressed.
+        """
+        codec = Compressed(BINARY, threshold=200)
+        small = AsyncProtocol.from_cq(Upload(content="x"))
+        large = AsyncProtocol.from_cq(Upload(content="x" * 1000))
+
+        assert small.to_bytes(codec) == small.to_bytes(BINARY)
+        message = large.to_bytes(codec)
+        assert message[:3] == bytes((FRAME_MARKER, COMPRESSED_ID, 0))
+        assert len(message) < len(large.to_bytes(BINARY)) // 5
+        assert AsyncProtocol.from_bytes(message) == large
+
+    def test_incompressible(self):
+        """
+        Test that a message is sent as is when compression does not shrink it.
+        """
+        ap = AsyncProtocol(uuid="u", cq="Upload", parameters={"blob": os.urandom(2000)})
+
+        assert ap.to_bytes(Compressed(BINARY)) == ap.to_bytes(BINARY)
+
+    def test_registered(self):
+        """
+        Test that messages are decompressed by the compressor they name.
+        """
+        message = compress(b"{}", LzmaCompressor())
+        assert message[2] == 42
+
+        with self.assertRaises(UnknownCompressor):
+            decompress(message)
+
+        register_compressor(LzmaCompressor())
+        self.addCleanup(
+            compression._compressors.pop, 42  # pylint: disable=protected-access
+        )
+        assert decompress(message) == b"{}"
+        assert decompress(b"{}") == b"{}"
+
+        with self.assertRaises(CompressorAlreadyRegistered):
+            register_compressor(
+                type("Other", (LzmaCompressor,), {"compressor_id": 0})()
+            )
+
+    def test_bus(self):
+        """
+        Test that a bus compresses its large messages with a Compressed codec.
+        """
+        broker = FakeBroker()
+        bus = KafkaCommandBus(broker, codec=Compressed())
+        asyncio.run(bus.register_handler(Upload, print))
+
+        asyncio.run(bus.execute(Upload(content="x" * 5000)))
+
+        message = broker.sent[0][1]
+        assert len(message) < 200
+        assert AsyncProtocol.from_bytes(message).to_cq() == Upload(content="x" * 5000)
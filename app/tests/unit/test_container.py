@@ -3,9 +3,17 @@
 # pylint: disable=import-error
 # pyright: reportMissingImports=false
 # pyright: reportAttributeAccessIssue=false
+import asyncio
+import threading
+import time
 from unittest import TestCase
-from core.di import Container, di, inject
-from core.di.exceptions import ContainerServiceNotFoundError
+from core.di import Container, di, inject, use_container, current_container
+from core.di.exceptions import (
+    ContainerServiceNotFoundError,
+    ContainerScopeError,
+    ContainerServiceNotReadyError,
+    ContainerFrozenError,
+)
 
 
 class TestContainer(TestCase):
@@ -75,3 +83,296 @@ class TestContainer(TestCase):
         )
 
         assert di["example"].name == "qux"
+
+    def test_singleton_is_lazy(self):
+        """
+        Test that a singleton factory is called once, on first resolution.
+        """
+        mydi = Container()
+        calls = []
+        mydi.singleton("service", lambda: calls.append(1) or object())
+
+        self.assertEqual(calls, [])
+        self.assertIs(mydi["service"], mydi["service"])
+        self.assertEqual(calls, [1])
+
+    def test_transient(self):
+        """
+        Test that a transient factory is called on every resolution.
+        """
+        mydi = Container()
+        mydi.transient("service", object)
+
+        self.assertIsNot(mydi["service"], mydi["service"])
+
+    def test_scoped_outside_scope(self):
+        """
+        Test that scoped services cannot be resolved from the root container.
+        """
+        mydi = Container()
+        mydi.scoped("service", object)
+
+        with self.assertRaises(ContainerScopeError):
+            mydi["service"]  # pylint: disable=pointless-statement
+
+    def test_singleton_thread_safety(self):
+        """
+        Test that concurrent resolutions build a singleton only once.
+        """
+        mydi = Container()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.01)
+            return object()
+
+        mydi.singleton("service", factory)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(mydi["service"]))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_async_singleton(self):
+        """
+        Test that async singletons are awaited once and then resolved synchronously.
+        """
+        mydi = Container()
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return object()
+
+        mydi.singleton("service", factory)
+
+        with self.assertRaises(ContainerServiceNotReadyError):
+            mydi["service"]  # pylint: disable=pointless-statement
+
+        async def run():
+            return await asyncio.gather(mydi.aget("service"), mydi.aget("service"))
+
+        first, second = asyncio.run(run())
+
+        assert first is second is mydi["service"]
+        assert calls == [1]
+
+    def test_async_factory_lifetime(self):
+        """
+        Test that async factories must be singletons.
+        """
+        mydi = Container()
+
+        async def factory():
+            return object()
+
+        with self.assertRaises(ValueError):
+            mydi.transient("service", factory)
+
+    def test_warm_up(self):
+        """
+        Test that warm up builds independent services concurrently in dependency order.
+        """
+        mydi = Container()
+        events = []
+
+        def connect(name, delay):
+            async def factory():
+                events.append(f"start {name}")
+                await asyncio.sleep(delay)
+                events.append(f"end {name}")
+                return name
+
+            return factory
+
+        mydi.singleton("kafka", connect("kafka", 0.02))
+        mydi.singleton("redis", connect("redis", 0.01))
+        mydi.singleton("bus", connect("bus", 0), dependencies=["kafka", "redis"])
+
+        asyncio.run(mydi.warm_up())
+
+        assert sorted(events[:2]) == ["start kafka", "start redis"]
+        assert events[-2:] == ["start bus", "end bus"]
+        assert mydi["bus"] == "bus"
+
+
+class TestScope(TestCase):
+    """Scope test class."""
+
+    def test_overlay(self):
+        """
+        Test that a scope reads parent bindings and keeps its writes local.
+        """
+        mydi = Container()
+        mydi["foo"] = "bar"
+
+        with mydi.scope() as scope:
+            scope["baz"] = "qux"
+            scope["foo"] = "overridden"
+
+            assert scope["foo"] == "overridden"
+            assert scope["baz"] == "qux"
+
+        assert mydi["foo"] == "bar"
+        assert "baz" not in mydi
+
+    def test_scoped_lifetime(self):
+        """
+        Test that scoped services are shared within a scope only.
+        """
+        mydi = Container()
+        mydi.scoped("service", object)
+
+        with mydi.scope() as first, mydi.scope() as second:
+            assert first["service"] is first["service"]
+            assert first["service"] is not second["service"]
+
+    def test_dispose(self):
+        """
+        Test that closable scoped services are closed with the scope.
+        """
+        closed = []
+
+        class Session:  # pylint: disable=too-few-public-methods
+            """Closable service"""
+
+            def close(self):
+                """Close the session"""
+                closed.append(self)
+
+        mydi = Container()
+        mydi.scoped("session", Session)
+
+        with mydi.scope() as scope:
+            session = scope["session"]
+            assert not closed
+
+        assert closed == [session]
+
+    def test_async_dispose(self):
+        """
+        Test that async close methods are awaited when the scope is closed.
+        """
+        closed = []
+
+        class Session:  # pylint: disable=too-few-public-methods
+            """Async closable service"""
+
+            async def close(self):
+                """Close the session"""
+                closed.append(self)
+
+        mydi = Container()
+        mydi.scoped("session", Session)
+
+        async def run():
+            async with mydi.scope() as scope:
+                return scope["session"]
+
+        session = asyncio.run(run())
+
+        assert closed == [session]
+
+    def test_inject_resolves_from_active_scope(self):
+        """
+        Test that injected callables resolve scoped bindings while a scope is entered.
+        """
+        mydi = Container()
+        mydi["correlation_id"] = "root"
+
+        @inject(container=mydi)
+        def service(correlation_id):
+            return correlation_id
+
+        with mydi.scope() as scope:
+            scope["correlation_id"] = "scoped"
+            assert service() == "scoped"  # pylint: disable=no-value-for-parameter
+
+        assert service() == "root"  # pylint: disable=no-value-for-parameter
+
+
+class TestFrozenContainer(TestCase):
+    """Frozen container test class."""
+
+    def test_writes_raise(self):
+        """
+        Test that a frozen container rejects writes.
+        """
+        mydi = Container()
+        mydi["foo"] = "bar"
+        mydi.freeze()
+
+        assert mydi.frozen
+        assert mydi["foo"] == "bar"
+
+        with self.assertRaises(ContainerFrozenError):
+            mydi["foo"] = "baz"
+
+        with self.assertRaises(ContainerFrozenError):
+            mydi.singleton("service", object)
+
+    def test_snapshot(self):
+        """
+        Test that freezing flattens the parent bindings and built singletons.
+        """
+        parent = Container()
+        parent["foo"] = "bar"
+        parent.singleton("built", object)
+        parent.singleton("lazy", object)
+        built = parent["built"]
+
+        child = Container(parent=parent).freeze()
+        parent["baz"] = "qux"
+
+        assert child["foo"] == "bar"
+        assert "baz" not in child
+        assert child._bindings["built"] is built  # pylint: disable=protected-access
+        assert child["lazy"] is parent["lazy"]
+
+    def test_scope_of_frozen_container(self):
+        """
+        Test that scopes can still be opened and written from a frozen container.
+        """
+        mydi = Container()
+        mydi["foo"] = "bar"
+        mydi.freeze()
+
+        with mydi.scope() as scope:
+            scope["correlation_id"] = "id"
+            assert scope["foo"] == "bar"
+
+    def test_per_thread_containers(self):
+        """
+        Test that each thread resolves injected services from its own container.
+        """
+        results = {}
+
+        @inject
+        def service(thread_name):
+            return thread_name
+
+        def run(name):
+            container = Container(parent=di)
+            container["thread_name"] = name
+            container.freeze()
+            with use_container(container):
+                assert current_container() is container
+                results[name] = service()  # pylint: disable=no-value-for-parameter
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {"a": "a", "b": "b"}
+        assert current_container() is di
@@ -0,0 +1,131 @@
+"""Unit tests for the deadlines of queries sent through a broker."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.exceptions import QueryTimeout
+from core.cqrs.query.bus.kafka_query_bus import KafkaQueryBus
+from core.cqrs.query.query import QueryInterface
+from .fakes import FakeBroker
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetUser(QueryInterface):
+    """A query."""
+
+    user_id: int
+
+
+class SilentConsumer:
+    """A Kafka consumer never receiving anything."""
+
+    def __init__(self):
+        self.polls = 0
+
+    def subscribe(self, topic):  # pylint: disable=unused-argument
+        """Subscribes nowhere."""
+
+    def poll(self, timeout_ms):
+        """Waits for timeout_ms and returns no records."""
+        self.polls += 1
+        time.sleep(timeout_ms / 1000)
+        return {}
+
+
+class TestAsyncProtocol(TestCase):
+    """AsyncProtocol deadline test class."""
+
+    def test_json(self):
+        """
+        Test that the deadline is sent only when set.
+        """
+        ap = AsyncProtocol.from_cq(GetUser(user_id=1))
+        assert "deadline" not in json.loads(ap.to_json())
+        assert AsyncProtocol.from_json(ap.to_json()).deadline is None
+
+        ap = AsyncProtocol.from_cq(GetUser(user_id=1), deadline=12.5)
+        assert AsyncProtocol.from_json(ap.to_json()).deadline == 12.5
+
+    def test_expired(self):
+        """
+        Test the expiry and the time left of a message.
+        """
+        ap = AsyncProtocol.from_cq(GetUser(user_id=1), deadline=10.0)
+
+        assert not ap.expired(now=9.0)
+        assert ap.remaining(now=9.0) == 1.0
+        assert ap.expired(now=10.0)
+        assert ap.remaining(now=11.0) == 0.0
+
+        ap = AsyncProtocol.from_cq(GetUser(user_id=1))
+        assert not ap.expired() and ap.remaining() is None
+
+
+class TestKafkaQueryBus(TestCase):
+    """KafkaQueryBus deadline test class."""
+
+    def test_timeout(self):
+        """
+        Test that a query without response times out, and carries its deadline.
+        """
+        broker = FakeBroker({"consumer": SilentConsumer()})
+        bus = KafkaQueryBus(broker, timeout=0.05)
+        asyncio.run(bus.register_handler(GetUser, print))
+
+        before = time.time()
+        with self.assertRaises(QueryTimeout):
+            asyncio.run(bus.execute(GetUser(user_id=1)))
+
+        assert time.time() - before < 1
+        deadline = AsyncProtocol.from_json(broker.sent[0][1]).deadline
+        assert before < deadline <= before + 0.1
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(bus.execute_many([GetUser(user_id=2)]))
+
+    def test_expired_skipped(self):
+        """
+        Test that a listener skips a query past its deadline without responding.
+        """
+        broker = FakeBroker({"consumer": SilentConsumer()})
+        bus = KafkaQueryBus(broker)
+        received = []
+        message = AsyncProtocol.from_cq(GetUser(user_id=1), deadline=time.time() - 1)
+
+        with self.assertLogs(level="WARNING"):
+            asyncio.run(
+                bus._process(  # pylint: disable=protected-access
+                    received.append, message.to_json(), send_response=True
+                )
+            )
+
+        assert not received and not broker.sent
+
+    def test_cancelled_at_deadline(self):
+        """
+        Test that a handler still running at the deadline is cancelled.
+        """
+        broker = FakeBroker({"consumer": SilentConsumer()})
+        bus = KafkaQueryBus(broker)
+        finished = []
+
+        async def slow(query):
+            await asyncio.sleep(1)
+            finished.append(query)
+
+        message = AsyncProtocol.from_cq(GetUser(user_id=1), deadline=time.time() + 0.02)
+
+        with self.assertLogs(level="WARNING"):
+            asyncio.run(
+                bus._process(  # pylint: disable=protected-access
+                    slow, message.to_json(), send_response=True
+                )
+            )
+
+        assert not finished and not broker.sent
@@ -0,0 +1,142 @@
+"""Unit tests for the dispatch module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from dataclasses import dataclass
+from unittest import TestCase
+from core.di import Container
+from core.cqrs.command.bus.async_command_bus import AsyncCommandBus
+from core.cqrs.command.bus.di_command_bus import DICommandBus
+from core.cqrs.command.bus.simple_command_bus import SimpleCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.dispatch import DispatchTable
+from core.cqrs.exceptions import CommandAlreadyRegistered, HandlerNotFound
+from core.cqrs.handler import HandlerInterface
+
+
+@dataclass(frozen=True, kw_only=True)
+class AuditCommand(CommandInterface):
+    """A command family handled generically."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class DeleteUser(AuditCommand):
+    """A member of the family."""
+
+    user_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class PurgeUser(DeleteUser):
+    """A member of the family with a closer ancestor."""
+
+
+class RecordingHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+    """Records the commands it handles under its name."""
+
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def __call__(self, cq):
+        self.calls.append((self.name, type(cq)))
+
+
+class TestDispatchTable(TestCase):
+    """DispatchTable test class."""
+
+    def test_closest_base(self):
+        """
+        Test that a type is dispatched to its closest registered base.
+        """
+        table = DispatchTable()
+        table.register(AuditCommand, "audit")
+
+        assert table[PurgeUser] == "audit"
+
+        table.register(DeleteUser, "delete")
+
+        assert table[PurgeUser] == "delete"
+        assert table[AuditCommand] == "audit"
+
+    def test_cached(self):
+        """
+        Test that resolved types are stored until a registration.
+        """
+        table = DispatchTable()
+        table.register(AuditCommand, "audit")
+        table.find(DeleteUser)
+
+        assert DeleteUser in table
+
+        table.register(CommandInterface, "any")
+
+        assert DeleteUser not in table
+
+    def test_not_found(self):
+        """
+        Test that types without a registered base are not found.
+        """
+        table = DispatchTable()
+        table.register(DeleteUser, "delete")
+
+        assert table.find(AuditCommand) is None
+        with self.assertRaises(KeyError):
+            table[AuditCommand]  # pylint: disable=pointless-statement
+
+
+class TestPolymorphicBuses(TestCase):
+    """Polymorphic dispatch test class."""
+
+    def test_simple_bus(self):
+        """
+        Test that a base handler receives subclasses until shadowed.
+        """
+        calls = []
+        bus = SimpleCommandBus()
+        bus.register_handler(AuditCommand, RecordingHandler("audit", calls))
+
+        bus.execute(PurgeUser(user_id=1))
+        bus.register_handler(DeleteUser, RecordingHandler("delete", calls))
+        bus.execute(PurgeUser(user_id=1))
+        bus.execute_many([DeleteUser(user_id=1), AuditCommand()])
+
+        assert calls == [
+            ("audit", PurgeUser),
+            ("delete", PurgeUser),
+            ("delete", DeleteUser),
+            ("audit", AuditCommand),
+        ]
+
+        with self.assertRaises(CommandAlreadyRegistered):
+            bus.register_handler(DeleteUser, RecordingHandler("again", calls))
+        with self.assertRaises(HandlerNotFound):
+            bus.execute(CommandInterface())
+
+    def test_di_bus(self):
+        """
+        Test that the DI bus dispatches subclasses to the closest bound handler.
+        """
+        calls = []
+        bus = DICommandBus(Container())
+        bus.register_handler(AuditCommand, RecordingHandler("audit", calls))
+
+        bus.execute(PurgeUser(user_id=1))
+        bus.register_handler(DeleteUser, RecordingHandler("delete", calls))
+        bus.execute_many([PurgeUser(user_id=1)])
+
+        assert calls == [("audit", PurgeUser), ("delete", PurgeUser)]
+
+    def test_async_bus(self):
+        """
+        Test that the async bus dispatches subclasses to a base handler.
+        """
+        calls = []
+        bus = AsyncCommandBus()
+        bus.register_handler(AuditCommand, RecordingHandler("audit", calls))
+
+        asyncio.run(bus.execute(DeleteUser(user_id=1)))
+
+        assert calls == [("audit", DeleteUser)]
@@ -0,0 +1,173 @@
+"""Unit tests for the batch envelopes."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.codec import BINARY, ENVELOPE_ID, JsonCodec, register_codec
+from core.cqrs.command.bus.kafka_command_bus import KafkaCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.envelope import Batcher, pack, unpack
+from core.cqrs.exceptions import CodecAlreadyRegistered
+from core.cqrs.registry import fqdn_of
+from .fakes import FakeBroker, FakeConsumer, Record, StopConsuming
+
+
+@dataclass(frozen=True, kw_only=True)
+class CreateUser(CommandInterface):
+    """A command."""
+
+    user_id: int
+
+
+class LoopbackBroker(FakeBroker):
+    """A broker consuming back the messages sent to it."""
+
+    async def connect(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """Consumes the messages sent so far."""
+        self.connection = {
+            "consumer": FakeConsumer(
+                [Record(topic, message) for topic, message in self.sent]
+            )
+        }
+
+
+class TestEnvelope(TestCase):
+    """Envelope framing test class."""
+
+    def test_round_trip(self):
+        """
+        Test that an envelope unpacks to its messages, and other messages to themselves.
+        """
+        messages = [b"", b"{}", bytes(300)]
+
+        assert unpack(pack(messages)) == messages
+        assert unpack(b'{"uuid": "a"}') == [b'{"uuid": "a"}']
+
+        with self.assertRaises(ValueError):
+            unpack(pack(messages)[:-1])
+
+    def test_reserved_id(self):
+        """
+        Test that no codec can take the id of the envelopes.
+        """
+        with self.assertRaises(CodecAlreadyRegistered):
+            register_codec(type("Envelope", (JsonCodec,), {"codec_id": ENVELOPE_ID})())
+
+
+class TestBatcher(TestCase):
+    """Batcher test class."""
+
+    def test_size(self):
+        """
+        Test that an envelope is sent once full, and a lone message as is.
+        """
+        broker = LoopbackBroker()
+        batcher = Batcher(max_bytes=34, linger=None)
+
+        async def send():
+            for message in (b"a" * 10, b"b" * 10, b"c" * 10):
+                await batcher.add(broker.send, "topic", message)
+            assert len(batcher) == 1
+            await batcher.flush()
+
+        asyncio.run(send())
+
+        assert broker.sent == [
+            ("topic", pack([b"a" * 10, b"b" * 10])),
+            ("topic", b"c" * 10),
+        ]
+        assert not batcher
+
+    def test_count(self):
+        """
+        Test that an envelope holds at most max_messages, per destination.
+        """
+        broker = LoopbackBroker()
+        batcher = Batcher(max_messages=2, linger=None)
+
+        async def send():
+            for index in range(3):
+                await batcher.add(broker.send, "even", b"%d" % (2 * index))
+                await batcher.add(broker.send, "odd", b"%d" % (2 * index + 1))
+            await batcher.flush()
+
+        asyncio.run(send())
+
+        assert broker.sent == [
+            ("even", pack([b"0", b"2"])),
+            ("odd", pack([b"1", b"3"])),
+            ("even", b"4"),
+            ("odd", b"5"),
+        ]
+
+    def test_linger(self):
+        """
+        Test that the messages are sent once their linger time has passed.
+        """
+        broker = LoopbackBroker()
+        batcher = Batcher(linger=0.01)
+
+        async def send():
+            await batcher.add(broker.send, "topic", b"a")
+            await batcher.add(broker.send, "topic", b"b")
+            assert not broker.sent
+            await asyncio.sleep(0.05)
+
+        asyncio.run(send())
+
+        assert broker.sent == [("topic", pack([b"a", b"b"]))]
+
+    def test_linger_failed(self):
+        """
+        Test that a send failing after the linger time is logged.
+        """
+        batcher = Batcher(linger=0.01)
+
+        async def fail(fqdn, message):
+            raise ConnectionError(f"{fqdn} unreachable")
+
+        async def send():
+            await batcher.add(fail, "topic", b"a")
+            await asyncio.sleep(0.05)
+
+        with self.assertLogs(level="ERROR") as logs:
+            asyncio.run(send())
+
+        assert "topic" in logs.output[0]
+        assert "ConnectionError: topic unreachable" in logs.output[0]
+        assert not batcher
+
+
+class TestKafkaCommandBus(TestCase):
+    """KafkaCommandBus envelope test class."""
+
+    def test_batched(self):
+        """
+        Test that batched commands are sent in one record and handled one by one.
+        """
+        broker = LoopbackBroker()
+        bus = KafkaCommandBus(broker, codec=BINARY, batcher=Batcher(linger=None))
+        received = []
+        asyncio.run(bus.register_handler(CreateUser, received.append))
+
+        async def send():
+            uuids = [await bus.execute(CreateUser(user_id=1))]
+            uuids += await bus.execute_many([CreateUser(user_id=2)])
+            await bus.execute(CreateUser(user_id=3))
+            assert len(broker.sent) == 1
+            await bus.flush()
+            return uuids
+
+        uuids = asyncio.run(send())
+
+        assert [topic for topic, _ in broker.sent] == [fqdn_of(CreateUser)] * 2
+        messages = unpack(broker.sent[0][1])
+        assert [AsyncProtocol.from_bytes(m).uuid for m in messages] == uuids
+
+        with self.assertRaises(StopConsuming):
+            asyncio.run(bus.listen())
+        assert received == [CreateUser(user_id=n) for n in (1, 2, 3)]
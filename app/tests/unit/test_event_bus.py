@@ -0,0 +1,162 @@
+"""Unit tests for the event buses."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.event.bus.async_event_bus import AsyncEventBus
+from core.cqrs.event.bus.kafka_event_bus import KafkaEventBus
+from core.cqrs.event.event import EventInterface
+from core.cqrs.event.subscribers import subscriber_name
+from core.cqrs.exceptions import SubscriberAlreadyRegistered
+from core.cqrs.registry import fqdn_of
+from .fakes import FakeBroker, FakeConsumer, Record, StopConsuming
+
+
+@dataclass(frozen=True, kw_only=True)
+class UserEvent(EventInterface):
+    """An event family."""
+
+    user_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class UserCreated(UserEvent):
+    """An event of the family."""
+
+
+class GroupBroker(FakeBroker):
+    """A broker creating a consumer of the given records per consumer group."""
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+        self.consumers = {}
+
+    def consumer(self, topics, group):
+        """Returns a consumer of the records of topics."""
+        consumer = self.consumers[group] = FakeConsumer(
+            [record for record in self.records if record.topic in topics]
+        )
+        return consumer
+
+
+class TestAsyncEventBus(TestCase):
+    """AsyncEventBus test class."""
+
+    def test_fan_out(self):
+        """
+        Test that every subscriber of the event type and its bases is called.
+        """
+        bus = AsyncEventBus()
+        received = []
+
+        async def welcome(event):
+            received.append(("welcome", event.user_id))
+
+        def audit(event):
+            received.append(("audit", event.user_id))
+
+        bus.subscribe(UserCreated, welcome)
+        bus.subscribe(UserEvent, audit)
+
+        assert not asyncio.run(bus.execute(UserCreated(user_id=1)))
+        asyncio.run(bus.execute(UserEvent(user_id=2)))
+
+        assert sorted(received) == [("audit", 1), ("audit", 2), ("welcome", 1)]
+
+    def test_isolation(self):
+        """
+        Test that a failing subscriber does not prevent the others.
+        """
+        bus = AsyncEventBus()
+        received = []
+
+        def failing(event):
+            raise LookupError(event.user_id)
+
+        bus.subscribe(UserCreated, failing)
+        bus.subscribe(UserCreated, received.append, name="recorder")
+
+        with self.assertLogs(level="ERROR"):
+            failures = asyncio.run(bus.execute(UserCreated(user_id=1)))
+
+        assert len(failures) == 1 and isinstance(failures[0], LookupError)
+        assert received == [UserCreated(user_id=1)]
+
+    def test_limit(self):
+        """
+        Test that no more than limit subscribers run at once.
+        """
+        bus = AsyncEventBus(limit=2)
+        running = []
+        peak = []
+
+        async def subscriber(event):  # pylint: disable=unused-argument
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.001)
+            running.pop()
+
+        for index in range(6):
+            bus.subscribe(UserCreated, subscriber, name=f"subscriber {index}")
+
+        asyncio.run(bus.execute(UserCreated(user_id=1)))
+
+        assert len(peak) == 6
+        assert max(peak) == 2
+
+    def test_already_subscribed(self):
+        """
+        Test that a subscriber name is subscribed once per event type.
+        """
+        bus = AsyncEventBus()
+        bus.subscribe(UserCreated, print)
+
+        with self.assertRaises(SubscriberAlreadyRegistered):
+            bus.subscribe(UserCreated, print)
+
+        assert subscriber_name(print) == "builtins.print"
+
+
+class TestKafkaEventBus(TestCase):
+    """KafkaEventBus test class."""
+
+    def test_execute(self):
+        """
+        Test that events are sent to the topic of their type.
+        """
+        broker = GroupBroker([])
+        bus = KafkaEventBus(broker)
+
+        uuid = asyncio.run(bus.execute(UserCreated(user_id=1)))
+
+        assert broker.sent[0][0] == fqdn_of(UserCreated)
+        assert uuid.encode() in broker.sent[0][1]
+
+    def test_listen(self):
+        """
+        Test that each subscriber consumes in its own group, isolated from the others.
+        """
+        topic = fqdn_of(UserCreated)
+        message = AsyncProtocol.from_cq(UserCreated(user_id=1)).to_json().encode()
+        broker = GroupBroker([Record(topic, message)])
+        bus = KafkaEventBus(broker)
+        received = []
+
+        def failing(event):
+            raise LookupError(event.user_id)
+
+        bus.subscribe(UserCreated, failing, name="failing")
+        bus.subscribe(UserCreated, received.append, name="recorder")
+
+        with self.assertLogs(level="ERROR"), self.assertRaises(StopConsuming):
+            asyncio.run(bus.listen())
+
+        assert received == [UserCreated(user_id=1)]
+        assert set(broker.consumers) == {"failing", "recorder"}
+        assert all(consumer.closed for consumer in broker.consumers.values())
+        assert broker.consumers["recorder"].commits == 1
@@ -0,0 +1,299 @@
+"""Unit tests for the executor module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.command.bus.async_command_bus import AsyncCommandBus
+from core.cqrs.command.bus.kafka_command_bus import KafkaCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.executor import (
+    ExecutionPolicy,
+    HandlerExecutor,
+    executes_in,
+    policy_of,
+)
+from core.cqrs.handler import HandlerInterface
+from core.cqrs.registry import fqdn_of
+from core.di import Container, Lifetime
+from .fakes import FakeBroker, FakeProducer, Record
+
+
+@dataclass(frozen=True, kw_only=True)
+class Compute(CommandInterface):
+    """A command picklable by the process pool."""
+
+    value: int
+
+
+@executes_in(ExecutionPolicy.PROCESS)
+def compute_pid(command):  # pylint: disable=unused-argument
+    """Returns the pid of the process it runs in."""
+    return os.getpid()
+
+
+class SquareHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+    """Squares in a worker process."""
+
+    execution_policy = ExecutionPolicy.PROCESS
+
+    def __call__(self, cq):
+        return cq.value**2
+
+
+class ThreadNameHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+    """Returns the name of the thread it runs in."""
+
+    execution_policy = ExecutionPolicy.THREAD
+
+    def __call__(self, cq):
+        return threading.current_thread().name
+
+
+class BlockingConsumer:
+    """A Kafka consumer blocking in poll until records arrive, as a real one."""
+
+    def __init__(self, records):
+        self.records = records
+        self.closed = False
+
+    def poll(self, timeout_ms):
+        """Returns the records, then blocks for timeout_ms and returns none."""
+        if self.records:
+            records, self.records = self.records, []
+            return {"partition": records}
+        time.sleep(timeout_ms / 1000)
+        return {}
+
+    def close(self):
+        """Marks the consumer closed."""
+        self.closed = True
+
+
+class BlockingBroker(FakeBroker):
+    """A broker consuming the records given to it with a blocking consumer."""
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+
+    async def connect(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """Consumes the records with a blocking consumer."""
+        self.connection = {
+            "consumer": BlockingConsumer(self.records),
+            "producer": FakeProducer(),
+        }
+
+
+class TestPolicy(TestCase):
+    """Execution policy test class."""
+
+    def test_policy_of(self):
+        """
+        Test that policies are read from handlers, functions and providers.
+        """
+        container = Container()
+        container.register(ThreadNameHandler, ThreadNameHandler, Lifetime.TRANSIENT)
+
+        assert policy_of(print) is ExecutionPolicy.INLINE
+        assert policy_of(HandlerInterface()) is ExecutionPolicy.INLINE
+        assert policy_of(compute_pid) is ExecutionPolicy.PROCESS
+        assert policy_of(SquareHandler()) is ExecutionPolicy.PROCESS
+        assert policy_of(container.binding(ThreadNameHandler)) is ExecutionPolicy.THREAD
+
+
+class TestHandlerExecutor(TestCase):
+    """HandlerExecutor test class."""
+
+    def test_inline(self):
+        """
+        Test that inline handlers run on the event loop thread.
+        """
+        executor = HandlerExecutor()
+
+        async def handler(cq):
+            return cq * 2
+
+        assert asyncio.run(executor.run(handler, 2)) == 4
+        assert (
+            asyncio.run(executor.run(lambda cq: threading.current_thread().name, 1))
+            == threading.current_thread().name
+        )
+
+    def test_thread(self):
+        """
+        Test that thread handlers run in the thread pool.
+        """
+        executor = HandlerExecutor(max_threads=1)
+
+        name = asyncio.run(executor.run(ThreadNameHandler(), Compute(value=1)))
+        executor.shutdown()
+
+        assert name.startswith("handler")
+
+    def test_process(self):
+        """
+        Test that process handlers are rebuilt and run in a worker process.
+        """
+        executor = HandlerExecutor(max_processes=1)
+
+        async def run():
+            return (
+                await executor.run(compute_pid, Compute(value=1)),
+                await executor.run(SquareHandler(), Compute(value=3)),
+            )
+
+        try:
+            pid, square = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        assert pid != os.getpid()
+        assert square == 9
+
+    def test_submit_limit(self):
+        """
+        Test that no more than the limit of a policy runs at once.
+        """
+        executor = HandlerExecutor(limits={ExecutionPolicy.THREAD: 2})
+        running = []
+        peak = []
+
+        async def task():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.001)
+            running.pop()
+
+        async def run():
+            for _ in range(10):
+                await executor.submit(ExecutionPolicy.THREAD, task())
+            await executor.join()
+
+        asyncio.run(run())
+
+        assert len(peak) == 10
+        assert max(peak) == 2
+
+    def test_submit_failure_logged(self):
+        """
+        Test that the exception of a submitted task is logged.
+        """
+        executor = HandlerExecutor()
+
+        async def task():
+            raise LookupError("missing")
+
+        async def run():
+            await executor.submit(ExecutionPolicy.THREAD, task())
+            await executor.join()
+
+        with self.assertLogs(level="ERROR"):
+            asyncio.run(run())
+
+
+class TestAsyncBusExecutor(TestCase):
+    """Asynchronous bus executor test class."""
+
+    def test_offloaded(self):
+        """
+        Test that the asynchronous bus runs thread handlers in the thread pool.
+        """
+        names = []
+
+        @executes_in(ExecutionPolicy.THREAD)
+        def handler(command):  # pylint: disable=unused-argument
+            names.append(threading.current_thread().name)
+
+        executor = HandlerExecutor()
+        bus = AsyncCommandBus(executor=executor)
+        bus.register_handler(Compute, handler)
+
+        asyncio.run(bus.execute(Compute(value=1)))
+        executor.shutdown()
+
+        assert names[0].startswith("handler")
+
+    def test_kafka_listener(self):
+        """
+        Test that the Kafka listener polls off the event loop and runs thread
+        handlers in the thread pool.
+        """
+        names = []
+
+        @executes_in(ExecutionPolicy.THREAD)
+        def handler(command):  # pylint: disable=unused-argument
+            names.append(threading.current_thread().name)
+
+        message = AsyncProtocol.from_cq(Compute(value=1)).to_bytes()
+        broker = BlockingBroker([Record(fqdn_of(Compute), message)])
+        executor = HandlerExecutor()
+        self.addCleanup(executor.shutdown)
+        bus = KafkaCommandBus(broker, executor=executor)
+        bus.poll_timeout = 0.2
+
+        async def handled():
+            while not names:
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await bus.register_handler(Compute, handler)
+            listener = asyncio.create_task(bus.listen())
+            await asyncio.wait_for(handled(), 1)
+
+            # The consumer now blocks in poll, the loop must keep running
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            elapsed = time.perf_counter() - start
+
+            listener.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await listener
+            return elapsed
+
+        elapsed = asyncio.run(run())
+
+        assert names[0].startswith("handler")
+        assert elapsed < 0.1
+        assert broker.connection["consumer"].closed
+
+    def test_kafka_listener_cancelled(self):
+        """
+        Test that a cancelled Kafka listener closes the broker connection only
+        once the handlers it handed to the executor are done.
+        """
+        started = threading.Event()
+        closed = []
+
+        @executes_in(ExecutionPolicy.THREAD)
+        def handler(command):  # pylint: disable=unused-argument
+            started.set()
+            time.sleep(0.05)
+            closed.append(broker.connection["producer"].closed)
+
+        message = AsyncProtocol.from_cq(Compute(value=1)).to_bytes()
+        broker = BlockingBroker([Record(fqdn_of(Compute), message)])
+        executor = HandlerExecutor()
+        self.addCleanup(executor.shutdown)
+        bus = KafkaCommandBus(broker, executor=executor)
+        bus.poll_timeout = 0.01
+
+        async def run():
+            await bus.register_handler(Compute, handler)
+            listener = asyncio.create_task(bus.listen())
+            await asyncio.to_thread(started.wait, 1)
+
+            listener.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await listener
+
+        asyncio.run(run())
+
+        assert closed == [False]
+        assert broker.connection["producer"].closed
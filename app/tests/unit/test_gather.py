@@ -0,0 +1,236 @@
+"""Unit tests for the scatter-gather execution of queries."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import time
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.exceptions import HandlerNotFound, QueryTimeout
+from core.cqrs.query.bus.async_query_bus import AsyncQueryBus
+from core.cqrs.query.bus.kafka_query_bus import KafkaQueryBus
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.query.query import QueryInterface, QueryResponseInterface
+from .fakes import FakeBroker, Record
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetUser(QueryInterface):
+    """A query."""
+
+    user_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetGroup(QueryInterface):
+    """Another query."""
+
+    group_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class Name(QueryResponseInterface):
+    """A response."""
+
+    name: str
+
+
+class AnsweringConsumer:
+    """A Kafka consumer answering the queries sent through its broker."""
+
+    def __init__(self, broker, ignored):
+        self.broker = broker
+        self.ignored = ignored
+        self.topics = []
+        self.polling = 0
+        self.overlapping = False
+
+    def subscribe(self, topics):
+        """Records the subscribed topics."""
+        self.topics = topics
+
+    def poll(self, timeout_ms):
+        """Returns a response to each query sent since the last poll."""
+        self.polling += 1
+        self.overlapping = self.overlapping or self.polling > 1
+        try:
+            return self._answer(timeout_ms)
+        finally:
+            self.polling -= 1
+
+    def _answer(self, timeout_ms):
+        # The responses arrive while the poll waits, as from a real broker
+        latency = min(timeout_ms / 1000, 0.02)
+        time.sleep(latency)
+
+        sent, self.broker.sent = self.broker.sent, []
+        records = []
+        for fqdn, message in sent:
+            ap = AsyncProtocol.from_json(message)
+            if str(ap.parameters) in self.ignored:
+                continue
+
+            name = Name(name=f"{ap.cq.split('.')[-1]} {ap.parameters}")
+            response = AsyncProtocol.from_cq(name, uuid=ap.uuid).to_json()
+            records.append(Record(fqdn + "-Response", response.encode()))
+
+        if not records:
+            time.sleep(timeout_ms / 1000 - latency)
+
+        return {"partition": records}
+
+    def commit(self):
+        """Commits nothing."""
+
+
+class AnsweringBroker(FakeBroker):
+    """A broker answering every query, except the ignored ones."""
+
+    def __init__(self, ignored=()):
+        super().__init__({"consumer": AnsweringConsumer(self, ignored)})
+        self.batches = 0
+
+    async def send_many(self, cq, messages):
+        self.batches += 1
+        await super().send_many(cq, messages)
+
+
+class TestAsyncQueryBus(TestCase):
+    """AsyncQueryBus gather test class."""
+
+    @staticmethod
+    def bus(delays):
+        """Returns a bus answering each user after its delay."""
+        bus = AsyncQueryBus()
+
+        async def get_user(query):
+            await asyncio.sleep(delays[query.user_id])
+            return f"user {query.user_id}"
+
+        bus.register_handler(GetUser, get_user)
+        return bus
+
+    def test_order(self):
+        """
+        Test that the queries run concurrently and the responses come in order.
+        """
+        bus = self.bus({1: 0.05, 2: 0.05, 3: 0.0})
+
+        before = time.time()
+        responses = asyncio.run(
+            bus.gather(GetUser(user_id=1), GetUser(user_id=2), GetUser(user_id=3))
+        )
+
+        assert responses == ["user 1", "user 2", "user 3"]
+        assert time.time() - before < 0.1
+        assert not asyncio.run(bus.gather())
+
+    def test_timeout(self):
+        """
+        Test that a slow query times out, or is left out of partial results.
+        """
+        bus = self.bus({1: 0.0, 2: 1.0})
+        queries = (GetUser(user_id=1), GetUser(user_id=2))
+
+        with self.assertRaises(QueryTimeout):
+            asyncio.run(bus.gather(*queries, timeout=0.02))
+
+        responses = asyncio.run(bus.gather(*queries, timeout=0.02, partial=True))
+        assert responses[0] == "user 1"
+        assert isinstance(responses[1], QueryTimeout)
+
+    def test_failure(self):
+        """
+        Test that the failure of a query is raised, and a missing handler before any runs.
+        """
+        bus = self.bus({1: 1.0})
+
+        async def failing(query):
+            raise LookupError(query.group_id)
+
+        bus.register_handler(GetGroup, failing)
+
+        before = time.time()
+        with self.assertRaises(LookupError):
+            asyncio.run(bus.gather(GetUser(user_id=1), GetGroup(group_id=1)))
+        assert time.time() - before < 0.5
+
+        with self.assertRaises(HandlerNotFound):
+            asyncio.run(bus.gather(GetUser(user_id=1), QueryInterface()))
+
+
+class TestKafkaQueryBus(TestCase):
+    """KafkaQueryBus gather test class."""
+
+    @staticmethod
+    def bus(broker, cache=None):
+        """Returns a bus with handlers for both queries."""
+        bus = KafkaQueryBus(broker, cache=cache)
+        asyncio.run(bus.register_handler(GetUser, print))
+        asyncio.run(bus.register_handler(GetGroup, print))
+        return bus
+
+    def test_order(self):
+        """
+        Test that every query is sent before the responses are awaited together.
+        """
+        broker = AnsweringBroker()
+        bus = self.bus(broker)
+
+        responses = asyncio.run(
+            bus.gather(GetUser(user_id=1), GetGroup(group_id=2), GetUser(user_id=3))
+        )
+
+        assert [response.name for response in responses] == [
+            "GetUser {'user_id': 1}",
+            "GetGroup {'group_id': 2}",
+            "GetUser {'user_id': 3}",
+        ]
+        assert broker.batches == 2
+        assert sorted(broker.connection["consumer"].topics) == [
+            __name__ + ".GetGroup-Response",
+            __name__ + ".GetUser-Response",
+        ]
+
+    def test_concurrent(self):
+        """
+        Test that concurrent queries share the consumer and get their own response.
+        """
+        broker = AnsweringBroker()
+        bus = KafkaQueryBus(broker, timeout=1)
+        asyncio.run(bus.register_handler(GetUser, print))
+        asyncio.run(bus.register_handler(GetGroup, print))
+
+        async def execute():
+            return await asyncio.gather(
+                bus.execute(GetUser(user_id=1)), bus.execute(GetGroup(group_id=2))
+            )
+
+        responses = asyncio.run(execute())
+
+        assert [response.name for response in responses] == [
+            "GetUser {'user_id': 1}",
+            "GetGroup {'group_id': 2}",
+        ]
+        assert not broker.connection["consumer"].overlapping
+        assert not bus.responses
+
+    def test_partial(self):
+        """
+        Test that the missing responses are timeouts, and never cached.
+        """
+        broker = AnsweringBroker(ignored={"{'group_id': 2}"})
+        cache = QueryCache()
+        bus = self.bus(broker, cache)
+        queries = (GetUser(user_id=1), GetGroup(group_id=2))
+
+        with self.assertRaises(QueryTimeout):
+            asyncio.run(bus.gather(*queries, timeout=0.05))
+
+        responses = asyncio.run(bus.gather(*queries, timeout=0.05, partial=True))
+
+        assert responses[0].name == "GetUser {'user_id': 1}"
+        assert isinstance(responses[1], QueryTimeout)
+        assert len(cache) == 1
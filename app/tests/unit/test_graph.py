@@ -0,0 +1,68 @@
+"""Unit tests for the dependency graph module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+from unittest import TestCase
+from core.di import Container, inject
+from core.di.exceptions import ContainerCycleError
+from core.di.graph import dependency_graph, topological_levels
+
+
+class TestGraph(TestCase):
+    """Dependency graph test class."""
+
+    def test_explicit_dependencies(self):
+        """
+        Test that explicit dependencies are used as graph edges.
+        """
+        mydi = Container()
+        mydi["config"] = {}
+        mydi.singleton("broker", object, dependencies=["config"])
+        mydi.singleton("bus", object, dependencies=["broker"])
+
+        graph = dependency_graph(mydi, ["bus"])
+
+        self.assertEqual(
+            graph, {"bus": ("broker",), "broker": ("config",), "config": ()}
+        )
+
+    def test_inferred_dependencies(self):
+        """
+        Test that dependencies are inferred from injection plans.
+        """
+        mydi = Container()
+        mydi["config"] = {"debug": True}
+
+        @inject(container=mydi)
+        class Service:  # pylint: disable=too-few-public-methods
+            """Service class"""
+
+            def __init__(self, config, unknown=None):
+                self.config = config
+                self.unknown = unknown
+
+        graph = dependency_graph(mydi, [Service])
+
+        self.assertEqual(graph[Service], ("config",))
+
+    def test_topological_levels(self):
+        """
+        Test that independent keys share a level after their dependencies.
+        """
+        levels = topological_levels(
+            {"bus": ("broker",), "cache": (), "broker": (), "app": ("bus", "cache")}
+        )
+
+        self.assertEqual(
+            [sorted(level) for level in levels], [["broker", "cache"], ["bus"], ["app"]]
+        )
+
+    def test_cycle(self):
+        """
+        Test that cycles are detected.
+        """
+        with self.assertRaises(ContainerCycleError) as error:
+            topological_levels({"a": ("b",), "b": ("c",), "c": ("a",), "d": ()})
+
+        self.assertIn("->", str(error.exception))
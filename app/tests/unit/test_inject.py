@@ -0,0 +1,190 @@
+"""Unit tests for the inject module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from unittest import TestCase
+from core.di import Container, Lifetime, inject
+
+
+class Dependency:  # pylint: disable=too-few-public-methods
+    """Dependency bound by type."""
+
+
+class TestInject(TestCase):
+    """Inject test class."""
+
+    def test_resolve_by_name_before_type(self):
+        """
+        Test that name bindings take precedence over type bindings.
+        """
+        container = Container()
+        by_name, by_type = Dependency(), Dependency()
+        container["dependency"] = by_name
+        container[Dependency] = by_type
+
+        @inject(container=container)
+        def service(dependency: Dependency):
+            return dependency
+
+        self.assertIs(service(), by_name)  # pylint: disable=no-value-for-parameter
+
+    def test_resolve_by_type(self):
+        """
+        Test that parameters are resolved by their annotation.
+        """
+        container = Container()
+        container[Dependency] = Dependency()
+
+        @inject(container=container)
+        def service(dependency: Dependency):
+            return dependency
+
+        self.assertIs(
+            service(), container[Dependency]  # pylint: disable=no-value-for-parameter
+        )
+
+    def test_passed_arguments_win(self):
+        """
+        Test that positional and keyword arguments are never overridden.
+        """
+        container = Container()
+        container["one"] = 1
+        container["two"] = 2
+
+        @inject(container=container)
+        def service(one, two):
+            return one, two
+
+        self.assertEqual(service(10), (10, 2))  # pylint: disable=no-value-for-parameter
+        self.assertEqual(
+            service(two=20), (1, 20)  # pylint: disable=no-value-for-parameter
+        )
+        self.assertEqual(service(10, 20), (10, 20))
+
+    def test_default_is_used(self):
+        """
+        Test that unresolved parameters fall back to their default.
+        """
+        container = Container()
+
+        @inject(container=container)
+        def service(value="default"):
+            return value
+
+        self.assertEqual(service(), "default")
+
+    def test_missing_argument(self):
+        """
+        Test that unresolved parameters without default raise an error.
+        """
+        container = Container()
+
+        @inject(container=container)
+        def service(value):
+            return value
+
+        with self.assertRaises(ValueError):
+            service()  # pylint: disable=no-value-for-parameter
+
+    def test_extra_keywords(self):
+        """
+        Test that keywords caught by **kwargs do not count as parameters.
+        """
+        container = Container()
+        container["a"] = 1
+        container["b"] = 2
+
+        @inject(container=container)
+        def service(a, b, **extra):
+            return a, b, extra
+
+        # pylint: disable=no-value-for-parameter
+        self.assertEqual(service(x=3, y=4), (1, 2, {"x": 3, "y": 4}))
+        self.assertEqual(service(a=5, b=6), (5, 6, {}))
+        self.assertEqual(service(5, y=4), (5, 2, {"y": 4}))
+
+    def test_late_binding(self):
+        """
+        Test that bindings registered after decoration are resolved.
+        """
+        container = Container()
+
+        @inject(container=container)
+        def service(value):
+            return value
+
+        container["value"] = "late"
+
+        self.assertEqual(service(), "late")  # pylint: disable=no-value-for-parameter
+
+    def test_async_function(self):
+        """
+        Test that coroutine functions are injected.
+        """
+        container = Container()
+        container["value"] = "async"
+
+        @inject(container=container)
+        async def service(value):
+            return value
+
+        self.assertEqual(
+            asyncio.run(service()), "async"  # pylint: disable=no-value-for-parameter
+        )
+
+    def test_plan_is_compiled_once(self):
+        """
+        Test that the injection plan is exposed on the wrapped callable.
+        """
+        container = Container()
+
+        @inject(container=container)
+        def service(one, two: Dependency, three=3):
+            return one, two, three
+
+        plan = service.__di_plan__
+        self.assertEqual(plan.names, ("one", "two", "three"))
+        self.assertEqual(
+            plan.steps,
+            (
+                ("one", None, plan.steps[0][2]),
+                ("two", Dependency, plan.steps[1][2]),
+                ("three", None, 3),
+            ),
+        )
+
+    def test_class_is_built_lazily(self):
+        """
+        Test that decorated classes are only built on first resolution.
+        """
+        container = Container()
+        built = []
+
+        @inject(container=container)
+        class Service:  # pylint: disable=too-few-public-methods
+            """Service class"""
+
+            def __init__(self, value):
+                built.append(value)
+
+        self.assertEqual(built, [])
+
+        container["value"] = "lazy"
+        service = container[Service]
+
+        self.assertEqual(built, ["lazy"])
+        self.assertIs(container[Service], service)
+
+    def test_class_lifetime(self):
+        """
+        Test that decorated classes honour the requested lifetime.
+        """
+        container = Container()
+
+        @inject(container=container, lifetime=Lifetime.TRANSIENT)
+        class Service:  # pylint: disable=too-few-public-methods
+            """Service class"""
+
+        self.assertIsNot(container[Service], container[Service])
@@ -0,0 +1,99 @@
+"""Unit tests for the introspection cache module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import os
+import tempfile
+from inspect import Parameter as InspectParameter
+from unittest import TestCase
+from core.di import Container
+from core.di.inject import Undefined
+from core.di.introspection import IntrospectionCache
+
+
+def handler(container: Container, name: str = "name", retries=3):
+    """Module level callable"""
+    return container, name, retries
+
+
+def handler_with_object_default(value=object()):
+    """Module level callable with a default that cannot be persisted"""
+    return value
+
+
+ENTRIES = (
+    ("container", Container, Undefined),
+    ("name", str, "name"),
+    ("retries", InspectParameter.empty, 3),
+)
+
+
+class TestIntrospectionCache(TestCase):
+    """IntrospectionCache test class."""
+
+    def test_memory(self):
+        """
+        Test that entries are memoized in memory.
+        """
+        cache = IntrospectionCache()
+        assert cache.get(handler, Undefined) is None
+
+        cache.set(handler, ENTRIES, Undefined)
+
+        assert cache.get(handler, Undefined) is ENTRIES
+
+    def test_disk_round_trip(self):
+        """
+        Test that entries saved on disk are loaded back by another cache.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "di.cache")
+            cache = IntrospectionCache(path)
+            cache.set(handler, ENTRIES, Undefined)
+            cache.save()
+
+            assert os.path.exists(path)
+            assert IntrospectionCache(path).get(handler, Undefined) == ENTRIES
+
+    def test_not_persistable(self):
+        """
+        Test that entries with object defaults are only kept in memory.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "di.cache")
+            entries = (("value", InspectParameter.empty, object()),)
+            cache = IntrospectionCache(path)
+            cache.set(handler_with_object_default, entries, Undefined)
+            cache.save()
+
+            assert cache.get(handler_with_object_default, Undefined) is entries
+            assert not os.path.exists(path)
+
+    def test_locals_are_skipped(self):
+        """
+        Test that local callables, whose qualname is ambiguous, are never cached.
+        """
+
+        def local():
+            """Local callable"""
+
+        cache = IntrospectionCache()
+        cache.set(local, (), Undefined)
+
+        assert cache.get(local, Undefined) is None
+
+    def test_stale_module(self):
+        """
+        Test that entries of a module edited since they were saved are ignored.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "di.cache")
+            cache = IntrospectionCache(path)
+            cache.set(handler, ENTRIES, Undefined)
+            cache.save()
+
+            reloaded = IntrospectionCache(path)
+            reloaded._mtimes[__name__] = 0.0  # pylint: disable=protected-access
+
+            assert reloaded.get(handler, Undefined) is None
@@ -0,0 +1,94 @@
+"""Unit tests for the message type registry."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.command.bus.kafka_command_bus import KafkaCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.exceptions import MessageTypeNotAllowed
+from core.cqrs.message_types import TYPES, TypeRegistry
+from core.cqrs.query.query import QueryResponseInterface
+from .fakes import FakeBroker
+
+
+@dataclass(frozen=True, kw_only=True)
+class CreateUser(CommandInterface):
+    """A command."""
+
+    user_id: int
+    name: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class UserCreated(QueryResponseInterface):
+    """A message type no bus registers."""
+
+    user_id: int
+
+
+class TestTypeRegistry(TestCase):
+    """TypeRegistry test class."""
+
+    def test_register(self):
+        """
+        Test that a registered type is built by its constructor.
+        """
+        types = TypeRegistry()
+        fqdn = types.register(CreateUser)
+
+        assert fqdn == __name__ + ".CreateUser"
+        assert fqdn in types
+        assert types.construct(fqdn, {"user_id": 1, "name": "bob"}) == CreateUser(
+            user_id=1, name="bob"
+        )
+
+        types.register(CreateUser, lambda **kwargs: CreateUser(user_id=2, name="eve"))
+        assert types.construct(fqdn, {}) == CreateUser(user_id=2, name="eve")
+
+    def test_import(self):
+        """
+        Test that an unregistered type is imported once, then registered.
+        """
+        types = TypeRegistry()
+        fqdn = __name__ + ".UserCreated"
+
+        assert fqdn not in types
+        assert types.construct(fqdn, {"user_id": 1}) == UserCreated(user_id=1)
+        assert fqdn in types and len(types) == 1
+        assert types.resolve(fqdn) is UserCreated
+
+    def test_allowlist(self):
+        """
+        Test that an allowlist registry rejects unregistered types unimported.
+        """
+        types = TypeRegistry(allowlist=True)
+        types.register(CreateUser)
+        ap = AsyncProtocol.from_cq(UserCreated(user_id=1))
+
+        with self.assertRaises(MessageTypeNotAllowed):
+            ap.to_cq(types)
+
+        with self.assertRaises(MessageTypeNotAllowed):
+            types.construct("os.system", {"command": "true"})
+
+        assert len(types) == 1
+        ap = AsyncProtocol.from_cq(CreateUser(user_id=1, name="bob"))
+        assert ap.to_cq(types) == CreateUser(user_id=1, name="bob")
+
+
+class TestBusRegistration(TestCase):
+    """Bus type registration test class."""
+
+    def test_register_handler(self):
+        """
+        Test that registering a handler registers the type it handles.
+        """
+        bus = KafkaCommandBus(FakeBroker())
+        asyncio.run(bus.register_handler(CreateUser, print))
+
+        assert __name__ + ".CreateUser" in TYPES
+        assert TYPES.resolve(__name__ + ".CreateUser") is CreateUser
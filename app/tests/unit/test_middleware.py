@@ -0,0 +1,133 @@
+"""Unit tests for the middleware module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+from unittest import TestCase
+from core.di import Container
+from core.cqrs.command.bus.di_command_bus import DICommandBus
+from core.cqrs.command.bus.simple_command_bus import SimpleCommandBus
+from core.cqrs.command.command import BaseCommandInterface
+from core.cqrs.handler import HandlerInterface
+from core.cqrs.middleware import (
+    RetryMiddleware,
+    TimingMiddleware,
+    compose,
+)
+from core.cqrs.query.bus.simple_query_bus import SimpleQueryBus
+from core.cqrs.query.query import QueryInterface
+
+
+class Ping(BaseCommandInterface):  # pylint: disable=too-few-public-methods
+    """A command."""
+
+
+class Status(QueryInterface):  # pylint: disable=too-few-public-methods
+    """A query."""
+
+
+def tracing(events, name):
+    """
+    Returns a middleware recording when it is entered and left.
+    """
+
+    def middleware(cq, call_next):
+        events.append(f"{name} in")
+        result = call_next(cq)
+        events.append(f"{name} out")
+        return result
+
+    return middleware
+
+
+class TestMiddleware(TestCase):
+    """Middleware test class."""
+
+    def test_compose_order(self):
+        """
+        Test that the first middleware is the outermost.
+        """
+        events = []
+
+        chain = compose(
+            lambda cq: events.append("handler") or cq,
+            [tracing(events, "a"), tracing(events, "b")],
+        )
+
+        assert chain(1) == 1
+        assert events == ["a in", "b in", "handler", "b out", "a out"]
+
+    def test_compose_without_middlewares(self):
+        """
+        Test that a chain without middlewares is the handler itself.
+        """
+        handler = print
+
+        assert compose(handler, ()) is handler
+
+    def test_simple_buses(self):
+        """
+        Test that the simple buses run their middlewares.
+        """
+        events = []
+        command_bus = SimpleCommandBus([tracing(events, "a")])
+        query_bus = SimpleQueryBus([tracing(events, "b")])
+        command_bus.register_handler(Ping, lambda cq: events.append("ping"))
+        query_bus.register_handler(Status, lambda cq: "ok")
+
+        command_bus.execute(Ping())
+
+        assert query_bus.execute(Status()) == "ok"
+        assert events == ["a in", "ping", "a out", "b in", "b out"]
+
+    def test_di_bus(self):
+        """
+        Test that the DI bus runs its middlewares around the handler.
+        """
+        events = []
+
+        class PingHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+            """Handles Ping."""
+
+            def __call__(self, cq):
+                events.append("ping")
+
+        bus = DICommandBus(Container(), middlewares=[tracing(events, "a")])
+        bus.register_handler(Ping, PingHandler())
+
+        bus.execute(Ping())
+
+        assert events == ["a in", "ping", "a out"]
+
+    def test_timing(self):
+        """
+        Test that the timing middleware reports the message type.
+        """
+        reports = []
+        chain = compose(
+            lambda cq: None,
+            [TimingMiddleware(lambda cq_type, elapsed: reports.append(cq_type))],
+        )
+
+        chain(Ping())
+
+        assert reports == [Ping]
+
+    def test_retry(self):
+        """
+        Test that the retry middleware handles a failing message again.
+        """
+        attempts = []
+
+        def flaky(cq):
+            attempts.append(cq)
+            if len(attempts) < 3:
+                raise ConnectionError("reset")
+            return "ok"
+
+        assert compose(flaky, [RetryMiddleware(3, (ConnectionError,))])(1) == "ok"
+
+        attempts.clear()
+        with self.assertRaises(ConnectionError):
+            compose(flaky, [RetryMiddleware(2, (ConnectionError,))])(1)
+        assert len(attempts) == 2
@@ -0,0 +1,188 @@
+"""Unit tests for the pool module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import threading
+from unittest import TestCase
+from core.di import Container, InstancePool, Lifetime, inject
+from core.di.exceptions import ContainerPoolExhaustedError, ContainerScopeError
+
+
+class Handler:  # pylint: disable=too-few-public-methods
+    """A handler which is not thread safe."""
+
+    def __init__(self):
+        self.busy = False
+
+    def __call__(self):
+        assert not self.busy
+        self.busy = True
+        threading.Event().wait(0.001)
+        self.busy = False
+
+
+class TestInstancePool(TestCase):
+    """InstancePool test class."""
+
+    def test_builds_on_demand(self):
+        """
+        Test that instances are built on checkout, up to the pool size.
+        """
+        pool = InstancePool(Handler, 2)
+
+        first = pool.acquire()
+        second = pool.acquire()
+
+        assert first is not second
+        assert pool.created == 2
+
+    def test_reuses_last_released(self):
+        """
+        Test that the most recently released instance is handed out first.
+        """
+        pool = InstancePool(Handler, 2)
+        first, second = pool.acquire(), pool.acquire()
+
+        pool.release(first)
+        pool.release(second)
+
+        assert pool.acquire() is second
+        assert pool.created == 2
+
+    def test_exhausted(self):
+        """
+        Test that a checkout times out when every instance is checked out.
+        """
+        pool = InstancePool(Handler, 1)
+        pool.acquire()
+
+        with self.assertRaises(ContainerPoolExhaustedError):
+            pool.acquire(timeout=0.01)
+
+    def test_failed_build(self):
+        """
+        Test that a failed build does not take a slot of the pool.
+        """
+        calls = []
+
+        def factory():
+            calls.append(None)
+            if len(calls) == 1:
+                raise RuntimeError("connection refused")
+            return Handler()
+
+        pool = InstancePool(factory, 1)
+
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+        assert isinstance(pool.acquire(timeout=0.01), Handler)
+
+    def test_fill(self):
+        """
+        Test that fill builds the missing instances.
+        """
+        pool = InstancePool(Handler, 3)
+        pool.acquire()
+
+        pool.fill()
+
+        assert pool.created == 3
+        assert pool.idle == 2
+
+    def test_concurrent_leases(self):
+        """
+        Test that concurrent callers never share an instance.
+        """
+        pool = InstancePool(Handler, 2)
+
+        def work():
+            for _ in range(50):
+                with pool.lease() as handler:
+                    handler()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert pool.created == 2
+        assert pool.idle == 2
+
+
+class TestPooledLifetime(TestCase):
+    """Pooled lifetime test class."""
+
+    def test_outside_scope(self):
+        """
+        Test that a pooled service cannot be resolved outside of a scope.
+        """
+        mydi = Container()
+        mydi.pooled("handler", Handler, 2)
+
+        with self.assertRaises(ContainerScopeError):
+            mydi.get("handler")
+
+    def test_lease(self):
+        """
+        Test that a lease checks out an instance and returns it on exit.
+        """
+        mydi = Container()
+        provider = mydi.pooled("handler", Handler, 2)
+
+        with mydi.lease("handler") as first:
+            with mydi.lease("handler") as second:
+                assert first is not second
+                assert provider.pool.idle == 0
+
+        assert provider.pool.idle == 2
+
+    def test_lease_unpooled(self):
+        """
+        Test that leasing a service which is not pooled resolves it.
+        """
+        mydi = Container()
+        mydi["dsn"] = "sqlite://"
+
+        with mydi.lease("dsn") as dsn:
+            assert dsn == "sqlite://"
+
+    def test_scope(self):
+        """
+        Test that a scope checks out one instance and returns it when closed.
+        """
+        mydi = Container()
+        provider = mydi.pooled("handler", Handler, 2)
+
+        with mydi.scope() as scope:
+            handler = scope["handler"]
+            assert scope["handler"] is handler
+            assert provider.pool.idle == 0
+
+        assert provider.pool.idle == 1
+
+    def test_inject(self):
+        """
+        Test that inject registers classes with a pooled lifetime.
+        """
+        mydi = Container()
+
+        @inject(container=mydi, lifetime=Lifetime.POOLED, pool_size=3)
+        class Pooled:  # pylint: disable=too-few-public-methods
+            """A pooled class."""
+
+        assert mydi.binding(Pooled).pool.size == 3
+
+    def test_warm_up_fills(self):
+        """
+        Test that warming up a pooled service fills its pool.
+        """
+        mydi = Container()
+        provider = mydi.pooled("handler", Handler, 2)
+
+        asyncio.run(mydi.warm_up("handler"))
+
+        assert provider.pool.idle == 2
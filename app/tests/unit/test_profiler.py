@@ -0,0 +1,94 @@
+"""Unit tests for the resolution profiler module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+from unittest import TestCase
+from core.di import Container, inject
+from core.di.profiler import ResolutionProfiler
+
+
+class TestResolutionProfiler(TestCase):
+    """ResolutionProfiler test class."""
+
+    def test_disabled_by_default(self):
+        """
+        Test that containers do not profile unless asked to.
+        """
+        mydi = Container()
+        mydi["dsn"] = "sqlite://"
+
+        assert mydi.profiler is None
+        assert mydi["dsn"] == "sqlite://"
+
+    def test_hits_and_misses(self):
+        """
+        Test that singleton reuse counts as hits and factory calls as misses.
+        """
+        mydi = Container()
+        profiler = mydi.enable_profiling()
+        mydi.singleton("singleton", object)
+        mydi.transient("transient", object)
+        mydi["value"] = "value"
+
+        for _ in range(3):
+            _ = mydi["singleton"], mydi["transient"], mydi["value"]
+        _ = mydi.get("unknown")
+
+        report = profiler.report()
+
+        assert report["singleton"]["count"] == 3
+        assert (report["singleton"]["hits"], report["singleton"]["misses"]) == (2, 1)
+        assert (report["transient"]["hits"], report["transient"]["misses"]) == (0, 3)
+        assert report["value"]["hits"] == 3
+        assert "unknown" not in report
+        assert report["singleton"]["p99"] >= 0.0
+
+    def test_scopes_inherit_profiler(self):
+        """
+        Test that scoped resolutions are recorded by the parent profiler.
+        """
+        mydi = Container()
+        profiler = mydi.enable_profiling()
+        mydi.scoped("session", object)
+
+        with mydi.scope() as scope:
+            _ = scope["session"], scope["session"]
+
+        report = profiler.report()
+        assert (report["session"]["hits"], report["session"]["misses"]) == (1, 1)
+
+    def test_inject(self):
+        """
+        Test that injected callables record their resolution time.
+        """
+        mydi = Container()
+        profiler = mydi.enable_profiling()
+        mydi["dsn"] = "sqlite://"
+
+        @inject(container=mydi)
+        def service(dsn):
+            return dsn
+
+        service()  # pylint: disable=no-value-for-parameter
+
+        labels = list(profiler.report())
+        assert any(label.endswith("<locals>.service") for label in labels)
+
+        mydi.disable_profiling()
+        profiler.reset()
+        service()  # pylint: disable=no-value-for-parameter
+
+        assert not profiler.report()
+
+    def test_format_table(self):
+        """
+        Test the text report.
+        """
+        profiler = ResolutionProfiler()
+        profiler.record("kafka_broker", 0.002, False)
+
+        table = profiler.format_table()
+
+        assert "kafka_broker" in table
+        assert "2000.0" in table
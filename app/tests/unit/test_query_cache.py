@@ -0,0 +1,227 @@
+"""Unit tests for the query cache module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from dataclasses import dataclass
+from unittest import TestCase
+from core.di import Container
+from core.cqrs.command.bus.simple_command_bus import SimpleCommandBus
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.handler import HandlerInterface
+from core.cqrs.query.bus.di_query_bus import DIQueryBus
+from core.cqrs.query.bus.simple_query_bus import SimpleQueryBus
+from core.cqrs.query.cache import MISS, CachePolicy, QueryCache
+from core.cqrs.query.query import QueryInterface
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetUser(QueryInterface):
+    """A cached query."""
+
+    user_id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetStats(QueryInterface):
+    """Another cached query."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class RenameUser(CommandInterface):
+    """A command making GetUser results stale."""
+
+    invalidates = (GetUser,)
+
+    user_id: int
+
+
+class GetUserHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+    """Handles GetUser, recording the queries it receives."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __call__(self, cq):
+        self.calls.append(cq)
+        return "alice"
+
+
+class Clock:  # pylint: disable=too-few-public-methods
+    """A clock moved by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCache(TestCase):
+    """QueryCache test class."""
+
+    def test_get_put(self):
+        """
+        Test that a cached result is served for an equal query.
+        """
+        cache = QueryCache()
+
+        assert cache.get(GetUser(user_id=1)) is MISS
+        cache.put(GetUser(user_id=1), "alice")
+
+        assert cache.get(GetUser(user_id=1)) == "alice"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_ttl(self):
+        """
+        Test that results expire after the ttl of their query type.
+        """
+        clock = Clock()
+        cache = QueryCache(policies={GetStats: CachePolicy(ttl=None)}, clock=clock)
+        cache.set_policy(GetUser, CachePolicy(ttl=5))
+        cache.put(GetUser(user_id=1), "alice")
+        cache.put(GetStats(), {"users": 1})
+
+        clock.now = 6
+
+        assert cache.get(GetUser(user_id=1)) is MISS
+        assert cache.get(GetStats()) == {"users": 1}
+
+    def test_not_cacheable(self):
+        """
+        Test that query types with a non cacheable policy are not cached.
+        """
+        cache = QueryCache(default_policy=CachePolicy(cacheable=False))
+
+        cache.put(GetUser(user_id=1), "alice")
+
+        assert len(cache) == 0
+
+    def test_lru(self):
+        """
+        Test that the least recently used result is evicted first.
+        """
+        cache = QueryCache(max_entries=2)
+        cache.put(GetUser(user_id=1), "alice")
+        cache.put(GetUser(user_id=2), "bob")
+        cache.get(GetUser(user_id=1))
+
+        cache.put(GetUser(user_id=3), "carol")
+
+        assert cache.get(GetUser(user_id=2)) is MISS
+        assert cache.get(GetUser(user_id=1)) == "alice"
+        assert cache.evictions == 1
+
+    def test_memory_budget(self):
+        """
+        Test that results are evicted to stay within the memory budget.
+        """
+        cache = QueryCache(max_bytes=1000, sizeof=lambda value: 200)
+        for user_id in range(5):
+            cache.put(GetUser(user_id=user_id), "x")
+
+        assert len(cache) == 2
+        assert cache.size == 800
+        assert cache.get(GetUser(user_id=4)) == "x"
+
+    def test_oversized(self):
+        """
+        Test that a result larger than the whole budget is not cached.
+        """
+        cache = QueryCache(max_bytes=1000)
+
+        cache.put(GetUser(user_id=1), "x" * 10_000)
+
+        assert len(cache) == 0
+
+    def test_invalidate_for(self):
+        """
+        Test that a command drops the query types it invalidates.
+        """
+        cache = QueryCache()
+        cache.put(GetUser(user_id=1), "alice")
+        cache.put(GetStats(), {"users": 1})
+
+        cache.invalidate_for(RenameUser(user_id=1))
+
+        assert cache.get(GetUser(user_id=1)) is MISS
+        assert cache.get(GetStats()) == {"users": 1}
+        assert cache.size == cache.sizeof(GetStats()) + cache.sizeof({"users": 1})
+
+        cache.put(GetUser(user_id=1), "alice")
+        cache.invalidate_for(RenameUser(user_id=1), RenameUser(user_id=2))
+        assert cache.get(GetUser(user_id=1)) is MISS
+        assert cache.get(GetStats()) == {"users": 1}
+
+    def test_stale_result_not_cached(self):
+        """
+        Test that a result computed across an invalidation is not cached.
+        """
+        cache = QueryCache()
+
+        def compute(query):  # pylint: disable=unused-argument
+            cache.invalidate(GetUser)
+            return "stale"
+
+        assert cache.fetch(GetUser(user_id=1), compute) == "stale"
+        assert cache.get(GetUser(user_id=1)) is MISS
+
+    def test_afetch(self):
+        """
+        Test that awaited results are cached.
+        """
+        cache = QueryCache()
+        calls = []
+
+        async def compute(query):
+            calls.append(query)
+            return "alice"
+
+        for _ in range(2):
+            assert asyncio.run(cache.afetch(GetUser(user_id=1), compute)) == "alice"
+
+        assert len(calls) == 1
+
+
+class TestCachedBuses(TestCase):
+    """Cached buses test class."""
+
+    def test_simple_buses(self):
+        """
+        Test that queries are cached until a command invalidates them.
+        """
+        names = {1: "alice"}
+        cache = QueryCache()
+        query_bus = SimpleQueryBus(cache=cache)
+        command_bus = SimpleCommandBus(cache=cache)
+        calls = []
+
+        def get_user(query):
+            calls.append(query)
+            return names[query.user_id]
+
+        def rename_user(command):
+            names[command.user_id] = "bob"
+
+        query_bus.register_handler(GetUser, get_user)
+        command_bus.register_handler(RenameUser, rename_user)
+
+        assert query_bus.execute(GetUser(user_id=1)) == "alice"
+        assert query_bus.execute(GetUser(user_id=1)) == "alice"
+        command_bus.execute(RenameUser(user_id=1))
+        assert query_bus.execute(GetUser(user_id=1)) == "bob"
+        assert len(calls) == 2
+
+    def test_di_bus(self):
+        """
+        Test that the DI query bus serves repeated queries from the cache.
+        """
+        calls = []
+        bus = DIQueryBus(Container(), cache=QueryCache())
+        bus.register_handler(GetUser, GetUserHandler(calls))
+
+        bus.execute(GetUser(user_id=1))
+        bus.execute(GetUser(user_id=1))
+
+        assert len(calls) == 1
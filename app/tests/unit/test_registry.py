@@ -0,0 +1,196 @@
+"""Unit tests for the registry module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import json
+import os
+import sys
+import tempfile
+from unittest import TestCase
+from core.di import Container, Lifetime, Provider, di, inject
+from core.cqrs.command.bus.di_command_bus import DICommandBus
+from core.cqrs.command.command import BaseCommandInterface
+from core.cqrs.exceptions import CommandAlreadyRegistered, HandlerNotFound
+from core.cqrs.handler import HandlerInterface
+from core.cqrs.query.query import QueryInterface
+from core.cqrs.registry import COMMAND, QUERY, HandlerRegistry, fqdn_of
+
+HANDLER_MODULE = """
+from core.cqrs.registry import registry
+
+calls = []
+
+
+def handle(command):
+    calls.append(command)
+"""
+
+INJECTED_HANDLER_MODULE = """
+from core.cqrs.handler import HandlerInterface
+from core.di import Lifetime, inject
+
+
+@inject(lifetime=Lifetime.TRANSIENT)
+class PingHandler(HandlerInterface):
+    def handle(self, command):
+        return self
+"""
+
+
+class Ping(BaseCommandInterface):  # pylint: disable=too-few-public-methods
+    """A command."""
+
+
+class Status(QueryInterface):  # pylint: disable=too-few-public-methods
+    """A query."""
+
+
+class TestHandlerRegistry(TestCase):
+    """HandlerRegistry test class."""
+
+    def test_handles(self):
+        """
+        Test that the decorator declares handlers by kind and fqdn.
+        """
+        registry = HandlerRegistry()
+
+        @registry.handles(Ping)
+        def ping(command):  # pylint: disable=unused-argument
+            """Handles Ping."""
+
+        @registry.handles(Status)
+        def status(query):  # pylint: disable=unused-argument
+            """Handles Status."""
+
+        assert registry.fqdns(COMMAND) == [fqdn_of(Ping)]
+        assert registry.fqdns(QUERY) == [fqdn_of(Status)]
+        assert registry.load(fqdn_of(Ping)) is ping
+        assert registry.manifest()[COMMAND] == {
+            fqdn_of(Ping): f"{__name__}:{ping.__qualname__}"
+        }
+
+    def test_handles_twice(self):
+        """
+        Test that declaring a second handler for a command raises.
+        """
+        registry = HandlerRegistry()
+        registry.handles(Ping)(lambda command: None)
+
+        with self.assertRaises(CommandAlreadyRegistered):
+            registry.handles(Ping)(print)
+
+    def test_handles_other_types(self):
+        """
+        Test that only commands and queries can be handled.
+        """
+        with self.assertRaises(ValueError):
+            HandlerRegistry().handles(int)
+
+    def test_lazy_load(self):
+        """
+        Test that a manifest handler module is only imported on first load.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            module_name = "registry_lazy_handlers"
+            with open(
+                os.path.join(directory, f"{module_name}.py"), "w", encoding="utf-8"
+            ) as file:
+                file.write(HANDLER_MODULE)
+
+            manifest = os.path.join(directory, "handlers.json")
+            with open(manifest, "w", encoding="utf-8") as file:
+                json.dump({COMMAND: {fqdn_of(Ping): f"{module_name}:handle"}}, file)
+
+            sys.path.insert(0, directory)
+            try:
+                registry = HandlerRegistry(manifest)
+                assert registry.has(COMMAND, fqdn_of(Ping))
+                assert module_name not in sys.modules
+
+                handler = registry.load(fqdn_of(Ping))
+
+                assert handler is sys.modules[module_name].handle
+            finally:
+                sys.path.remove(directory)
+                sys.modules.pop(module_name, None)
+
+    def test_lazy_load_after_freeze(self):
+        """
+        Test that a handler imported after the container was frozen keeps its lifetime.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            module_name = "registry_lazy_injected_handlers"
+            with open(
+                os.path.join(directory, f"{module_name}.py"), "w", encoding="utf-8"
+            ) as file:
+                file.write(INJECTED_HANDLER_MODULE)
+
+            manifest = os.path.join(directory, "handlers.json")
+            with open(manifest, "w", encoding="utf-8") as file:
+                json.dump(
+                    {COMMAND: {fqdn_of(Ping): f"{module_name}:PingHandler"}}, file
+                )
+
+            sys.path.insert(0, directory)
+            try:
+                registry = HandlerRegistry(manifest)
+                container = Container(parent=di).freeze()
+
+                provider = registry.resolve(fqdn_of(Ping), container)
+
+                assert isinstance(provider, Provider)
+                assert provider.lifetime is Lifetime.TRANSIENT
+                assert provider.resolve(container) is not provider.resolve(container)
+            finally:
+                sys.path.remove(directory)
+                sys.modules.pop(module_name, None)
+
+    def test_save_manifest(self):
+        """
+        Test that a saved manifest declares the same handlers.
+        """
+        registry = HandlerRegistry()
+        registry.handles(Ping)(print)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "handlers.json")
+            registry.save_manifest(path)
+
+            assert HandlerRegistry(path).manifest() == registry.manifest()
+
+    def test_resolve(self):
+        """
+        Test that classes bound in the container resolve to their provider.
+        """
+        container = Container()
+        registry = HandlerRegistry()
+
+        @registry.handles(Ping)
+        @inject(container=container, lifetime=Lifetime.POOLED, pool_size=2)
+        class PingHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+            """Handles Ping."""
+
+        @registry.handles(Status)
+        class StatusHandler(HandlerInterface):  # pylint: disable=too-few-public-methods
+            """Handles Status."""
+
+        assert isinstance(registry.resolve(fqdn_of(Ping), container), Provider)
+        assert isinstance(registry.resolve(fqdn_of(Status), container), StatusHandler)
+        assert isinstance(registry.resolve(fqdn_of(Ping)), PingHandler)
+
+    def test_di_bus(self):
+        """
+        Test that the DI bus loads registry handlers on first execution.
+        """
+        calls = []
+        registry = HandlerRegistry()
+        registry.handles(Ping)(calls.append)
+        bus = DICommandBus(Container(), registry)
+
+        command = Ping()
+        bus.execute(command)
+
+        assert calls == [command]
+        with self.assertRaises(HandlerNotFound):
+            DICommandBus(Container()).execute(command)
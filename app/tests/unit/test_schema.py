@@ -0,0 +1,162 @@
+"""Unit tests for the compiled message schemas."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from unittest import TestCase
+from uuid import UUID
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.command.command import CommandInterface
+from core.cqrs.query.query import QueryInterface
+from core.cqrs.schema import schema_of
+
+
+class Role(Enum):
+    """An enum."""
+
+    ADMIN = "admin"
+    VIEWER = "viewer"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Address(CommandInterface):
+    """A nested dataclass."""
+
+    city: str
+    moved_in: Optional[date] = None
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CreateUser(CommandInterface):  # pylint: disable=too-many-instance-attributes
+    """A slotted command with non JSON fields."""
+
+    user_id: UUID
+    name: str
+    created_at: datetime
+    balance: Decimal
+    role: Role
+    address: Address
+    previous: List[Address] = field(default_factory=list)
+    tags: FrozenSet[str] = frozenset()
+    scores: Dict[str, Optional[Decimal]] = field(default_factory=dict)
+    location: Tuple[float, float] = (0.0, 0.0)
+    parent: Optional[UUID] = None
+    version: int = field(default=1, init=False)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Tree(QueryInterface):
+    """A recursive dataclass."""
+
+    label: str
+    children: Tuple["Tree", ...] = ()
+
+
+@dataclass(frozen=True)
+class Versioned(CommandInterface):
+    """A regular dataclass with a field which is not a parameter."""
+
+    name: str
+    version: int = field(default=1, init=False)
+
+
+class LegacyQuery(QueryInterface):  # pylint: disable=too-few-public-methods
+    """A message type which is not a dataclass."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def __eq__(self, other):
+        return vars(self) == vars(other)
+
+    __hash__ = None
+
+
+class TestSchema(TestCase):
+    """Schema test class."""
+
+    def test_round_trip(self):
+        """
+        Test that a slotted dataclass is sent in JSON and built back equal.
+        """
+        command = CreateUser(
+            user_id=UUID(int=1),
+            name="bob",
+            created_at=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+            balance=Decimal("10.25"),
+            role=Role.ADMIN,
+            address=Address(city="Paris", moved_in=date(2020, 1, 2)),
+            previous=[Address(city="Lyon")],
+            tags=frozenset({"a"}),
+            scores={"math": Decimal("1.5"), "art": None},
+            location=(48.8, 2.3),
+        )
+
+        parameters = schema_of(CreateUser).dump(command)
+        assert parameters == {
+            "user_id": str(UUID(int=1)),
+            "name": "bob",
+            "created_at": "2024-05-01T12:30:00+00:00",
+            "balance": "10.25",
+            "role": "admin",
+            "address": {"city": "Paris", "moved_in": "2020-01-02"},
+            "previous": [{"city": "Lyon", "moved_in": None}],
+            "tags": ["a"],
+            "scores": {"math": "1.5", "art": None},
+            "location": [48.8, 2.3],
+            "parent": None,
+        }
+
+        ap = AsyncProtocol.from_bytes(AsyncProtocol.from_cq(command).to_bytes())
+        assert ap.to_cq() == command
+        assert isinstance(ap.to_cq().location, tuple)
+
+    def test_recursive(self):
+        """
+        Test that a recursive dataclass is converted at every depth.
+        """
+        tree = Tree(label="root", children=(Tree(label="leaf"),))
+
+        parameters = schema_of(Tree).dump(tree)
+        assert json.loads(json.dumps(parameters)) == parameters
+        assert schema_of(Tree).load(**parameters) == tree
+        assert hash(schema_of(Tree).load(**parameters)) == hash(tree)
+
+    def test_instance_dictionary(self):
+        """
+        Test that a regular dataclass is dumped from a copy of its instance
+        dictionary, unless it has fields which are not parameters.
+        """
+        tree = Tree(label="root", children=(Tree(label="leaf"),))
+
+        parameters = schema_of(Tree).dump(tree)
+        parameters["label"] = "changed"
+        assert tree.label == "root"
+        assert vars(tree)["children"] == (Tree(label="leaf"),)
+
+        versioned = Versioned(name="a")
+        assert schema_of(Versioned).dump(versioned) == {"name": "a"}
+        assert schema_of(Versioned).load(name="a") == versioned
+
+    def test_not_dataclass(self):
+        """
+        Test that other types are sent as their instance dictionary.
+        """
+        query = LegacyQuery(user_id=1)
+
+        assert schema_of(LegacyQuery).dump(query) == {"user_id": 1}
+        assert schema_of(LegacyQuery).dump(query) is not vars(query)
+        assert AsyncProtocol.from_cq(query).to_cq() == query
+
+    def test_compiled_once(self):
+        """
+        Test that a schema is compiled once per type.
+        """
+        assert schema_of(CreateUser) is schema_of(CreateUser)
+        assert schema_of(CreateUser).names[-1] == "parent"
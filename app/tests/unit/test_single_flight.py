@@ -0,0 +1,156 @@
+"""Unit tests for the single flight module."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.exceptions import HandlerNotFound
+from core.cqrs.query.bus.async_query_bus import AsyncQueryBus
+from core.cqrs.query.cache import QueryCache
+from core.cqrs.query.query import QueryInterface
+from core.cqrs.query.single_flight import SingleFlight
+
+
+@dataclass(frozen=True, kw_only=True)
+class GetUser(QueryInterface):
+    """A query."""
+
+    user_id: int
+
+
+class TestSingleFlight(TestCase):
+    """SingleFlight test class."""
+
+    def test_coalesces(self):
+        """
+        Test that concurrent calls for a key share one execution.
+        """
+        single_flight = SingleFlight()
+        calls = []
+
+        async def compute(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key * 2
+
+        async def run():
+            return await asyncio.gather(
+                *(single_flight.do(key, compute) for key in (1, 1, 1, 2))
+            )
+
+        assert asyncio.run(run()) == [2, 2, 2, 4]
+        assert calls == [1, 2]
+        assert single_flight.shared == 2
+        assert len(single_flight) == 0
+
+    def test_sequential_calls(self):
+        """
+        Test that a completed execution is not reused.
+        """
+        single_flight = SingleFlight()
+        calls = []
+
+        async def compute(key):
+            calls.append(key)
+            return key
+
+        async def run():
+            await single_flight.do(1, compute)
+            await single_flight.do(1, compute)
+
+        asyncio.run(run())
+
+        assert calls == [1, 1]
+
+    def test_exception_shared(self):
+        """
+        Test that every waiter receives the exception of the execution.
+        """
+        single_flight = SingleFlight()
+
+        async def compute(key):
+            await asyncio.sleep(0.01)
+            raise LookupError(key)
+
+        async def run():
+            return await asyncio.gather(
+                single_flight.do(1, compute),
+                single_flight.do(1, compute),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, LookupError) for result in results)
+
+    def test_cancelled_waiter(self):
+        """
+        Test that cancelling the first caller does not cancel the execution.
+        """
+        single_flight = SingleFlight()
+
+        async def compute(key):
+            await asyncio.sleep(0.01)
+            return key
+
+        async def run():
+            first = asyncio.ensure_future(single_flight.do(1, compute))
+            second = asyncio.ensure_future(single_flight.do(1, compute))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()) == 1
+
+    def test_unhashable(self):
+        """
+        Test that unhashable keys are executed without coalescing.
+        """
+
+        async def compute(key):
+            return len(key)
+
+        assert asyncio.run(SingleFlight().do([1, 2], compute)) == 2
+
+
+class TestAsyncQueryBus(TestCase):
+    """AsyncQueryBus test class."""
+
+    def test_execute(self):
+        """
+        Test that coroutine and plain handlers are executed.
+        """
+        bus = AsyncQueryBus()
+
+        async def get_user(query):
+            return f"user {query.user_id}"
+
+        bus.register_handler(GetUser, get_user)
+
+        assert asyncio.run(bus.execute(GetUser(user_id=1))) == "user 1"
+
+        with self.assertRaises(HandlerNotFound):
+            asyncio.run(bus.execute(QueryInterface()))
+
+    def test_coalesces_and_caches(self):
+        """
+        Test that identical queries share an execution, then hit the cache.
+        """
+        bus = AsyncQueryBus(cache=QueryCache())
+        calls = []
+
+        async def get_user(query):
+            calls.append(query)
+            await asyncio.sleep(0.01)
+            return "alice"
+
+        bus.register_handler(GetUser, get_user)
+
+        async def run():
+            await asyncio.gather(*(bus.execute(GetUser(user_id=1)) for _ in range(10)))
+            return await bus.execute(GetUser(user_id=1))
+
+        assert asyncio.run(run()) == "alice"
+        assert len(calls) == 1
@@ -0,0 +1,212 @@
+"""Unit tests for the streamed query responses."""
+
+# pylint: disable=import-error
+# pyright: reportMissingImports=false
+# pyright: reportAttributeAccessIssue=false
+import asyncio
+import time
+from dataclasses import dataclass
+from unittest import TestCase
+from core.cqrs.async_protocol import AsyncProtocol
+from core.cqrs.exceptions import HandlerNotFound, QueryTimeout
+from core.cqrs.query.bus.async_query_bus import AsyncQueryBus
+from core.cqrs.query.bus.kafka_query_bus import KafkaQueryBus
+from core.cqrs.query.query import QueryInterface, QueryResponseInterface
+from core.cqrs.query.stream import StreamBuffer
+from .fakes import FakeBroker, FakeProducer, Record
+
+
+@dataclass(frozen=True, kw_only=True)
+class ListUsers(QueryInterface):
+    """A query with a large response."""
+
+    count: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class User(QueryResponseInterface):
+    """A chunk of the response."""
+
+    user_id: int
+
+
+async def list_users(query):
+    """Streams the users one by one."""
+    for user_id in range(query.count):
+        yield User(user_id=user_id)
+
+
+class RespondingConsumer:
+    """A Kafka consumer replying to each query sent through its broker."""
+
+    def __init__(self, broker, reply):
+        self.broker = broker
+        self.reply = reply
+        self.batches = []
+        self.answered = 0
+
+    def subscribe(self, topics):  # pylint: disable=unused-argument
+        """Subscribes nowhere."""
+
+    def poll(self, timeout_ms):
+        """Returns the next batch of records replying to the sent queries."""
+        for _, message in self.broker.sent[self.answered :]:
+            self.batches.extend(self.reply(AsyncProtocol.from_json(message).uuid))
+        self.answered = len(self.broker.sent)
+
+        if not self.batches:
+            time.sleep(timeout_ms / 1000)
+            return {}
+
+        return {"partition": self.batches.pop(0)}
+
+    def commit(self):
+        """Commits nothing."""
+
+
+class RespondingBroker(FakeBroker):
+    """A broker replying to the queries sent to it."""
+
+    def __init__(self, reply=lambda uuid: []):
+        super().__init__(
+            {"consumer": RespondingConsumer(self, reply), "producer": FakeProducer()}
+        )
+
+
+async def collect(stream):
+    """Returns the chunks of a stream."""
+    return [chunk async for chunk in stream]
+
+
+class TestStreamBuffer(TestCase):
+    """StreamBuffer test class."""
+
+    def test_reorder(self):
+        """
+        Test that chunks are taken in order, whatever their arrival order.
+        """
+        buffer = StreamBuffer()
+        chunks = [
+            AsyncProtocol.from_cq(User(user_id=n), "q", sequence=n) for n in (0, 1, 2)
+        ]
+
+        buffer.add(chunks[1])
+        assert not list(buffer.ready())
+        buffer.add(AsyncProtocol.end_of_stream("q", 3))
+        buffer.add(chunks[0])
+        assert list(buffer.ready()) == [User(user_id=0), User(user_id=1)]
+        assert not buffer.done
+
+        buffer.add(chunks[2])
+        assert list(buffer.ready()) == [User(user_id=2)]
+        assert buffer.done
+
+    def test_single_response(self):
+        """
+        Test that a response that is not streamed is a stream of one chunk.
+        """
+        buffer = StreamBuffer()
+        buffer.add(AsyncProtocol.from_cq(User(user_id=1), "q"))
+
+        assert list(buffer.ready()) == [User(user_id=1)]
+        assert buffer.done
+
+    def test_json(self):
+        """
+        Test that the stream fields are sent only when set.
+        """
+        end = AsyncProtocol.from_json(AsyncProtocol.end_of_stream("q", 2).to_json())
+        assert end.end and end.sequence == 2
+
+        data = AsyncProtocol.from_cq(User(user_id=1), "q").to_json()
+        assert "sequence" not in data and "end" not in data
+
+
+class TestAsyncQueryBus(TestCase):
+    """AsyncQueryBus stream test class."""
+
+    def test_stream(self):
+        """
+        Test that an async generator handler is streamed, and others as one chunk.
+        """
+        bus = AsyncQueryBus()
+        bus.register_handler(ListUsers, list_users)
+
+        chunks = asyncio.run(collect(bus.stream(ListUsers(count=3))))
+        assert chunks == [User(user_id=0), User(user_id=1), User(user_id=2)]
+
+        bus = AsyncQueryBus()
+        bus.register_handler(ListUsers, lambda query: User(user_id=query.count))
+        assert asyncio.run(collect(bus.stream(ListUsers(count=3)))) == [User(user_id=3)]
+
+        with self.assertRaises(HandlerNotFound):
+            asyncio.run(collect(bus.stream(QueryInterface())))
+
+
+class TestKafkaQueryBus(TestCase):
+    """KafkaQueryBus stream test class."""
+
+    def test_respond(self):
+        """
+        Test that a listener replies to a streaming handler chunk by chunk.
+        """
+        broker = RespondingBroker()
+        bus = KafkaQueryBus(broker)
+        message = AsyncProtocol.from_cq(ListUsers(count=2), "q").to_json()
+
+        asyncio.run(
+            bus._process(  # pylint: disable=protected-access
+                list_users, message, send_response=True
+            )
+        )
+
+        replies = [AsyncProtocol.from_json(data) for _, data in broker.sent]
+        assert {fqdn for fqdn, _ in broker.sent} == {__name__ + ".ListUsers-Response"}
+        assert [reply.sequence for reply in replies] == [0, 1, 2]
+        assert [reply.end for reply in replies] == [False, False, True]
+        assert all(reply.uuid == "q" for reply in replies)
+
+    def test_stream(self):
+        """
+        Test that the chunks are yielded in order, whatever their arrival order.
+        """
+
+        def reply(uuid):
+            def record(ap):
+                return Record(__name__ + ".ListUsers-Response", ap.to_json().encode())
+
+            chunks = [
+                record(AsyncProtocol.from_cq(User(user_id=n), uuid, sequence=n))
+                for n in range(3)
+            ]
+            end = record(AsyncProtocol.end_of_stream(uuid, 3))
+            return [[chunks[1], chunks[0]], [end, chunks[2]]]
+
+        bus = KafkaQueryBus(RespondingBroker(reply))
+        asyncio.run(bus.register_handler(ListUsers, list_users))
+
+        chunks = asyncio.run(collect(bus.stream(ListUsers(count=3))))
+        assert chunks == [User(user_id=0), User(user_id=1), User(user_id=2)]
+
+    def test_timeout(self):
+        """
+        Test that a stream without end times out after its first chunks.
+        """
+
+        def reply(uuid):
+            chunk = AsyncProtocol.from_cq(User(user_id=0), uuid, sequence=0)
+            return [
+                [Record(__name__ + ".ListUsers-Response", chunk.to_json().encode())]
+            ]
+
+        bus = KafkaQueryBus(RespondingBroker(reply), timeout=0.05)
+        asyncio.run(bus.register_handler(ListUsers, list_users))
+        chunks = []
+
+        async def consume():
+            async for chunk in bus.stream(ListUsers(count=3)):
+                chunks.append(chunk)
+
+        with self.assertRaises(QueryTimeout):
+            asyncio.run(consume())
+        assert chunks == [User(user_id=0)]